@@ -1,722 +1,178 @@
 import streamlit as st
-import random
+import hmac
 import time
-from typing import Dict, Any, List, Tuple, Optional
+from functools import partial
+from typing import Dict, Any, Optional, Union
+
+import dealing
+import equity
+import hand_eval
+import metrics
+import room_sync
+import styles
+import tables
+from engine import GameEngine
+from engine_cluster import EngineRouter, http_store
+from game import (
+    BLIND_STRUCTURE,
+    LEVEL_DURATION,
+    TURN_TIMEOUT,
+    init_room_json,
+    raise_bounds,
+)
+from hand_history import HandHistory
+from render import board_html, countdown_html, hud_html, make_card
+from room_store import RoomStore, shared_cache
+from supabase_http import PostgrestClient
 
 # =========================
 # 0. Page
 # =========================
 st.set_page_config(layout="wide", page_title="AI 몬스터 토너먼트", page_icon="🦁")
+# 리런 단계별 시간 (metrics.app_stage_seconds{stage=...}, 관리 패널/내보내기에서 본다)
+_sw = metrics.Stopwatch("app_stage_seconds")
 
 # =========================
 # 1. Supabase
 # =========================
 SUPABASE_URL = st.secrets.get("SUPABASE_URL", "")
 SUPABASE_ANON_KEY = st.secrets.get("SUPABASE_ANON_KEY", "")
+# 화면 갱신 방식: local(프로세스 내 푸시) / postgres(LISTEN/NOTIFY 푸시) / poll(st_autorefresh)
+SYNC_MODE = st.secrets.get("SYNC_MODE", "local")
+SYNC_DSN = st.secrets.get("SYNC_DSN", "")
+# 핸드 기록 디렉터리 (빈 값이면 안 남김). 다시 보기: python -m tools.replay_hand
+HAND_HISTORY_DIR = st.secrets.get("HAND_HISTORY_DIR", "hand_history")
+# 지표 내보내기: Prometheus /metrics 포트 (0이면 끔) / 텍스트 파일 경로 (빈 값이면 끔)
+METRICS_PORT = int(st.secrets.get("METRICS_PORT", 0))
+METRICS_FILE = st.secrets.get("METRICS_FILE", "")
+# 사이드바 지표 패널 토큰: 주소에 ?admin=<토큰>을 붙인 세션만 본다 (빈 값이면 아무도).
+# 닉네임은 누구나 입력할 수 있어서 권한으로 쓰지 않는다
+METRICS_TOKEN = str(st.secrets.get("METRICS_TOKEN", ""))
+# 덱 시드를 만드는 서버 비밀 (DB/화면에는 nonce와 커밋만). 엔진 프로세스끼리 같아야 재시작/이어받기 때
+# 진행 중 핸드를 계속한다. 빈 값이면 프로세스마다 임시 키 → 재시작하면 진행 중 핸드는 무효(칩 반환)
+DECK_SECRET = st.secrets.get("DECK_SECRET", "")
+# 엔진 워커 프로세스 수 (engine_cluster, 방을 해시 링으로 나눠 맡김). 0이면 이 프로세스 안 엔진 하나
+ENGINE_WORKERS = int(st.secrets.get("ENGINE_WORKERS", 0))
+# 봇/다른 프론트엔드용 WebSocket 액션 API 포트 (ws_api.py, 0이면 끔). 엔진이 이 프로세스 안에 있을 때만
+WS_PORT = int(st.secrets.get("WS_PORT", 0))
+
+
+@st.cache_resource
+def get_db() -> PostgrestClient:
+    # 프로세스당 하나 (keep-alive / HTTP2 커넥션 풀). 리런마다 새로 만들지 않는다
+    return PostgrestClient(SUPABASE_URL, SUPABASE_ANON_KEY)
+
 
 _supabase = None
 _sb_error = None
 if SUPABASE_URL and SUPABASE_ANON_KEY:
     try:
-        from supabase import create_client
-        _supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+        _supabase = get_db()
     except Exception as e:
         _supabase = None
         _sb_error = str(e)
 
 
-def sb_room_get(room_code: str) -> Optional[Dict[str, Any]]:
-    """state(jsonb)만 반환"""
-    if _supabase is None:
-        return None
-    try:
-        res = (
-            _supabase
-            .table("poker_rooms")
-            .select("room_code,state,updated_at")
-            .eq("room_code", room_code)
-            .execute()
-        )
-        if res.data and len(res.data) > 0:
-            row = res.data[0]
-            return row.get("state")
-        return None
-    except Exception:
-        # 네트워크/권한/정책 문제 등으로 깨져도 앱 전체가 죽지 않게
-        return None
-
-
-def sb_room_upsert(room_code: str, state: Dict[str, Any]) -> bool:
-    if _supabase is None:
-        return False
-    try:
-        payload = {"room_code": room_code, "state": state}
-        _supabase.table("poker_rooms").upsert(payload).execute()
-        return True
-    except Exception:
-        return False
-
-
 # =========================
 # 2. Game config
 # =========================
-BLIND_STRUCTURE = [
-    (100, 200, 0),
-    (200, 400, 0),
-    (300, 600, 600),
-    (400, 800, 800),
-    (500, 1000, 1000),
-    (1000, 2000, 2000),
-    (2000, 4000, 4000),
-    (5000, 10000, 10000),
-]
-LEVEL_DURATION = 600
-TURN_TIMEOUT = 30
-AUTO_NEXT_HAND_DELAY = 4
-DISCONNECT_TIMEOUT = 20  # last_active 갱신 없으면 강퇴
-START_STACK = 60000
-REBUY_STACKS = [60000, 70000, 80000]  # 총 3엔트리
-
-RANKS = "23456789TJQKA"
-SUITS = ["♠", "♥", "♦", "♣"]
-DISPLAY_MAP = {"T": "10", "J": "J", "Q": "Q", "K": "K", "A": "A"}
+# 블라인드/타이머/리바인 등 규칙 상수와 진행 로직은 game.py
+HEARTBEAT_EVERY = 5.0  # 엔진에 하트비트 보내는 최소 주기 (DISCONNECT_TIMEOUT보다 충분히 짧게)
 
 
 # =========================
-# 3. CSS (사이드바/위젯 글씨 가독성 + 전체 테마)
+# 3. CSS (styles.py)
 # =========================
-st.markdown(
-    """
-<style>
-/* base */
-.stApp { background:#0f0f10; color:#fff; }
-.stApp > header { visibility:hidden; }
-div[data-testid="stStatusWidget"]{visibility:hidden;}
-div[data-testid="stDecoration"] {display:none;} /* 상단 빈 막대 제거 */
-footer {visibility:hidden;}
-
-/* ===== Sidebar 가독성 Fix ===== */
-section[data-testid="stSidebar"]{
-  background:#0f0f10 !important;
-  border-right:1px solid #222 !important;
-}
-section[data-testid="stSidebar"] *{
-  color:#ffffff !important;
-}
-section[data-testid="stSidebar"] input,
-section[data-testid="stSidebar"] textarea{
-  background:#151515 !important;
-  color:#ffffff !important;
-  border:1px solid #333 !important;
-}
-section[data-testid="stSidebar"] input::placeholder,
-section[data-testid="stSidebar"] textarea::placeholder{
-  color:#bdbdbd !important;
-}
-section[data-testid="stSidebar"] .stCaption,
-section[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] p{
-  color:#e0e0e0 !important;
-}
-
-/* Streamlit 기본 위젯 글씨 */
-label, .stMarkdown, .stCaption, .stText{
-  color:#fff !important;
-}
-div[data-baseweb="input"] input{
-  color:#fff !important;
-}
-
-/* 버튼 글씨가 안 보이는 문제 방지 */
-.stButton > button{
-  color:#000 !important;
-  font-weight:900 !important;
-}
-
-/* HUD */
-.hud-wrap{
-  display:flex; align-items:center; justify-content:space-between;
-  gap:12px; padding:10px 12px; border-radius:16px;
-  border:1px solid #2a2a2a; background: rgba(0,0,0,0.35);
-  margin-bottom: 10px;
-}
-.hud-left{ display:flex; gap:8px; flex-wrap:wrap; align-items:center; }
-.pill{
-  padding:6px 10px; border-radius:999px; font-weight:800; font-size:12px;
-  border:1px solid rgba(255,0,0,0.6);
-  background: rgba(255,0,0,0.12);
-  color:#ff4d4d;
-}
-.pill-white{
-  border:1px solid #2a2a2a; background:rgba(255,255,255,0.06);
-  color:#fff;
-}
-.timer-box{
-  min-width:120px; text-align:center;
-  padding:8px 12px; border-radius:14px;
-  border:1px solid rgba(255,235,59,0.35);
-  background: rgba(0,0,0,0.55);
-  color:#ffeb3b; font-weight:900; font-size:18px;
-}
-
-/* Table board */
-.game-board-container{
-  position:relative; width:100%;
-  min-height:520px; height: 72vh;
-  background:#151515; border-radius:22px;
-  border:2px solid #262626; overflow:hidden;
-}
-.poker-table{
-  position:absolute; top:50%; left:50%;
-  transform:translate(-50%,-50%);
-  width: 92%; height: 75%;
-  background: radial-gradient(#5d4037, #2b1a17);
-  border: 12px solid #1b0f0e;
-  border-radius: 160px;
-  box-shadow: inset 0 0 30px rgba(0,0,0,0.85);
-}
-.seat{
-  position:absolute; width:105px; height:115px;
-  background:#0f0f10; border:2px solid #3a3a3a;
-  border-radius:14px; color:white;
-  text-align:center; font-size:10px;
-  display:flex; flex-direction:column;
-  justify-content:center; align-items:center;
-  z-index:10;
-}
-.pos-0 {top:5%; right:20%;}
-.pos-1 {top:25%; right:3%;}
-.pos-2 {bottom:25%; right:3%;}
-.pos-3 {bottom:5%; right:20%;}
-.pos-4 {bottom:2%; left:50%; transform:translateX(-50%);}
-.pos-5 {bottom:5%; left:20%;}
-.pos-6 {bottom:25%; left:3%;}
-.pos-7 {top:25%; left:3%;}
-.pos-8 {top:5%; left:20%;}
-
-.hero-seat{ border:3px solid #ffeb3b; box-shadow:0 0 18px rgba(255,235,59,0.55); }
-.active-turn{ border:3px solid #ffeb3b !important; box-shadow:0 0 18px rgba(255,235,59,0.55); }
-
-.winner-seat{
-  border:3px solid #00e676 !important;
-  box-shadow:0 0 22px rgba(0,230,118,0.7);
-  animation: winnerPulse 0.9s ease-in-out infinite alternate;
-}
-@keyframes winnerPulse { from { transform: scale(1.0); } to { transform: scale(1.03); } }
-
-.role-badge{
-  position:absolute; top:-9px; left:-9px;
-  min-width:28px; height:28px;
-  padding:0 6px; border-radius:999px;
-  color:#000; font-weight:900; line-height:26px;
-  border:1px solid #111;
-  z-index:50; font-size:11px;
-  background:#fff;
-}
-.role-D { background:#ffeb3b; }
-.role-SB { background:#90caf9; }
-.role-BB { background:#ef9a9a; }
-.role-D-SB { background: linear-gradient(135deg, #ffeb3b 50%, #90caf9 50%); font-size:10px; }
-
-.action-badge{
-  position:absolute; bottom:-12px;
-  background:#ffeb3b; color:#000;
-  font-weight:900; padding:2px 6px;
-  border-radius:6px; font-size:10px;
-  border:1px solid #000;
-  z-index:50; white-space: nowrap;
-}
-.turn-timer{
-  position:absolute; top:-24px;
-  width:100%; text-align:center;
-  color:#ffeb3b; font-weight:900; font-size:12px;
-  z-index:60;
-}
-.card-span{
-  background:white; padding:2px 6px; border-radius:6px;
-  margin:1px; font-weight:900; font-size:18px;
-  color:black; border:1px solid #ccc; display:inline-block;
-}
-.comm-card-span{ font-size:30px !important; padding:4px 8px !important; }
-
-.fold-text{ color:#ff5252; font-weight:900; font-size:14px; }
-.folded-seat{ opacity:0.45; }
-
-.center-msg{
-  position:absolute; top:48%; left:50%;
-  transform:translate(-50%,-50%);
-  text-align:center; color:white; width:100%;
-}
-.center-msg h3{ margin:6px 0; font-size:22px; }
-.center-msg .phase{
-  display:inline-block;
-  padding:6px 10px;
-  background:rgba(0,0,0,0.65);
-  border:1px solid rgba(255,235,59,0.22);
-  border-radius:10px;
-  color:#ffeb3b;
-  font-weight:900;
-}
-.showdown-box{
-  margin-top:10px;
-  font-size:14px;
-  color:#fff;
-}
-.showdown-line{
-  margin:6px auto;
-  width: fit-content;
-  padding:6px 10px;
-  border-radius:12px;
-  background: rgba(0,0,0,0.55);
-  border: 1px solid rgba(255,255,255,0.12);
-}
-</style>
-""",
-    unsafe_allow_html=True,
-)
-
-
-# =========================
-# 4. Helpers (cards / hand eval)
-# =========================
-def r_str(r: str) -> str:
-    return DISPLAY_MAP.get(r, r)
-
-
-def make_card(card: str, big: bool = False) -> str:
-    if not card or len(card) < 2:
-        return "🂠"
-    color = "red" if card[1] in ["♥", "♦"] else "black"
-    cls = "card-span comm-card-span" if big else "card-span"
-    return f"<span class='{cls}' style='color:{color}'>{r_str(card[0])}{card[1]}</span>"
-
-
-def new_deck() -> List[str]:
-    deck = [r + s for r in RANKS for s in SUITS]
-    random.shuffle(deck)
-    return deck
-
-
-def init_players() -> List[Dict[str, Any]]:
-    players = []
-    for i in range(9):
-        players.append(
-            dict(
-                name="빈 자리",
-                seat=i + 1,
-                stack=0,
-                hand=[],
-                bet=0,
-                status="standby",  # standby/alive/folded
-                action="",
-                is_human=False,
-                role="",
-                has_acted=False,
-                rebuy_count=0,
-                last_active=0.0,
-                last_active_saved=0.0,  # DB 저장 빈도 제한용
-            )
-        )
-    return players
-
-
-def init_room_state(room_code: str) -> Dict[str, Any]:
-    return dict(
-        room_code=room_code,
-        players=init_players(),
-        pot=0,
-        deck=new_deck(),
-        community=[],
-        phase="WAITING",  # WAITING/PREFLOP/FLOP/TURN/RIVER/GAME_OVER
-        current_bet=0,
-        turn_idx=0,
-        dealer_idx=0,
-        level=1,
-        started_at=0.0,
-        hand_started_at=0.0,
-        turn_started_at=0.0,
-        game_over_at=0.0,
-        msg="플레이어를 기다리는 중... (최소 2명)",
-        showdown=[],
-        winners=[],
-    )
-
-
-# (원본 기반 족보)
-def get_hand_strength_detail(cards: List[str]) -> Tuple[int, List[int], str]:
-    if not cards or len(cards) < 5:
-        return (-1, [], "No Hand")
-
-    rank_map = {r: i for i, r in enumerate("..23456789TJQKA", 0)}
-    ranks = sorted([rank_map[c[0]] for c in cards], reverse=True)
-    suits = [c[1] for c in cards]
-
-    flush_suit = None
-    for s in ["♠", "♥", "♦", "♣"]:
-        if suits.count(s) >= 5:
-            flush_suit = s
-            break
-    is_flush = flush_suit is not None
-    flush_ranks = (
-        sorted([rank_map[c[0]] for c in cards if c[1] == flush_suit], reverse=True) if is_flush else []
-    )
-
-    def check_straight(unique_ranks: List[int]) -> Tuple[bool, int]:
-        for i in range(len(unique_ranks) - 4):
-            if unique_ranks[i] - unique_ranks[i + 4] == 4:
-                return True, unique_ranks[i]
-        if set([14, 5, 4, 3, 2]).issubset(set(unique_ranks)):
-            return True, 5
-        return False, -1
-
-    unique_ranks = sorted(list(set(ranks)), reverse=True)
-    is_straight, straight_high = check_straight(unique_ranks)
-
-    is_sf = False
-    sf_high = -1
-    if is_flush:
-        is_sf, sf_high = check_straight(flush_ranks)
-
-    from collections import Counter
-    counts = Counter(ranks)
-    sorted_counts = sorted(counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
-
-    def r_name(v: int) -> str:
-        return r_str("..23456789TJQKA"[v])
-
-    if is_sf:
-        return (8, [sf_high], f"스트레이트 플러시 ({r_name(sf_high)})")
-    if sorted_counts[0][1] == 4:
-        kicker = [r for r in ranks if r != sorted_counts[0][0]][0]
-        return (7, [sorted_counts[0][0], kicker], f"포카드 ({r_name(sorted_counts[0][0])})")
-    if sorted_counts[0][1] == 3 and sorted_counts[1][1] >= 2:
-        return (6, [sorted_counts[0][0], sorted_counts[1][0]], f"풀하우스 ({r_name(sorted_counts[0][0])}, {r_name(sorted_counts[1][0])})")
-    if is_flush:
-        return (5, flush_ranks[:5], f"플러시 ({r_name(flush_ranks[0])})")
-    if is_straight:
-        return (4, [straight_high], f"스트레이트 ({r_name(straight_high)})")
-    if sorted_counts[0][1] == 3:
-        kickers = sorted([r for r in ranks if r != sorted_counts[0][0]], reverse=True)[:2]
-        return (3, [sorted_counts[0][0]] + kickers, f"트리플 ({r_name(sorted_counts[0][0])})")
-    if sorted_counts[0][1] == 2 and sorted_counts[1][1] == 2:
-        kicker = [r for r in ranks if r != sorted_counts[0][0] and r != sorted_counts[1][0]][0]
-        return (2, [sorted_counts[0][0], sorted_counts[1][0], kicker], f"투페어 ({r_name(sorted_counts[0][0])}, {r_name(sorted_counts[1][0])})")
-    if sorted_counts[0][1] == 2:
-        kickers = sorted([r for r in ranks if r != sorted_counts[0][0]], reverse=True)[:3]
-        return (1, [sorted_counts[0][0]] + kickers, f"원페어 ({r_name(sorted_counts[0][0])}) - 킥 {r_name(kickers[0])}")
-    return (0, ranks[:5], f"하이카드 ({r_name(ranks[0])}, {r_name(ranks[1])})")
+st.markdown(styles.CSS, unsafe_allow_html=True)
 
 
 # =========================
 # 5. State I/O
 # =========================
-def load_room(room_code: str) -> Dict[str, Any]:
-    state = sb_room_get(room_code)
-    if state is None:
-        state = init_room_state(room_code)
-        sb_room_upsert(room_code, state)
-    return state
+# 화면은 읽기만 한다. room_store.shared_cache(프로세스 공용, TTL)를 거쳐서 세션끼리 한 번만 가져온다
+# 쓰기는 엔진(engine.py)이 poker_rooms.version 기반 CAS로 한다
+@st.cache_resource
+def get_store() -> RoomStore:
+    # 읽기용 저장소도 프로세스당 하나 (리런마다 새로 만들지 않는다)
+    return RoomStore(_supabase, init_room_json, on_commit=room_sync.shared_broker.publish)
 
 
-def save_room(room_code: str, state: Dict[str, Any]) -> None:
-    sb_room_upsert(room_code, state)
+store = get_store()
 
 
-# =========================
-# 6. Game flow
-# =========================
-def active_player_indices(players: List[Dict[str, Any]]) -> List[int]:
-    return [i for i, p in enumerate(players) if p["name"] != "빈 자리" and p["stack"] > 0]
+def on_remote_commit(room_code: str, version: int) -> None:
+    # 다른 프로세스가 저장함 → 캐시는 다음 읽기 때 이어 받고, 기다리는 세션은 깨운다
+    shared_cache.expire(room_code)
+    room_sync.shared_broker.publish(room_code, version)
 
 
-def find_next_alive(players: List[Dict[str, Any]], start_idx: int) -> int:
-    for k in range(1, 10):
-        j = (start_idx + k) % 9
-        if players[j]["status"] == "alive":
-            return j
-    return start_idx
+if SYNC_MODE == "postgres" and SYNC_DSN:
+    room_sync.ensure_listener(SYNC_DSN, on_remote_commit)
 
 
-def apply_blinds_and_deal(state: Dict[str, Any]) -> Dict[str, Any]:
-    players = state["players"]
-    alive_idxs = active_player_indices(players)
-    if len(alive_idxs) < 2:
-        state["phase"] = "WAITING"
-        state["started_at"] = 0.0
-        state["msg"] = "플레이어를 기다리는 중... (최소 2명)"
-        return state
+@st.cache_resource
+def get_engine() -> Union[GameEngine, EngineRouter]:
+    # 프로세스당 엔진 하나. 게임 진행(액션/타이머/강퇴/다음 핸드)은 전부 엔진이 한다
+    if ENGINE_WORKERS > 0:
+        # 워커가 저장하면 여기 캐시/대기 세션은 다른 프로세스 저장처럼 on_remote_commit으로 안다
+        return EngineRouter(
+            workers=ENGINE_WORKERS,
+            store_factory=partial(http_store, SUPABASE_URL, SUPABASE_ANON_KEY),
+            history_dir=HAND_HISTORY_DIR,
+            deck_secret=DECK_SECRET,
+            on_commit=on_remote_commit,
+        ).start()
+    dealing.set_server_key(DECK_SECRET)
+    engine_store = RoomStore(_supabase, init_room_json, on_commit=room_sync.shared_broker.publish)
+    history = HandHistory(HAND_HISTORY_DIR) if HAND_HISTORY_DIR else None
+    return GameEngine(engine_store, history=history).start()
 
-    now = time.time()
-    elapsed = max(0, now - state["started_at"])
-    lvl = min(len(BLIND_STRUCTURE), int(elapsed // LEVEL_DURATION) + 1)
-    sb_amt, bb_amt, ante_amt = BLIND_STRUCTURE[lvl - 1]
-    state["level"] = lvl
-
-    deck = new_deck()
-    pot = 0
-
-    # move dealer to next alive
-    cur_d = state["dealer_idx"]
-    new_d = cur_d
-    for k in range(1, 10):
-        j = (cur_d + k) % 9
-        if players[j]["name"] != "빈 자리" and players[j]["stack"] > 0:
-            new_d = j
-            break
-    state["dealer_idx"] = new_d
-
-    # reset players
-    for p in players:
-        if p["name"] != "빈 자리" and p["stack"] > 0:
-            p["status"] = "alive"
-            p["hand"] = [deck.pop(), deck.pop()]
-            if ante_amt > 0:
-                a = min(p["stack"], ante_amt)
-                p["stack"] -= a
-                pot += a
-        else:
-            p["status"] = "standby"
-            p["hand"] = []
-        p["bet"] = 0
-        p["action"] = ""
-        p["has_acted"] = False
-        p["role"] = ""
-
-    def next_active(idx: int) -> int:
-        for k in range(1, 10):
-            j = (idx + k) % 9
-            if players[j]["status"] == "alive":
-                return j
-        return idx
-
-    if len(alive_idxs) == 2:
-        sb_idx = new_d
-        bb_idx = next_active(sb_idx)
-        players[sb_idx]["role"] = "D-SB"
-        players[bb_idx]["role"] = "BB"
-        turn_start = sb_idx
-    else:
-        sb_idx = next_active(new_d)
-        bb_idx = next_active(sb_idx)
-        players[new_d]["role"] = "D"
-        players[sb_idx]["role"] = "SB"
-        players[bb_idx]["role"] = "BB"
-        turn_start = next_active(bb_idx)
-
-    # post blinds
-    if players[sb_idx]["status"] == "alive":
-        pay = min(players[sb_idx]["stack"], sb_amt)
-        players[sb_idx]["stack"] -= pay
-        players[sb_idx]["bet"] = pay
-        pot += pay
-
-    if players[bb_idx]["status"] == "alive":
-        pay = min(players[bb_idx]["stack"], bb_amt)
-        players[bb_idx]["stack"] -= pay
-        players[bb_idx]["bet"] = pay
-        pot += pay
-
-    state.update(
-        pot=pot,
-        deck=deck,
-        community=[],
-        phase="PREFLOP",
-        current_bet=bb_amt,
-        turn_idx=turn_start,
-        hand_started_at=now,
-        turn_started_at=now,
-        game_over_at=0.0,
-        msg=f"Level {lvl} 시작! (SB {sb_amt}/BB {bb_amt})",
-        showdown=[],
-        winners=[],
-    )
-    return state
-
-
-def start_if_ready(state: Dict[str, Any]) -> Dict[str, Any]:
-    alive_idxs = active_player_indices(state["players"])
-    if state["phase"] == "WAITING" and len(alive_idxs) >= 2:
-        state["started_at"] = time.time()
-        state = apply_blinds_and_deal(state)
-    return state
-
-
-def kick_disconnected(state: Dict[str, Any]) -> Dict[str, Any]:
-    now = time.time()
-    players = state["players"]
-    changed = False
-
-    for i, p in enumerate(players):
-        if p["name"] == "빈 자리":
-            continue
-        last = float(p.get("last_active", 0.0))
-        if last > 0 and (now - last) > DISCONNECT_TIMEOUT:
-            players[i] = dict(
-                name="빈 자리",
-                seat=i + 1,
-                stack=0,
-                hand=[],
-                bet=0,
-                status="standby",
-                action="",
-                is_human=False,
-                role="",
-                has_acted=False,
-                rebuy_count=0,
-                last_active=0.0,
-                last_active_saved=0.0,
-            )
-            changed = True
-
-    if changed:
-        alive_idxs = active_player_indices(players)
-        if len(alive_idxs) < 2:
-            state["phase"] = "WAITING"
-            state["started_at"] = 0.0
-            state["msg"] = "플레이어 퇴장으로 게임 중단. 대기 중... (최소 2명)"
-            state["current_bet"] = 0
-            state["pot"] = 0
-            state["community"] = []
-            state["showdown"] = []
-            state["winners"] = []
-    return state
-
-
-def pass_turn(state: Dict[str, Any]) -> None:
-    players = state["players"]
-    curr = state["turn_idx"]
-    for k in range(1, 10):
-        j = (curr + k) % 9
-        if players[j]["status"] == "alive" and players[j]["stack"] > 0:
-            state["turn_idx"] = j
-            state["turn_started_at"] = time.time()
-            return
-        if players[j]["status"] == "alive" and players[j]["stack"] == 0:
-            players[j]["has_acted"] = True
-    state["turn_started_at"] = time.time()
-
-
-def end_hand_all_fold(state: Dict[str, Any]) -> Dict[str, Any]:
-    alive = [p for p in state["players"] if p["status"] == "alive"]
-    if len(alive) == 1:
-        winner = alive[0]
-        winner["stack"] += state["pot"]
-        state["pot"] = 0
-        state["winners"] = [state["players"].index(winner)]
-        state["showdown"] = [{"name": winner["name"], "hole": winner["hand"], "desc": "전원 폴드"}]
-        state["msg"] = f"🏆 {winner['name']} 승리! (전원 폴드)"
-        state["phase"] = "GAME_OVER"
-        state["game_over_at"] = time.time()
-    return state
-
-
-def showdown_and_end(state: Dict[str, Any]) -> Dict[str, Any]:
-    players = state["players"]
-    alive_idxs = [i for i, p in enumerate(players) if p["status"] == "alive"]
-    best_rank = -1
-    best_tb: List[int] = []
-    winners: List[int] = []
-    showdown_lines = []
-
-    for i in alive_idxs:
-        p = players[i]
-        rank_val, tb, desc = get_hand_strength_detail(p["hand"] + state["community"])
-        showdown_lines.append({"name": p["name"], "hole": p["hand"], "desc": desc, "rank": rank_val, "tb": tb})
-        if rank_val > best_rank or (rank_val == best_rank and tb > best_tb):
-            best_rank = rank_val
-            best_tb = tb
-            winners = [i]
-        elif rank_val == best_rank and tb == best_tb:
-            winners.append(i)
-
-    split = state["pot"] // max(1, len(winners))
-    for i in winners:
-        players[i]["stack"] += split
-
-    state["pot"] = 0
-    state["winners"] = winners
-    winner_names = ", ".join(players[i]["name"] for i in winners)
-
-    win_desc = ""
-    for line in showdown_lines:
-        if line["name"] == players[winners[0]]["name"]:
-            win_desc = line["desc"]
-            break
-
-    state["showdown"] = [{"name": x["name"], "hole": x["hole"], "desc": x["desc"]} for x in showdown_lines]
-    state["msg"] = f"🏆 {winner_names} 승리! [{win_desc}]"
-    state["phase"] = "GAME_OVER"
-    state["game_over_at"] = time.time()
-    return state
-
-
-def check_phase_end(state: Dict[str, Any]) -> Dict[str, Any]:
-    players = state["players"]
-    alive = [p for p in players if p["status"] == "alive"]
-    if len(alive) <= 1:
-        return end_hand_all_fold(state)
-
-    target = state["current_bet"]
-    active = [p for p in players if p["status"] == "alive"]
-    all_acted = all(p["has_acted"] for p in active)
-    all_matched = all((p["bet"] == target) or (p["stack"] == 0) for p in active)
-
-    if not (all_acted and all_matched):
-        return state
-
-    deck = state["deck"]
-    if state["phase"] == "PREFLOP":
-        state["phase"] = "FLOP"
-        state["community"] = [deck.pop(), deck.pop(), deck.pop()]
-    elif state["phase"] == "FLOP":
-        state["phase"] = "TURN"
-        state["community"].append(deck.pop())
-    elif state["phase"] == "TURN":
-        state["phase"] = "RIVER"
-        state["community"].append(deck.pop())
-    elif state["phase"] == "RIVER":
-        return showdown_and_end(state)
-
-    state["current_bet"] = 0
-    for p in players:
-        p["bet"] = 0
-        p["has_acted"] = False
-        if p["status"] == "alive":
-            p["action"] = ""
-
-    dealer = state["dealer_idx"]
-    state["turn_idx"] = find_next_alive(players, dealer)
-    state["turn_started_at"] = time.time()
-    state["msg"] = f"{state['phase']} 시작!"
-    return state
-
-
-def force_timeout_fold(state: Dict[str, Any]) -> Dict[str, Any]:
-    players = state["players"]
-    idx = state["turn_idx"]
-    p = players[idx]
-    if p["status"] == "alive":
-        p["status"] = "folded"
-        p["has_acted"] = True
-        p["action"] = "시간초과"
-        state = check_phase_end(state)
-        if state["phase"] != "GAME_OVER":
-            pass_turn(state)
-    return state
-
-
-def auto_rebuy_if_bust(player: Dict[str, Any]) -> bool:
-    if player["stack"] > 0:
-        return False
-    if player["rebuy_count"] >= 2:
-        return False
-    player["rebuy_count"] += 1
-    player["stack"] = REBUY_STACKS[player["rebuy_count"]]
-    player["status"] = "folded"
-    player["action"] = f"자동 리바인 ({player['stack']:,})"
-    player["has_acted"] = True
+
+@st.cache_resource
+def start_metrics_export() -> Dict[str, Any]:
+    # 프로세스당 한 번. 포트가 이미 쓰이는 등 실패해도 화면은 계속
+    out: Dict[str, Any] = {}
+    try:
+        if METRICS_PORT:
+            out["server"] = metrics.serve(METRICS_PORT)
+        if METRICS_FILE:
+            out["file"] = metrics.FileSink(METRICS_FILE)
+    except OSError as e:
+        out["error"] = str(e)
+    return out
+
+
+@st.cache_resource
+def start_ws_api() -> Dict[str, Any]:
+    # 프로세스당 한 번. 엔진 루프에서 같이 돈다 (포트 충돌 등 실패해도 화면은 계속)
+    out: Dict[str, Any] = {}
+    if WS_PORT and ENGINE_WORKERS == 0 and _supabase is not None:
+        import ws_api  # websockets는 켤 때만
+
+        try:
+            out["server"] = ws_api.WsApi(get_engine(), port=WS_PORT).start()
+        except OSError as e:
+            out["error"] = str(e)
+    return out
+
+
+@st.cache_resource
+def warm_up() -> bool:
+    # 프로세스당 한 번: 판정기/에퀴티 표를 미리 올려 둔다 (첫 쇼다운/올인 화면이 멈추지 않게)
+    tables.get()
+    hand_eval.ensure_tables()
     return True
 
 
+start_metrics_export()
+start_ws_api()
+warm_up()
+
+
+def engine_call(action: str, *args: Any) -> Optional[int]:
+    return get_engine().call(room_code, action, *args)
+
+
 # =========================
 # 7. Sidebar: room + join + autorefresh toggle
 # =========================
@@ -749,114 +205,75 @@ if _supabase is None:
         st.caption(_sb_error)
     st.stop()
 
-state = load_room(room_code)
+state, state_version = store.load(room_code)
+_sw.lap("db_read")
+if state_version == 0:
+    # 읽기 실패 (삼킨 오류는 store.errors / last_error에 남는다)
+    st.warning("방 상태를 못 읽었어. 잠깐 뒤에 다시 시도해줘.")
+    if store.last_error:
+        st.caption(store.last_error)
 
 # =========================
 # 8. Join seat
 # =========================
-def ensure_join(state: Dict[str, Any], nickname: str) -> int:
-    players = state["players"]
-    for i, p in enumerate(players):
+def find_seat(state: Dict[str, Any], nickname: str) -> int:
+    for i, p in enumerate(state["players"]):
         if p["name"] == nickname:
-            p["is_human"] = True
             return i
+    return -1
 
-    target = -1
-    if players[4]["name"] == "빈 자리":
-        target = 4
-    else:
-        for i in range(9):
-            if players[i]["name"] == "빈 자리":
-                target = i
-                break
-
-    if target != -1:
-        players[target].update(
-            name=nickname,
-            stack=REBUY_STACKS[0],
-            hand=[],
-            bet=0,
-            status="folded",
-            action="관전 대기 중",
-            is_human=True,
-            role="",
-            has_acted=True,
-            rebuy_count=0,
-            last_active=time.time(),
-            last_active_saved=0.0,
-        )
-    return target
-
-
-if "my_seat" not in st.session_state:
-    seat = ensure_join(state, nickname)
-    st.session_state["my_seat"] = seat
-    save_room(room_code, state)
-    st.rerun()
 
 my_seat = int(st.session_state.get("my_seat", -1))
-players = state["players"]
-
-if my_seat < 0 or my_seat >= 9 or players[my_seat]["name"] != nickname:
-    seat = ensure_join(state, nickname)
+if my_seat < 0 or my_seat >= 9 or state["players"][my_seat]["name"] != nickname:
+    if state.get("tournament_id") and find_seat(state, nickname) < 0:
+        # 토너먼트 테이블 이동/깨짐 → 코디네이터가 배정한 새 테이블로 따라간다
+        moved_to = get_engine().tournament_table(state["tournament_id"], nickname)
+        if moved_to and moved_to != room_code:
+            st.session_state["room_code"] = moved_to
+            st.session_state.pop("my_seat", None)
+            st.rerun()
+        if not moved_to:
+            st.info("토너먼트 참가자가 아니거나 이미 탈락했어요.")
+            st.stop()
+    engine_call("join", nickname)
+    state, state_version = store.load(room_code)
+    seat = find_seat(state, nickname)
+    if seat < 0:
+        st.error("빈 자리가 없어요. 다른 방코드로 들어가 주세요.")
+        st.stop()
     st.session_state["my_seat"] = seat
-    save_room(room_code, state)
     st.rerun()
 
-# ✅ last_active는 "매번 저장"하지 말고, 5초에 1번만 DB에 반영
-now = time.time()
-me = players[my_seat]
-me["last_active"] = now
-
-dirty = False
-if (now - float(me.get("last_active_saved", 0.0))) >= 5.0:
-    me["last_active_saved"] = now
-    dirty = True
+_sw.lap("join")
 
 # =========================
-# 9. Kick disconnected + start
+# 9. Heartbeat (강퇴/게임 시작은 엔진이 판단)
 # =========================
-prev_phase = state["phase"]
-state = kick_disconnected(state)
-state = start_if_ready(state)
-
-# kick/start로 변경 있었을 수 있으니 저장
-dirty = True if state["phase"] != prev_phase else dirty
-if dirty:
-    save_room(room_code, state)
+now = time.time()
+if now - st.session_state.get("heartbeat_at", 0.0) >= HEARTBEAT_EVERY:
+    st.session_state["heartbeat_at"] = now
+    get_engine().heartbeat(room_code, my_seat, nickname)
+_sw.lap("heartbeat")
 
 # =========================
-# 10. Timers (여긴 "읽기"만. sleep/rerun 금지)
+# 10. Timers (여긴 "읽기"만. sleep/rerun/저장 금지)
 # =========================
 now = time.time()
 
 if state["phase"] == "WAITING":
-    level_left = 0
+    level_left = None
 else:
     elapsed = now - state["started_at"]
-    level_left = int(LEVEL_DURATION - (elapsed % LEVEL_DURATION))
+    level_left = LEVEL_DURATION - (elapsed % LEVEL_DURATION)
     state["level"] = min(len(BLIND_STRUCTURE), int(elapsed // LEVEL_DURATION) + 1)
 
-# 턴 타임아웃 처리(여긴 상태 변경이니 저장 필요)
+# 턴 타임아웃/다음 판은 엔진 타이머가 처리한다. 여기서는 남은 시간 표시만
+# (숫자는 브라우저 카운트다운이 줄이므로 이 값 때문에 리런할 필요는 없다)
 if state["phase"] not in ["WAITING", "GAME_OVER"]:
     time_left = max(0, TURN_TIMEOUT - (now - state["turn_started_at"]))
-    if time_left <= 0:
-        state = load_room(room_code)
-        state = force_timeout_fold(state)
-        save_room(room_code, state)
-        st.rerun()
 else:
     time_left = TURN_TIMEOUT
 
-# 게임오버 자동 다음판
-if state["phase"] == "GAME_OVER":
-    rem = int(AUTO_NEXT_HAND_DELAY - (now - state["game_over_at"]))
-    if rem <= 0:
-        state = load_room(room_code)
-        state = apply_blinds_and_deal(state)
-        save_room(room_code, state)
-        st.rerun()
-
 # =========================
 # 11. HUD
 # =========================
@@ -867,108 +284,29 @@ alive = [p for p in state["players"] if p["name"] != "빈 자리" and p["stack"]
 avg_stack = (sum(p["stack"] for p in alive) // len(alive)) if alive else 0
 players_in_room = len([p for p in state["players"] if p["name"] != "빈 자리"])
 players_label = f"Players {players_in_room}/9"
-timer_text = "--:--" if state["phase"] == "WAITING" else f"{level_left//60:02d}:{level_left%60:02d}"
-
-hud_html = f"""
-<div class="hud-wrap">
-  <div class="hud-left">
-    <span class="pill pill-white">LV {lvl}</span>
-    <span class="pill pill-white">{players_label}</span>
-    <span class="pill">SB {sb_amt:,}</span>
-    <span class="pill">BB {bb_amt:,}</span>
-    <span class="pill">Ante {ante_amt:,}</span>
-    <span class="pill">Avg {avg_stack:,}</span>
-  </div>
-  <div class="timer-box">{timer_text}</div>
-</div>
-"""
-st.markdown(hud_html, unsafe_allow_html=True)
+
+st.markdown(
+    hud_html(lvl, players_label, (sb_amt, bb_amt, ante_amt), avg_stack, level_left, LEVEL_DURATION),
+    unsafe_allow_html=True,
+)
+
+_sw.lap("hud")
 
 # =========================
 # 12. Main layout
 # =========================
 col_table, col_controls = st.columns([1.65, 1])
-winner_set = set(state.get("winners") or [])
 
-with col_table:
-    html = '<div class="game-board-container"><div class="poker-table"></div>'
-    comm = "".join([make_card(c, big=True) for c in state["community"]])
-    curr_idx = state["turn_idx"]
-
-    for i in range(9):
-        p = state["players"][i]
-        if p["name"] == "빈 자리":
-            html += f'<div class="seat pos-{i}" style="opacity:0.18;"><div>빈 자리</div></div>'
-            continue
-
-        active_cls = "active-turn" if (i == curr_idx and state["phase"] not in ["WAITING", "GAME_OVER"]) else ""
-        hero_cls = "hero-seat" if i == my_seat else ""
-        folded_cls = "folded-seat" if p["status"] == "folded" else ""
-        winner_cls = "winner-seat" if (state["phase"] == "GAME_OVER" and i in winner_set) else ""
-
-        timer_html = ""
-        if i == curr_idx and state["phase"] not in ["WAITING", "GAME_OVER"]:
-            timer_html = f"<div class='turn-timer'>{int(time_left)}s</div>"
-
-        cards = "<div style='font-size:16px;'>🂠 🂠</div>"
-        if p["status"] == "folded":
-            cards = "<div class='fold-text'>FOLD</div>"
-        else:
-            if i == my_seat or state["phase"] == "GAME_OVER":
-                if p["hand"]:
-                    cards = f"<div>{make_card(p['hand'][0])}{make_card(p['hand'][1])}</div>"
-                else:
-                    cards = ""
-
-        role = p.get("role", "")
-        role_cls = "role-D-SB" if role == "D-SB" else f"role-{role}"
-        role_div = f"<div class='role-badge {role_cls}'>{role}</div>" if role else ""
-
-        action = p.get("action", "")
-        html += (
-            f'<div class="seat pos-{i} {active_cls} {hero_cls} {folded_cls} {winner_cls}">'
-            f"{timer_html}{role_div}"
-            f"<div><b>{p['name']}</b></div>"
-            f"<div>{int(p['stack']):,}</div>"
-            f"{cards}"
-            f"<div class='action-badge'>{action}</div>"
-            "</div>"
-        )
 
-    showdown_html = ""
-    if state["phase"] == "GAME_OVER" and state.get("showdown"):
-        lines = []
-        for line in state["showdown"]:
-            hole = "".join([make_card(c) for c in line["hole"]]) if line.get("hole") else ""
-            lines.append(
-                f"<div class='showdown-line'><b>{line['name']}</b> {hole} "
-                f"<span style='color:#ffeb3b;font-weight:900;'>→ {line['desc']}</span></div>"
-            )
-        confetti = "🎉" * 10
-        showdown_html = f"""
-        <div class="showdown-box">
-          <div style="font-size:18px; font-weight:900; color:#00e676; margin-bottom:4px;">{confetti}</div>
-          {''.join(lines)}
-        </div>
-        """
-
-    msg_html = (
-        f"<div class='center-msg'>"
-        f"<div>{comm}</div>"
-        f"<h3>Pot: {state['pot']:,}</h3>"
-        f"<div class='phase'>{state['msg']}</div>"
-        f"{showdown_html}"
-        f"</div>"
-    )
-    html += msg_html + "</div>"
-    st.markdown(html, unsafe_allow_html=True)
+with col_table:
+    # 좌석/보드 조각은 render.py에서 화면에 보이는 값 기준으로 캐시된다
+    st.markdown(board_html(state, my_seat, equity.allin_equity(state), time_left, TURN_TIMEOUT), unsafe_allow_html=True)
 
 with col_controls:
     me = state["players"][my_seat]
 
     if st.button("⚠️ 서버 초기화(이 방)", use_container_width=True):
-        state = init_room_state(room_code)
-        save_room(room_code, state)
+        engine_call("reset")
         st.rerun()
 
     st.markdown("### 내 카드")
@@ -977,126 +315,125 @@ with col_controls:
     else:
         st.caption("아직 핸드 없음")
 
+    if state["phase"] in ["WAITING", "GAME_OVER"] and not state.get("tournament_id"):
+        # 봇(AI 몬스터)은 핸드 사이에만 앉히고 뺄 수 있다
+        bot_cols = st.columns(2)
+        if bot_cols[0].button("🤖 빈 자리 봇으로 채우기", use_container_width=True, key="btn_bots_fill"):
+            engine_call("bots_fill")
+            st.rerun()
+        if bot_cols[1].button("봇 내보내기", use_container_width=True, key="btn_bots_clear"):
+            engine_call("bots_clear")
+            st.rerun()
+
     if state["phase"] == "WAITING":
-        st.info("✋ 다른 플레이어 입장을 기다리는 중입니다. (최소 2명)")
+        st.info("✋ 다른 플레이어 입장을 기다리는 중입니다. (최소 2명, 봇으로 채워도 돼요)")
     else:
-        auto_rebuy_if_bust(me)
-
         curr_idx = state["turn_idx"]
         curr_p = state["players"][curr_idx]
 
-        if state["phase"] != "GAME_OVER" and curr_idx == my_seat and me["status"] == "alive":
+        if state["phase"] != "GAME_OVER" and curr_idx == my_seat and me["status"] == "alive" and me["stack"] > 0:
             to_call = max(0, state["current_bet"] - me["bet"])
-            st.success(f"내 차례! ({int(time_left)}초)")
+            st.markdown(
+                f"<div class='turn-note'>내 차례! {countdown_html(time_left, TURN_TIMEOUT, '')}</div>",
+                unsafe_allow_html=True,
+            )
 
             check_label = "체크" if to_call == 0 else f"콜 ({to_call:,})"
             if st.button(check_label, use_container_width=True, key="btn_call_check"):
-                state = load_room(room_code)
-                me = state["players"][my_seat]
-                to_call = max(0, state["current_bet"] - me["bet"])
-                pay = min(to_call, me["stack"])
-                me["stack"] -= pay
-                me["bet"] += pay
-                state["pot"] += pay
-                me["has_acted"] = True
-                me["action"] = "체크" if pay == 0 else f"콜({pay:,})"
-                state = check_phase_end(state)
-                if state["phase"] != "GAME_OVER":
-                    pass_turn(state)
-                save_room(room_code, state)
+                engine_call("call", my_seat)
                 st.rerun()
 
             c1, c2 = st.columns(2)
             if c1.button("폴드", type="primary", use_container_width=True, key="btn_fold"):
-                state = load_room(room_code)
-                me = state["players"][my_seat]
-                me["status"] = "folded"
-                me["has_acted"] = True
-                me["action"] = "폴드"
-                state = check_phase_end(state)
-                if state["phase"] != "GAME_OVER":
-                    pass_turn(state)
-                save_room(room_code, state)
+                engine_call("fold", my_seat)
                 st.rerun()
 
             if c2.button("🚨 ALL-IN", use_container_width=True, key="btn_allin"):
-                state = load_room(room_code)
-                me = state["players"][my_seat]
-                pay = me["stack"]
-                me["stack"] = 0
-                me["bet"] += pay
-                state["pot"] += pay
-                me["has_acted"] = True
-                me["action"] = f"올인({pay:,})"
-                if me["bet"] > state["current_bet"]:
-                    state["current_bet"] = me["bet"]
-                    for p in state["players"]:
-                        if p is not me and p["status"] == "alive" and p["stack"] > 0:
-                            p["has_acted"] = False
-                state = check_phase_end(state)
-                if state["phase"] != "GAME_OVER":
-                    pass_turn(state)
-                save_room(room_code, state)
+                engine_call("allin", my_seat)
                 st.rerun()
 
             st.markdown("---")
 
-            min_raise = max(bb_amt, state["current_bet"] * 2)
-            max_total = me["stack"] + me["bet"]
-            default_val = min(min_raise, max_total)
+            min_to, max_to = raise_bounds(lvl, state["current_bet"], me["bet"], me["stack"])
             step_val = 1000 if sb_amt >= 1000 else 100
 
             raise_to = st.number_input(
                 "레이즈(총액 기준)",
-                min_value=int(min(default_val, max_total)),
-                max_value=int(max_total),
-                value=int(default_val),
+                min_value=int(min_to),
+                max_value=int(max_to),
+                value=int(min_to),
                 step=int(step_val),
                 key="raise_to_input",
             )
 
             if st.button("레이즈 확정", use_container_width=True, key="btn_raise"):
-                state = load_room(room_code)
-                me = state["players"][my_seat]
-                raise_to = int(raise_to)
-                pay = raise_to - me["bet"]
-                pay = min(pay, me["stack"])
-                me["stack"] -= pay
-                me["bet"] += pay
-                state["pot"] += pay
-                state["current_bet"] = max(state["current_bet"], me["bet"])
-                me["has_acted"] = True
-                me["action"] = f"레이즈({me['bet']:,})"
-                for p in state["players"]:
-                    if p is not me and p["status"] == "alive" and p["stack"] > 0:
-                        p["has_acted"] = False
-                state = check_phase_end(state)
-                if state["phase"] != "GAME_OVER":
-                    pass_turn(state)
-                save_room(room_code, state)
+                engine_call("raise", my_seat, int(raise_to))
                 st.rerun()
 
         else:
             if state["phase"] == "GAME_OVER":
                 st.info("게임 종료! 곧 다음 판 시작…")
+                if state.get("deck_reveal"):
+                    # 시작 때 올린 덱 커밋과 지금 공개된 시드가 맞는지 (dealing.py 커밋-공개)
+                    fair = dealing.verify(state["deck_reveal"], state["deck_commit"], state["room_code"], state["hand_no"])
+                    st.caption(f"덱 커밋 {state['deck_commit'][:12]}… → 공개된 시드 {'✔ 일치' if fair else '✖ 불일치'}")
             else:
-                st.info(f"👤 {curr_p['name']} 대기 중… ({int(time_left)}s)")
+                st.info(f"👤 {curr_p['name']} 대기 중…")
+
+_sw.lap("render")
+_sw.total("app_rerun_seconds")
+
+# 지표 패널 (METRICS_TOKEN)
+if METRICS_TOKEN and hmac.compare_digest(str(st.query_params.get("admin", "")), METRICS_TOKEN):
+    with st.sidebar.expander("📈 지표 (p50 / p99)"):
+        rows = metrics.REGISTRY.summary()
+        st.dataframe([r for r in rows if r["p50_ms"] is not None], hide_index=True, use_container_width=True)
+        st.dataframe(
+            [{"metric": r["metric"], "value": r["n"]} for r in rows if r["p50_ms"] is None],
+            hide_index=True,
+            use_container_width=True,
+        )
+        if store.last_error:
+            st.caption(f"마지막 저장소 오류: {store.last_error}")
 
 # =========================
-# 13. Auto refresh (핵심: sleep/rerun 제거 + 폴링만)
+# 13. Refresh: 방 변경 푸시 대기 (poll 모드/푸시 불가 시 st_autorefresh 폴링)
 # =========================
+def next_wake_at() -> float:
+    """변경 알림이 없어도 다시 그려야 하는 가장 이른 시각"""
+    now = time.time()
+    # 하트비트는 화면 리런에서 보낸다 (턴 타임아웃/다음 판은 엔진이 저장 → 알림으로 깨어남)
+    # 턴/레벨 카운트다운은 브라우저가 줄이므로 그것 때문에 깨어날 필요는 없다
+    wake = st.session_state.get("heartbeat_at", now) + HEARTBEAT_EVERY
+    return max(wake + 0.05, now + 0.2)
+
+
 if auto_refresh:
-    # 너무 빠르면 클릭 씹힘/어두운 오버레이 생길 수 있어 → 적당히
     my_turn = (state["phase"] not in ["WAITING", "GAME_OVER"] and state["turn_idx"] == my_seat)
-    if state["phase"] == "WAITING":
-        interval_ms = 2500
-    elif my_turn:
-        interval_ms = 1800
+    push_ok = SYNC_MODE == "local" or (SYNC_MODE == "postgres" and SYNC_DSN)
+
+    if push_ok:
+        tick = st.empty()
+        room_sync.wait_for_change(
+            room_sync.shared_broker,
+            room_code,
+            state_version,
+            next_wake_at(),
+            on_tick=tick.empty,
+        )
+        st.rerun()
     else:
-        interval_ms = 1200
-
-    try:
-        from streamlit_autorefresh import st_autorefresh
-        st_autorefresh(interval=interval_ms, key="auto_refresh_tick")
-    except Exception:
-        st.sidebar.warning("자동 새로고침 모듈이 아직 반영 안 됐어. requirements.txt에 streamlit-autorefresh 확인!")
+        # 너무 빠르면 클릭 씹힘/어두운 오버레이 생길 수 있어 → 적당히
+        if state["phase"] == "WAITING":
+            interval_ms = 2500
+        elif my_turn:
+            interval_ms = 1800
+        else:
+            interval_ms = 1200
+
+        try:
+            from streamlit_autorefresh import st_autorefresh
+            with metrics.timer("app_stage_seconds", stage="autorefresh"):
+                st_autorefresh(interval=interval_ms, key="auto_refresh_tick")
+        except Exception:
+            st.sidebar.warning("자동 새로고침 모듈이 아직 반영 안 됐어. requirements.txt에 streamlit-autorefresh 확인!")
@@ -0,0 +1,331 @@
+"""봇(AI 몬스터) 플레이어
+
+빈 자리를 봇으로 채워 사람 한 명도 게임을 할 수 있게 한다. 봇 자리는
+is_human=False이고 하트비트/강퇴 대상이 아니다.
+
+결정은 엔진 턴 루프에서 한다. 봇 차례가 되면 엔진이 THINK_DELAY 뒤에 "bot"
+타이머를 걸고, 그때 decide()가 고른 액션(call/fold/raise/allin)을 사람 액션과
+같은 경로로 적용한다(핸드 기록에도 실제 액션으로 남는다). decide는 표 조회만
+하므로 수 us 안에 끝난다.
+
+- 프리플랍: 169개 핸드 클래스 차트. 표 파일(tables.py)의 무작위 상대 에퀴티를
+  (없으면 Chen 점수를) 콤보 수로 가중한 백분위(0~1)로 바꿔 모듈 로드 때 만든다.
+- 포스트플랍: (홀카드, 보드) → 강도 버킷(0~5). 플랍은 표 파일에서 바로 읽고,
+  턴/리버는 판정기 점수 + 드로우로 정해 lru_cache에 둔다. 버킷별 헤즈업 에퀴티
+  근사값에 상대 수를 반영한다.
+
+사람이 한 명도 없는 방은 다음 핸드를 돌리지 않는다(game.start_if_ready /
+next_hand_if_due). 봇만 남은 테이블이 엔진 루프를 차지하지 않게.
+
+    python bots.py [N]   # decide 지연 p50/p99 + 봇끼리 N핸드
+"""
+import random
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import game
+import hand_eval
+import tables
+from table_model import ALIVE, Room
+from tables import class_index
+
+THINK_DELAY = 0.8  # 봇 차례가 오고 액션하기까지 (사람이 화면에서 따라갈 수 있게)
+BOT_PREFIX = "🤖 "
+BOT_NAMES = ["고블린", "오크", "트롤", "오우거", "리치", "드래곤", "히드라", "키메라", "골렘"]
+IN_HAND = ("PREFLOP", "FLOP", "TURN", "RIVER")
+
+# 버킷별 헤즈업 에퀴티 근사 (0: 노핸드 ... 5: 스트레이트 이상/넛 근처)
+BUCKET_EQUITY = (0.12, 0.28, 0.45, 0.62, 0.78, 0.92)
+
+# (루즈함, 공격성) — 이름마다 고정
+Style = Tuple[float, float]
+STYLES: List[Style] = [(0.0, 0.3), (0.1, 0.5), (-0.1, 0.2), (0.15, 0.7), (0.05, 0.4)]
+
+Decision = Tuple[str, tuple]
+
+
+# =========================
+# 1. Preflop chart
+# =========================
+def _chen(hi: int, lo: int, suited: bool) -> float:
+    """Chen 점수 (rank 인덱스 0=2 ... 12=A)"""
+    top = {12: 10.0, 11: 8.0, 10: 7.0, 9: 6.0}.get(hi, (hi + 2) / 2)
+    if hi == lo:
+        return max(5.0, top * 2)
+    score = top + (2 if suited else 0)
+    gap = hi - lo - 1
+    score -= (0, 1, 2, 4)[gap] if gap < 4 else 5
+    if gap <= 1 and hi < 10:
+        score += 1
+    return score
+
+
+def _build_chart() -> List[float]:
+    classes = []
+    for hi in range(13):
+        for lo in range(hi + 1):
+            if hi == lo:
+                classes.append((13 * hi + hi, _chen(hi, lo, False), 6))
+            else:
+                classes.append((13 * hi + lo, _chen(hi, lo, True), 4))
+                classes.append((13 * lo + hi, _chen(hi, lo, False), 12))
+    classes.sort(key=lambda c: c[1])
+    chart = [0.0] * 169
+    below = 0
+    for idx, _, combos in classes:
+        chart[idx] = (below + combos / 2) / 1326
+        below += combos
+    return chart
+
+
+def _chart_from_tables(t: tables.Tables) -> List[float]:
+    """표 파일이 있으면 Chen 점수 대신 무작위 상대 에퀴티 순위로 같은 백분위"""
+    weights = [0] * 169
+    for idx in range(169):
+        hi, lo = idx // 13, idx % 13
+        weights[idx] = 6 if hi == lo else (4 if hi > lo else 12)
+    chart = [0.0] * 169
+    below = 0
+    for idx in sorted(range(169), key=lambda k: int(t.preflop_vs_random[k])):
+        chart[idx] = (below + weights[idx] / 2) / 1326
+        below += weights[idx]
+    return chart
+
+
+_TABLES = tables.get()
+PREFLOP_CHART = _chart_from_tables(_TABLES) if _TABLES is not None else _build_chart()
+
+
+def preflop_strength(hole: List[str]) -> float:
+    """0~1 백분위 (1 = AA)"""
+    return PREFLOP_CHART[class_index(hand_eval.card_to_int(hole[0]), hand_eval.card_to_int(hole[1]))]
+
+
+# =========================
+# 2. Postflop buckets
+# =========================
+def _board_category(board: Tuple[int, ...]) -> int:
+    if len(board) == 5:
+        return hand_eval.evaluate(board) >> 20
+    counts = sorted((sum(1 for c in board if c >> 2 == r) for r in {c >> 2 for c in board}), reverse=True)
+    if counts[0] == 4:
+        return 7
+    if counts[0] == 3:
+        return 3
+    if counts[0] == 2:
+        return 2 if len(counts) > 1 and counts[1] == 2 else 1
+    return 0
+
+
+@lru_cache(maxsize=65536)
+def postflop_bucket(hole: Tuple[int, int], board: Tuple[int, ...]) -> int:
+    """(홀카드, 보드) 정수 카드 → 0~5. 홀카드가 족보를 못 올리면(보드 플레이) 0~1"""
+    cards = hole + board
+    cat = hand_eval.evaluate(cards) >> 20
+    board_cat = _board_category(board)
+    ranks = [c >> 2 for c in board]
+    hole_ranks = [c >> 2 for c in hole]
+
+    if cat <= board_cat:
+        bucket = 1 if max(hole_ranks) == 12 else 0
+    elif cat >= 6:
+        bucket = 5
+    elif cat >= 4:
+        bucket = 5 if board_cat == 0 else 4
+    elif cat == 3 or (cat == 2 and board_cat == 0):
+        bucket = 4
+    else:
+        # 원페어(또는 보드 페어 + 내 페어): 내 페어 랭크로 탑페어/오버페어 여부
+        if hole_ranks[0] == hole_ranks[1]:
+            pair_rank = hole_ranks[0]
+        else:
+            pair_rank = max((r for r in hole_ranks if r in ranks), default=-1)
+        bucket = 3 if pair_rank >= max(ranks) else 2
+
+    if bucket <= 2 and len(board) < 5:
+        # 드로우: 플러시 4장 / 오픈엔디드(연속 4랭크)
+        suits = [c & 3 for c in cards]
+        flush_draw = any(suits.count(s) == 4 and (hole[0] & 3 == s or hole[1] & 3 == s) for s in range(4))
+        mask = 0
+        for r in {c >> 2 for c in cards}:
+            mask |= 1 << r
+        straight_draw = any((mask >> lo) & 0xF == 0xF for lo in range(9))
+        if flush_draw and straight_draw:
+            bucket = 3
+        elif flush_draw or straight_draw:
+            bucket = max(bucket, 2)
+    return bucket
+
+
+def strength_bucket(hole: Tuple[int, int], board: Tuple[int, ...]) -> int:
+    """플랍은 표 파일(tables.py)에서, 턴/리버(또는 표 없음)는 postflop_bucket"""
+    if len(board) == 3 and _TABLES is not None:
+        return _TABLES.flop(hole, board)
+    return postflop_bucket(hole, board)
+
+
+# =========================
+# 3. Decision
+# =========================
+@lru_cache(maxsize=128)
+def style_of(name: str) -> Style:
+    return STYLES[zlib.crc32(name.encode("utf-8")) % len(STYLES)]
+
+
+def is_bot(state: Room, seat: int) -> bool:
+    p = state.players[seat]
+    return p.occupied and not p.is_human
+
+
+def is_bot_turn(state: Room) -> bool:
+    return state.phase in IN_HAND and is_bot(state, state.turn_idx) and game.is_turn_of(state, state.turn_idx)
+
+
+def decide(state: Room, rng: Optional[random.Random] = None) -> Optional[Decision]:
+    """차례인 봇의 (액션, 인자). 봇 차례가 아니면 None"""
+    if not is_bot_turn(state):
+        return None
+    rng = rng or random
+    seat = state.turn_idx
+    me = state.players[seat]
+    loose, aggro = style_of(me.name)
+    bb = game.BLIND_STRUCTURE[state.level - 1][1]
+    to_call = max(0, state.current_bet - me.bet)
+    opponents = sum(1 for p in state.players if p.status == ALIVE) - 1
+
+    if state.phase == "PREFLOP":
+        eq = preflop_strength(me.hand) + loose
+        raise_at, call_at = 0.85, 0.45 + 0.05 * max(0, opponents - 2)
+        if to_call <= bb:
+            call_at -= 0.15
+    else:
+        hole = tuple(sorted(hand_eval.cards_to_ints(me.hand)))
+        board = tuple(sorted(hand_eval.cards_to_ints(state.community)))
+        heads_up = BUCKET_EQUITY[strength_bucket(hole, board)]
+        eq = heads_up ** (1 + 0.5 * max(0, opponents - 1)) + loose
+        pot_odds = to_call / (state.pot + to_call) if to_call else 0.0
+        raise_at, call_at = 0.7, pot_odds + 0.05
+
+    r = rng.random()
+    if eq >= raise_at and r < 0.5 + aggro:
+        min_to, max_to = game.raise_bounds(state.level, state.current_bet, me.bet, me.stack)
+        target = max(min_to, state.current_bet + max(bb, int(state.pot * (0.5 + aggro))))
+        if target >= max_to:
+            return "allin", (seat,)
+        return "raise", (seat, target)
+    if to_call == 0:
+        if r < 0.08 * aggro:
+            # 가끔 블러프 벳 (최소 레이즈)
+            return "raise", (seat, game.raise_bounds(state.level, state.current_bet, me.bet, me.stack)[0])
+        return "call", (seat,)
+    if eq >= call_at or (to_call <= bb and r < 0.1 + loose):
+        if to_call >= me.stack:
+            return "allin", (seat,)
+        return "call", (seat,)
+    return "fold", (seat,)
+
+
+APPLY = {
+    "call": game.act_call_check,
+    "fold": game.act_fold,
+    "raise": game.act_raise,
+    "allin": game.act_allin,
+}
+
+
+def act(state: Room, rng: Optional[random.Random] = None) -> Optional[Room]:
+    """decide + 적용 (도구/시뮬레이터용. 엔진은 decide 결과를 액션으로 넣는다)"""
+    d = decide(state, rng)
+    if d is None:
+        return None
+    op, args = d
+    return APPLY[op](state, *args)
+
+
+# =========================
+# 4. Seats
+# =========================
+def fill_seats(state: Room, count: int = game.NUM_SEATS) -> Optional[Room]:
+    """빈 자리에 봇을 count명까지 앉힌다. 핸드 진행 중이면 None (다음 핸드 사이에)"""
+    if state.phase in IN_HAND or state.tournament_id:
+        return None
+    taken = {p.name for p in state.players if p.occupied}
+    names = [BOT_PREFIX + n for n in BOT_NAMES if BOT_PREFIX + n not in taken]
+    seated = 0
+    for p in state.players:
+        if seated >= count or not names:
+            break
+        if not p.occupied:
+            p.sit(names.pop(0), game.REBUY_STACKS[0], False)
+            seated += 1
+    if not seated:
+        return None
+    return game.start_if_ready(state)
+
+
+def clear_seats(state: Room) -> Optional[Room]:
+    """봇 자리를 전부 비운다. 핸드 진행 중이면 None"""
+    if state.phase in IN_HAND:
+        return None
+    bots = [p for p in state.players if p.occupied and not p.is_human]
+    if not bots:
+        return None
+    for p in bots:
+        p.vacate()
+    if len(game.active_player_indices(state.players)) < 2:
+        game.wait_for_players(state)
+    return state
+
+
+# =========================
+# 5. Self-check
+# =========================
+if __name__ == "__main__":
+    import sys
+    import time
+
+    import dealing
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    rng = random.Random(0)
+    dealing.set_master(0)
+    hand_eval.ensure_tables()
+    room = game.init_room_state("bots")
+    room.players[0].sit("human", game.REBUY_STACKS[0], True)
+    fill_seats(room)
+
+    lat: List[int] = []
+    counts: Dict[str, int] = {}
+    hands = 0
+    t0 = time.perf_counter()
+    while hands < n:
+        if room.phase == "GAME_OVER":
+            hands += 1
+            room.game_over_at = 0.0
+            for p in room.players:
+                if p.occupied and p.stack <= 0:
+                    p.stack = game.START_STACK  # 자체 확인용: 칩 다 잃은 자리도 계속
+            game.next_hand_if_due(room)
+            continue
+        if game.needs_runout(room):
+            game.runout_step(room)
+            continue
+        # 사람 자리도 봇 정책으로 대신 둔다
+        room.players[0].is_human = False
+        t1 = time.perf_counter_ns()
+        d = decide(room, rng)
+        lat.append(time.perf_counter_ns() - t1)
+        room.players[0].is_human = True
+        if d is None:
+            game.timeout_now(room)
+            continue
+        counts[d[0]] = counts.get(d[0], 0) + 1
+        APPLY[d[0]](room, *d[1])
+    dt = time.perf_counter() - t0
+    lat.sort()
+    total = sum(counts.values())
+    print(f"hands {hands:,} in {dt:.2f}s  decisions {len(lat):,}")
+    print(f"decide p50 {lat[len(lat) // 2] / 1000:.1f} us  p99 {lat[int(len(lat) * 0.99)] / 1000:.1f} us  max {lat[-1] / 1000:.0f} us")
+    print("mix " + "  ".join(f"{k} {v / total:.0%}" for k, v in sorted(counts.items())))
+    print(f"tables {'loaded' if _TABLES is not None else '없음 (Chen 차트 + 계산)'}  bucket cache {postflop_bucket.cache_info()}")
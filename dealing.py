@@ -0,0 +1,244 @@
+"""카드 딜링 (핸드마다 시드를 둔 CSPRNG 스트림 + 필요한 만큼만 뽑는 덱)
+
+핸드마다 16바이트 시드 하나로 덱 순서가 정해진다. 시드를 키로 한 BLAKE2b를
+카운터 모드로 돌려 바이트 스트림을 만들고(블록당 64바이트), 그 스트림으로
+Fisher–Yates를 앞에서부터 "뽑을 때만" 한 칸씩 진행한다. 9인 핸드라도 실제로
+뽑는 카드는 홀 18장 + 보드 5장이 최대라 52장을 다 섞지 않는다.
+
+    deck = Deck(seed)           # 또는 Deck(seed, pos): pos장 뽑은 뒤부터 이어서
+    hole = deck.deal(2)         # hand_eval 카드 정수 (rank_idx*4 + suit_idx)
+    deck.pos                    # 지금까지 뽑은 장 수 (시드 + pos면 덱 상태가 전부)
+
+시드가 같으면 같은 순서가 나오므로 핸드 기록/감사/벤치에서 그대로 재현된다.
+프로세스 전역 random(Mersenne Twister)은 쓰지 않는다.
+
+커밋-공개 (공유 상태에는 시드가 없다)
+- 핸드마다 공개 nonce를 새로 뽑고(secrets, 재현 모드면 set_master에서 유도)
+  덱 시드 = BLAKE2b(키 = 서버 비밀 DECK_SECRET, nonce + 방 + 핸드 번호).
+  비밀은 서버(st.secrets)에만 있으므로 DB/화면에 있는 nonce로는 덱을 못 만든다.
+  엔진 프로세스끼리는 같은 비밀이면 시드를 따로 저장하지 않고도 이어 간다.
+- 방 상태에는 commitment(시드) = sha256 만 두고, 핸드가 끝나면 시드를 공개해
+  누구나 verify()로 "처음에 정한 덱 그대로였다"를 확인할 수 있다.
+
+bulk_deal은 시뮬레이터/에퀴티용: NumPy로 수천 개 셔플을 한 번에 만든다
+(PCG64라 암호학적이진 않다. 실제 게임 딜링에는 Deck을 쓴다).
+"""
+import hashlib
+import secrets
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SEED_BYTES = 16
+NONCE_BYTES = 8  # 공개 nonce는 핸드마다 겹치지만 않으면 된다 (비밀은 서버 키 쪽)
+DECK_SIZE = 52
+_BLOCK = 64  # blake2b 최대 출력
+
+# 재현 모드 마스터 시드 (None이면 핸드마다 OS CSPRNG)
+MASTER: Optional[bytes] = None
+# 덱 시드를 만드는 서버 비밀 (set_server_key). 없으면 프로세스마다 임시 키
+SERVER_KEY: Optional[bytes] = None
+
+
+class DeckError(Exception):
+    """저장된 커밋과 다시 만든 시드가 다르다 (서버 비밀이 바뀌었거나 상태가 깨짐)"""
+
+
+# =========================
+# 1. Seeds
+# =========================
+def set_master(seed: Union[None, int, str, bytes]) -> None:
+    """시뮬레이터/테스트용: 이후 nonce(와 서버 키가 없으면 키까지)를 seed에서 결정적으로 유도한다. None이면 해제"""
+    global MASTER
+    if seed is None:
+        MASTER = None
+    elif isinstance(seed, bytes):
+        MASTER = seed
+    else:
+        MASTER = hashlib.blake2b(str(seed).encode(), digest_size=SEED_BYTES).digest()
+
+
+def set_server_key(key: Union[None, str, bytes]) -> None:
+    """덱 시드용 서버 비밀. 여러 엔진 프로세스가 같은 방을 이어 받으려면 모두 같은 값이어야 한다"""
+    global SERVER_KEY
+    if key is None or key == "":
+        SERVER_KEY = None
+    else:
+        raw = key.encode() if isinstance(key, str) else key
+        SERVER_KEY = hashlib.blake2b(raw, digest_size=32, person=b"poker-key").digest()
+
+
+def server_key() -> bytes:
+    global SERVER_KEY
+    if SERVER_KEY is None:
+        if MASTER is not None:
+            SERVER_KEY = hashlib.blake2b(MASTER, digest_size=32, person=b"poker-key").digest()
+        else:
+            # 재시작하면 바뀐다 → 진행 중이던 핸드는 커밋이 안 맞아 무효 처리된다
+            SERVER_KEY = secrets.token_bytes(32)
+    return SERVER_KEY
+
+
+def hand_nonce(room_code: str, hand_no: int) -> bytes:
+    """이 핸드의 공개 nonce. 보통은 OS CSPRNG, set_master 후엔 (마스터, 방, 핸드)로 고정"""
+    if MASTER is None:
+        return secrets.token_bytes(NONCE_BYTES)
+    return hashlib.blake2b(
+        f"{room_code}\x00{hand_no}".encode(), key=MASTER, digest_size=NONCE_BYTES, person=b"poker-hand"
+    ).digest()
+
+
+def secret_seed(nonce: bytes, room_code: str, hand_no: int) -> bytes:
+    """덱 시드 = 서버 비밀로 키를 건 BLAKE2b(nonce, 방, 핸드). 서버 밖에서는 못 만든다"""
+    return hashlib.blake2b(
+        nonce + f"\x00{room_code}\x00{hand_no}".encode(), key=server_key(), digest_size=SEED_BYTES, person=b"poker-deck"
+    ).digest()
+
+
+def commitment(seed: bytes, room_code: str, hand_no: int) -> str:
+    """공유 상태에 두는 sha256 커밋 (hex). 방/핸드까지 묶어서 다른 핸드 시드로 바꿔치기 못 하게"""
+    return hashlib.sha256(seed + f"\x00{room_code}\x00{hand_no}".encode()).hexdigest()
+
+
+def verify(seed_hex: str, commit: str, room_code: str, hand_no: int) -> bool:
+    """핸드가 끝나고 공개된 시드가 시작 때 커밋과 같은지"""
+    try:
+        seed = bytes.fromhex(seed_hex)
+    except ValueError:
+        return False
+    return secrets.compare_digest(commitment(seed, room_code, hand_no), commit)
+
+
+# =========================
+# 2. Lazy deck
+# =========================
+class Deck:
+    """시드 하나로 정해지는 덱. 뽑는 만큼만 섞는다 (부분 Fisher–Yates)"""
+
+    __slots__ = ("seed", "pos", "_order", "_buf", "_off", "_block")
+
+    def __init__(self, seed: bytes, pos: int = 0):
+        self.seed = seed
+        self.pos = 0
+        self._order = bytearray(range(DECK_SIZE))
+        self._buf = b""
+        self._off = 0
+        self._block = 0
+        for _ in range(pos):
+            self.draw()
+
+    def _below(self, n: int) -> int:
+        """스트림에서 [0, n) 균등 정수 (2바이트씩, 나머지 편향은 버려서 없앤다)"""
+        limit = 65536 - 65536 % n
+        while True:
+            if self._off + 2 > len(self._buf):
+                self._buf = hashlib.blake2b(self._block.to_bytes(8, "little"), key=self.seed, digest_size=_BLOCK).digest()
+                self._block += 1
+                self._off = 0
+            v = self._buf[self._off] | (self._buf[self._off + 1] << 8)
+            self._off += 2
+            if v < limit:
+                return v % n
+
+    def draw(self) -> int:
+        i = self.pos
+        if i >= DECK_SIZE:
+            raise IndexError("deck exhausted")
+        order = self._order
+        j = i + self._below(DECK_SIZE - i)
+        order[i], order[j] = order[j], order[i]
+        self.pos = i + 1
+        return order[i]
+
+    def deal(self, n: int) -> List[int]:
+        return [self.draw() for _ in range(n)]
+
+    def remaining(self) -> List[int]:
+        """아직 안 뽑은 카드 전부, 뽑힐 순서대로 (기록/디버그용. 나머지를 다 섞는다)"""
+        rest = Deck(self.seed, self.pos)
+        return rest.deal(DECK_SIZE - self.pos)
+
+    def order(self) -> bytes:
+        """52장 전체 순서 (52바이트 순열)"""
+        full = Deck(self.seed)
+        return bytes(full.deal(DECK_SIZE))
+
+
+# =========================
+# 3. Bulk (simulator / equity)
+# =========================
+def bulk_deal(n: int, k: int = DECK_SIZE, rng: Any = None, cards: Optional[Sequence[int]] = None) -> "np.ndarray":
+    """(n, k) 배열: n번 섞은 덱 각각의 앞 k장. cards를 주면 그 카드들만 섞는다. rng는 Generator 또는 int 시드
+
+    k < 전체면 행마다 난수 키의 작은 k개 위치만 고르므로(argpartition) 전부 정렬하지 않는다.
+    이때 행 안의 순서는 정해져 있지 않다 (런아웃처럼 집합만 필요할 때).
+    """
+    import numpy as np  # 게임 딜링 경로(Deck)에는 numpy가 필요 없다
+
+    if rng is None or isinstance(rng, int):
+        rng = np.random.default_rng(rng)
+    pool = np.arange(DECK_SIZE, dtype=np.int64) if cards is None else np.asarray(cards, dtype=np.int64)
+    keys = rng.random((n, len(pool)))
+    if k >= len(pool):
+        pick = keys.argsort(axis=1)
+    else:
+        pick = keys.argpartition(k, axis=1)[:, :k]
+    return pool[pick]
+
+
+if __name__ == "__main__":
+    # 자체 확인: 재현성 / 이어 뽑기 / 순열 / 균등성 + 속도 비교
+    import random
+    import time
+
+    seed = bytes(range(SEED_BYTES))
+    a = Deck(seed)
+    first = a.deal(23)
+    assert first == Deck(seed).deal(23)
+    assert Deck(seed, 9).deal(14) == first[9:]
+    assert sorted(Deck(seed).order()) == list(range(DECK_SIZE))
+    assert list(Deck(seed).order()[:23]) == first
+    assert sorted(first + a.remaining()) == list(range(DECK_SIZE))
+
+    set_master(1)
+    assert hand_nonce("R", 5) == hand_nonce("R", 5) != hand_nonce("R", 6)
+    set_master(None)
+    assert hand_nonce("R", 5) != hand_nonce("R", 5)
+
+    set_server_key("test-secret")
+    nonce = hand_nonce("R", 5)
+    s5 = secret_seed(nonce, "R", 5)
+    c5 = commitment(s5, "R", 5)
+    assert secret_seed(nonce, "R", 5) == s5 and verify(s5.hex(), c5, "R", 5)
+    assert not verify(s5.hex(), c5, "R", 6) and not verify(secret_seed(nonce, "R", 6).hex(), c5, "R", 5)
+    set_server_key("other-secret")
+    assert secret_seed(nonce, "R", 5) != s5
+
+    # 첫 카드 분포 (카이제곱, 자유도 51에서 100 넘으면 사실상 편향)
+    n = 52_000
+    counts = [0] * DECK_SIZE
+    for k in range(n):
+        counts[Deck(k.to_bytes(SEED_BYTES, "little")).draw()] += 1
+    chi2 = sum((c - n / DECK_SIZE) ** 2 / (n / DECK_SIZE) for c in counts)
+    print(f"first-card chi2 {chi2:.1f} (df 51)")
+    assert chi2 < 100
+
+    hands = 20_000
+    t0 = time.perf_counter()
+    for k in range(hands):
+        Deck(secrets.token_bytes(SEED_BYTES)).deal(23)
+    lazy = (time.perf_counter() - t0) / hands
+    t0 = time.perf_counter()
+    for _ in range(hands):
+        deck = [r + s for r in "23456789TJQKA" for s in "shdc"]
+        random.shuffle(deck)
+        [deck.pop() for _ in range(23)]
+    old = (time.perf_counter() - t0) / hands
+    t0 = time.perf_counter()
+    bulk = bulk_deal(hands, 23, 0)
+    bulk_t = (time.perf_counter() - t0) / hands
+    assert bulk.shape == (hands, 23)
+    print(f"lazy Deck 23 cards  {lazy * 1e6:6.1f} us/hand")
+    print(f"random.shuffle str  {old * 1e6:6.1f} us/hand (이전 방식)")
+    print(f"bulk_deal x{hands:,}  {bulk_t * 1e6:6.2f} us/hand")
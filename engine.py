@@ -0,0 +1,707 @@
+"""서버 권한 게임 엔진 (asyncio)
+
+방 상태의 주인은 엔진 하나다. 화면(app.py)은 액션을 submit 하고 결과는
+저장소(캐시/푸시)로 읽기만 한다. 방마다 액션 큐와 워커 태스크가 있어서
+한 방의 액션/타이머는 순서대로 하나씩 적용되고, 적용 결과는 room_store에
+CAS로 저장된다.
+
+저장은 write-behind다. 액션은 메모리 상태에 바로 적용하고 방의 pending에
+쌓았다가, 큐가 비었을 때(액션 경계) 마지막 상태 하나만 CAS로 쓴다. 사람이
+누른 액션(URGENT_ACTIONS)은 바로, 타이머/봇/런아웃 같은 내부 액션은
+WRITE_WINDOW 동안 모아서 쓴다. 방마다 MIN_WRITE_INTERVAL(사람 액션은 제외), 프로세스 전체로
+WRITES_PER_SEC 토큰 버킷을 넘지 않게 미룬다. CAS가 충돌하면 저장소 head로
+다시 맞추고 모인 액션을 순서대로 재적용한다. 모인 액션/저장 수는 write_stats. 턴 타임아웃/다음 핸드/강퇴는 클라이언트 리런이 아니라
+엔진 타이머가 마감 시각에 큐에 넣는다.
+
+타이머는 방마다 call_later를 거는 대신 엔진 하나당 계층 타이밍 휠(timer_wheel.py)
+하나에 건다. 걸고 빼기가 O(1)이고, 루프에는 휠의 다음 찬 칸(next_at)에 깨우는 핸들
+하나만 걸린다 (타이머가 없으면 그것도 없음). 마감마다 한 번만 울리고 늦어도 한 틱(10ms).
+
+토너먼트(tournament.py) 코디네이터도 엔진이 들고 있다. 토너먼트 테이블의
+핸드 경계 액션(next_hand / mtt_release)에 예약된 이동을 넘기고, 저장된 경계
+결과(탈락자/이동자)를 코디네이터에 보고해 도착 테이블 큐에 "mtt_seat"를 넣는다.
+
+하트비트는 방 큐도 방 상태도 거치지 않고 엔진 공용 PresenceMap(presence.py)만
+갱신한다. 만료 타이머 하나가 가장 이른 마감에 깨어나 끊긴 자리만 "kick"으로
+해당 방 큐에 넣는다.
+
+봇 자리(bots.py)는 차례가 오면 "bot" 타이머가 THINK_DELAY 뒤에 결정을 넣는다.
+사람 자리와 같은 큐/CAS 경로라 봇 때문에 다른 방이 느려지지 않는다.
+
+history(hand_history.HandHistory)를 주면 적용할 때 기록을 만들어 두고(stage)
+저장에 성공하면 그 액션들의 핸드 기록을 남긴다.
+
+엔진 메모리의 방은 table_model.Room(__slots__) 객체이고, 저장할 때만
+to_state()로 dict를 만들어 마지막으로 저장한 dict와 diff 한다.
+
+같은 루프에서 도는 코드(ws_api의 WebSocket 서버)는 apply()로 스레드 왕복 없이
+액션을 넣고, add_listener()로 저장될 때마다 (방, version, 상태)를 받는다.
+
+Streamlit 서버 안에서는 st.cache_resource로 프로세스당 하나를 띄운다.
+"""
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import bots
+import game
+import metrics
+from hand_history import HandHistory
+from presence import PresenceMap
+from room_store import RoomStore
+from table_model import Room
+from timer_wheel import Timer, TimerWheel
+from tournament import Tournament
+
+ROOM_IDLE_UNLOAD = 300.0  # 빈 방은 이 시간 동안 액션이 없으면 내린다
+SUBMIT_TIMEOUT = 5.0
+
+# 쓰기 모으기 (write-behind)
+WRITE_WINDOW = 0.25  # 내부 액션(타이머/봇/런아웃)은 이만큼 모았다가 마지막 상태 한 번만 저장
+MIN_WRITE_INTERVAL = 0.1  # 한 방의 저장 사이 최소 간격
+WRITES_PER_SEC = 50.0  # 프로세스 전체 저장 속도 상한 (토큰 버킷). 호스팅 DB 요청 한도 아래로
+WRITE_BURST = 20
+MAX_BATCH = 32  # 이만큼 쌓이면 창이 안 끝났어도 저장
+
+State = Dict[str, Any]
+
+
+# =========================
+# 1. Actions
+# =========================
+def _join(state: Room, nickname: str) -> Optional[Room]:
+    if state.tournament_id and all(p.name != nickname for p in state.players):
+        # 토너먼트 테이블은 코디네이터가 배정한 사람만
+        return None
+    if game.ensure_join(state, nickname) < 0:
+        return None
+    return game.start_if_ready(state)
+
+
+def _kick(state: Room, targets: List[Tuple[int, str]]) -> Optional[Room]:
+    if state.tournament_id:
+        # 토너먼트 칩은 자리에 남는다 (끊겨도 시간초과 폴드로 진행)
+        return None
+    before = [p.occupied for p in state.players]
+    state = game.kick_seats(state, targets)
+    if [p.occupied for p in state.players] == before:
+        return None
+    return state
+
+
+# 이름 → (방, *args) -> 바뀐 방 / None(쓸 것 없음)
+ACTIONS: Dict[str, Callable[..., Optional[Room]]] = {
+    "join": _join,
+    "call": game.act_call_check,
+    "fold": game.act_fold,
+    "allin": game.act_allin,
+    "raise": game.act_raise,
+    "reset": game.reset_room,
+    "bots_fill": bots.fill_seats,
+    "bots_clear": bots.clear_seats,
+    # 아래는 엔진 타이머가 넣는 내부 액션
+    "timeout": game.timeout_if_due,
+    "next_hand": game.next_hand_if_due,
+    "runout": game.runout_step,
+    "kick": _kick,
+    "bot": bots.act,
+    "mtt_setup": game.setup_tournament_table,
+    "mtt_seat": game.seat_entrant,
+    "mtt_release": game.release_if_waiting,
+}
+# 토너먼트 테이블에서 코디네이터의 이동 예약을 인자로 받는 경계 액션
+BOUNDARY_ACTIONS = ("next_hand", "mtt_release")
+# 사람이 누른 액션: 큐가 비는 즉시(액션 경계) 저장. 나머지는 WRITE_WINDOW 동안 모은다
+URGENT_ACTIONS = ("join", "call", "fold", "allin", "raise", "reset", "bots_fill", "bots_clear")
+# 방 큐에만 들어가는 제어 항목: 여기까지 처리하고 모인 쓰기를 저장한 뒤 방을 내린다 (release)
+RELEASE = "_release"
+# 다른 엔진이 내려놓은 방을 맡는다: 저장소에서 불러와 타이머/presence를 다시 건다 (adopt)
+ADOPT = "_adopt"
+
+
+# =========================
+# 2. Rooms
+# =========================
+class Pending:
+    __slots__ = ("action", "args", "fut", "done")
+
+    def __init__(self, action: str, args: tuple, fut: Optional[asyncio.Future]):
+        self.action = action
+        self.args = args
+        self.fut = fut
+        # 적용됐으면 (실제 액션, 인자, 핸드 기록, 저장 후 할 일), 거절이면 None
+        self.done: Optional[Tuple[str, tuple, list, List[Callable[[], None]]]] = None
+
+
+class TokenBucket:
+    """초당 rate개, 최대 burst개까지 모이는 토큰"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.at = time.time()
+
+    def take(self, now: float) -> float:
+        """토큰 하나 쓰기. 0이면 바로, 아니면 기다려야 할 초 (그땐 안 쓴다)"""
+        self.tokens = min(self.burst, self.tokens + (now - self.at) * self.rate)
+        self.at = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class RoomRuntime:
+    def __init__(self, room_code: str):
+        self.room_code = room_code
+        self.state: Optional[Room] = None
+        # 마지막으로 저장한(= 저장소 head와 같은) dict. 다음 저장의 diff 기준
+        self.persisted: State = {}
+        self.version = 0
+        self.queue: "asyncio.Queue[Tuple[str, tuple, Optional[asyncio.Future]]]" = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.deadlines: Dict[str, float] = {}
+        self.timers: Dict[str, Timer] = {}
+        # 메모리에는 적용했지만 아직 저장 안 한 액션들 (다음 flush에서 한 번에 저장)
+        self.pending: List[Pending] = []
+        self.dirty = False  # pending 중 실제로 상태를 바꾼 게 있는지
+        self.flush_at = 0.0
+        self.last_write = 0.0
+        self.throttled = False  # 지금 pending이 속도 제한에 걸려 미뤄진 적 있는지
+
+    def seated(self) -> int:
+        # 봇 자리는 세지 않는다 (봇만 남은 방도 내린다)
+        if self.state is None:
+            return 0
+        return sum(1 for p in self.state.players if p.occupied and p.is_human)
+
+
+class GameEngine:
+    def __init__(
+        self, store: RoomStore, history: Optional[HandHistory] = None, writes_per_sec: float = WRITES_PER_SEC
+    ):
+        self.store = store
+        # 핸드 기록 (None이면 안 남김). 루프 스레드에서만 쓴다
+        self.history = history
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.rooms: Dict[str, RoomRuntime] = {}
+        self._thread: Optional[threading.Thread] = None
+        # (room_code, seat, nickname) → 하트비트 마감. 루프 스레드에서만 만진다
+        self.presence: PresenceMap[Tuple[str, int, str]] = PresenceMap(game.DISCONNECT_TIMEOUT)
+        self._reap_at = 0.0
+        self._reap_timer: Optional[Timer] = None
+        # 방 타이머 + 강퇴 타이머 전부. 루프에는 다음 틱 핸들 하나만 건다
+        self.wheel = TimerWheel()
+        self._tick_handle: Optional[asyncio.TimerHandle] = None
+        self._tick_at = 0.0
+        self.tick_wakeups = 0
+        self.tournaments: Dict[str, Tournament] = {}
+        self.applied = 0
+        self.timer_fired = 0
+        self.write_limiter = TokenBucket(writes_per_sec, WRITE_BURST)
+        # actions: 큐에서 꺼낸 액션 / writes: 저장(CAS) 성공 / merged: 자기 저장 없이 다른 액션과 같이 저장됨
+        # dropped: 거절돼 쓸 것 없음 / noop: 모아 보니 바뀐 게 없어 저장 생략 / throttled: 속도 제한에 걸려 미룬 저장
+        # conflicts: CAS 충돌로 다시 맞춘 횟수 / max_batch: 한 번에 저장한 최대 액션 수
+        self.write_stats: Dict[str, int] = dict.fromkeys(
+            ("actions", "writes", "merged", "dropped", "noop", "throttled", "conflicts", "max_batch"), 0
+        )
+        # 저장(CAS) 성공마다 (room_code, version, 저장된 상태)로 부른다. 루프 스레드에서, 받은 상태는 읽기만
+        self.listeners: List[Callable[[str, int, State], None]] = []
+        metrics.add_collector("engine", self._collect)
+
+    # ---------- lifecycle ----------
+    def start(self) -> "GameEngine":
+        """전용 스레드에서 이벤트 루프를 돌린다"""
+        if self._thread is not None:
+            return self
+        ready = threading.Event()
+
+        def run() -> None:
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            ready.set()
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="game-engine", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self.loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._flush_all(), self.loop).result(timeout=SUBMIT_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                pass
+            if self.history is not None:
+                self.loop.call_soon_threadsafe(self.history.close)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # ---------- API (아무 스레드에서나) ----------
+    def submit(self, room_code: str, action: str, *args: Any) -> "concurrent.futures.Future[Optional[int]]":
+        """액션을 방 큐에 넣는다. Future는 적용 후 저장된 version (실패/무시면 None)"""
+        if action not in ACTIONS:
+            raise ValueError(f"unknown action: {action}")
+        assert self.loop is not None, "engine not started"
+        return asyncio.run_coroutine_threadsafe(self._enqueue(room_code, action, args), self.loop)
+
+    def call(self, room_code: str, action: str, *args: Any, timeout: float = SUBMIT_TIMEOUT) -> Optional[int]:
+        try:
+            return self.submit(room_code, action, *args).result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            return None
+
+    def start_tournament(
+        self, tid: str, names: List[str], started_at: Optional[float] = None
+    ) -> Dict[str, List[str]]:
+        """참가자를 테이블(room_code = f"{tid}-tN")에 배정하고 시작. 배정표를 돌려준다"""
+        assert self.loop is not None, "engine not started"
+        coro = self._start_tournament(tid, names, time.time() if started_at is None else started_at)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout=SUBMIT_TIMEOUT)
+
+    def tournament_table(self, tid: str, nickname: str) -> Optional[str]:
+        t = self.tournaments.get(tid)
+        return t.table_of(nickname) if t is not None else None
+
+    def heartbeat(self, room_code: str, seat: int, nickname: str) -> None:
+        """접속 유지. 방 상태는 안 건드리고 presence만 갱신 (응답 없음)"""
+        assert self.loop is not None, "engine not started"
+        self.loop.call_soon_threadsafe(self._touch, room_code, seat, nickname)
+
+    def release(self, room_codes: List[str], timeout: float = SUBMIT_TIMEOUT) -> List[str]:
+        """방들을 내려놓는다 (다른 엔진이 맡기 전). 큐에 있던 것까지 적용·저장하고 메모리에서 뺀다.
+        실제로 올라와 있어서 내려놓은 방 코드만 돌려준다 (새 주인이 adopt 할 방)"""
+        assert self.loop is not None, "engine not started"
+        return asyncio.run_coroutine_threadsafe(self._release(room_codes), self.loop).result(timeout=timeout)
+
+    def adopt(self, room_codes: List[str], timeout: float = SUBMIT_TIMEOUT) -> int:
+        """release된 방들을 맡는다. 다음 액션을 기다리지 않고 바로 불러와 턴/봇/런아웃/다음 핸드
+        타이머와 앉은 사람 presence를 다시 건다 (안 그러면 봇 차례인 방은 영영 멈춘다). 맡은 방 수"""
+        assert self.loop is not None, "engine not started"
+        return asyncio.run_coroutine_threadsafe(self._adopt(room_codes), self.loop).result(timeout=timeout)
+
+    def add_listener(self, fn: Callable[[str, int, State], None]) -> None:
+        """저장 알림 구독 (ws_api 브로드캐스트 등). 오래 걸리는 일은 fn 안에서 태스크로 넘긴다"""
+        self.listeners.append(fn)
+
+    # ---------- API (루프 스레드 안에서, ws_api 등) ----------
+    async def apply(self, room_code: str, action: str, *args: Any) -> Optional[int]:
+        """submit과 같지만 루프 안 코루틴용 (스레드 왕복 없음)"""
+        if action not in ACTIONS:
+            raise ValueError(f"unknown action: {action}")
+        return await self._enqueue(room_code, action, args)
+
+    def touch(self, room_code: str, seat: int, nickname: str) -> None:
+        """heartbeat과 같지만 루프 안에서 바로 presence 갱신 (call_soon 왕복 없음)"""
+        self._touch(room_code, seat, nickname)
+
+    def committed(self, room_code: str) -> Optional[Tuple[State, int]]:
+        """마지막으로 저장된 (상태, version). 안 올라온 방이면 None. 읽기만"""
+        room = self.rooms.get(room_code)
+        if room is None or not room.persisted:
+            return None
+        return room.persisted, room.version
+
+    def live_state(self, room_code: str) -> Optional[Room]:
+        """큐에서 지금까지 적용된 메모리 상태 (아직 저장 전인 것 포함). 안 올라온 방이면 None. 읽기만"""
+        room = self.rooms.get(room_code)
+        return room.state if room is not None else None
+
+    # ---------- loop 안 ----------
+    def _room(self, room_code: str) -> RoomRuntime:
+        room = self.rooms.get(room_code)
+        if room is None:
+            room = self.rooms[room_code] = RoomRuntime(room_code)
+            room.task = asyncio.ensure_future(self._worker(room))
+        return room
+
+    async def _release(self, room_codes: List[str]) -> List[str]:
+        futs: Dict[str, asyncio.Future] = {}
+        for code in room_codes:
+            room = self.rooms.get(code)
+            if room is not None:
+                fut = asyncio.get_running_loop().create_future()
+                room.queue.put_nowait((RELEASE, (), fut))
+                futs[code] = fut
+        await asyncio.gather(*futs.values(), return_exceptions=True)
+        return list(futs)
+
+    async def _adopt(self, room_codes: List[str]) -> int:
+        futs = []
+        for code in room_codes:
+            fut = asyncio.get_running_loop().create_future()
+            self._room(code).queue.put_nowait((ADOPT, (), fut))
+            futs.append(fut)
+        res = await asyncio.gather(*futs, return_exceptions=True)
+        return sum(1 for r in res if not isinstance(r, BaseException))
+
+    async def _enqueue(self, room_code: str, action: str, args: tuple) -> Optional[int]:
+        fut = asyncio.get_running_loop().create_future()
+        await self._room(room_code).queue.put((action, args, fut))
+        return await fut
+
+    async def _sync(self, room: RoomRuntime) -> None:
+        room.persisted, room.version = await asyncio.to_thread(self.store.load, room.room_code)
+        room.state = Room.from_state(room.persisted)
+        room.dirty = False
+
+    async def _load(self, room: RoomRuntime) -> None:
+        await self._sync(room)
+        # 엔진이 (재)시작되면 하트비트가 다시 들어올 때까지 강퇴 유예
+        for i, p in enumerate(room.state.players):
+            if p.occupied and p.is_human:
+                self._touch(room.room_code, i, p.name)
+
+    async def _worker(self, room: RoomRuntime) -> None:
+        while True:
+            if room.pending and time.time() >= room.flush_at and (room.queue.empty() or len(room.pending) >= MAX_BATCH):
+                # 액션 경계(큐가 빔) + 창 끝 → 모인 것 한 번에 저장
+                await self._flush(room)
+                if room.state is not None:
+                    self._reschedule(room)
+                continue
+
+            if room.queue.empty():
+                wait = room.flush_at - time.time() if room.pending else ROOM_IDLE_UNLOAD
+                try:
+                    action, args, fut = await asyncio.wait_for(room.queue.get(), wait)
+                except asyncio.TimeoutError:
+                    if not room.pending and room.seated() == 0 and room.queue.empty():
+                        self._unload(room)
+                        return
+                    continue
+            else:
+                action, args, fut = room.queue.get_nowait()
+
+            if action == RELEASE:
+                # 앞선 액션은 다 적용됐다. 모인 쓰기만 저장하고 내린다 (타이머는 새 주인이 adopt 때 다시 건다)
+                if room.pending and room.state is not None:
+                    await self._flush(room, throttle=False)
+                self._unload(room)
+                while not room.queue.empty():
+                    _, _, late = room.queue.get_nowait()
+                    if late is not None and not late.done():
+                        late.set_exception(RuntimeError(f"room {room.room_code} released"))
+                fut.set_result(room.version)
+                return
+
+            try:
+                if room.state is None:
+                    await self._load(room)  # presence 유예도 여기서 (adopt면 옮겨 온 사람 자리)
+                if action == ADOPT:
+                    # 적용할 건 없다. 아래 _reschedule이 저장된 상태 기준으로 타이머를 건다
+                    fut.set_result(room.version)
+                else:
+                    self._stage(room, Pending(action, args, fut))
+            except Exception as e:
+                self._fail_pending(room, e)
+                if fut is not None and not fut.done():
+                    fut.set_exception(e)
+                # 저장소와 어긋났을 수 있으니 다음 액션 때 다시 읽는다
+                room.state = None
+            if room.state is not None:
+                self._reschedule(room)
+
+    def _step(self, room: RoomRuntime, p: Pending) -> None:
+        """액션 하나를 메모리 상태에 적용 (저장은 flush). 거절이면 상태를 적용 전으로 되돌린다"""
+        p.done = None
+        action, args = p.action, p.args
+        if action == "bot":
+            # 봇 결정을 실제 액션으로 바꿔서 적용 (기록/재시도도 그 액션 기준)
+            decision = bots.decide(room.state)
+            if decision is None:
+                return
+            action, args = decision
+        if action in BOUNDARY_ACTIONS and room.state.tournament_id:
+            args = (self._moves_for(room),)
+        # 조건 불충족이면 도중에 건드린 게 있을 수 있으니 되돌릴 기준 (안 모인 상태면 저장본)
+        before = room.state.to_state() if room.dirty else None
+        prev_hand, prev_phase = room.state.hand_no, room.state.phase
+        new = ACTIONS[action](room.state, *args)
+        if new is None:
+            room.state = Room.from_state(room.persisted if before is None else before)
+            return
+        room.state = new
+        room.dirty = True
+        records = self.history.stage(prev_hand, prev_phase, action, args, new) if self.history is not None else []
+        # 저장에 성공한 뒤 할 일. 값은 지금 것으로 잡아 둔다 (저장 전에 다음 액션이 상태를 바꿀 수 있음)
+        after: List[Callable[[], None]] = []
+        if action in BOUNDARY_ACTIONS and new.tournament_id:
+            busted, moved_out = list(new.busted), [tuple(m) for m in new.moved_out]
+            after.append(partial(self._tournament_boundary, room, new.tournament_id, busted, moved_out))
+        if action == "join":
+            # 입장만 하고 하트비트가 안 오는 자리도 강퇴되게
+            seat = next((i for i, q in enumerate(new.players) if q.name == args[0]), -1)
+            if seat >= 0:
+                after.append(partial(self._touch, room.room_code, seat, args[0]))
+        p.done = (action, args, records, after)
+
+    def _stage(self, room: RoomRuntime, p: Pending) -> None:
+        self.write_stats["actions"] += 1
+        with metrics.timer("engine_action_seconds", action=p.action):
+            self._step(room, p)
+        if p.done is None:
+            self.write_stats["dropped"] += 1
+            if not room.pending:
+                if p.fut is not None and not p.fut.done():
+                    p.fut.set_result(room.version)
+                return
+            # 앞에 안 저장된 액션이 있으면 그게 저장될 때 같이 응답 (그 상태 기준으로 거절된 것이므로)
+            room.pending.append(p)
+            return
+        if not room.pending:
+            room.flush_at = time.time() + WRITE_WINDOW
+        room.pending.append(p)
+        if p.done[0] in URGENT_ACTIONS:
+            # 사람 액션은 차례마다 하나라 방별 간격 없이 바로 (전체 토큰 버킷은 그대로 건다).
+            # 바로 앞 봇 저장 직후에 와도 MIN_WRITE_INTERVAL만큼 줄 서지 않게
+            room.flush_at = time.time()
+            return
+        if len(room.pending) >= MAX_BATCH:
+            room.flush_at = time.time()
+        room.flush_at = max(room.flush_at, room.last_write + MIN_WRITE_INTERVAL)
+
+    async def _flush(self, room: RoomRuntime, throttle: bool = True) -> None:
+        now = time.time()
+        if room.dirty and throttle:
+            wait = self.write_limiter.take(now)
+            if wait > 0:
+                if not room.throttled:
+                    self.write_stats["throttled"] += 1
+                    room.throttled = True
+                room.flush_at = now + wait
+                return
+        batch, room.pending = room.pending, []
+        room.throttled = False
+        mark = self.history.mark(room.room_code) if self.history is not None else None
+        t0 = time.perf_counter()
+        try:
+            version = await self._write(room, batch, mark)
+        except Exception as e:
+            version = e
+        metrics.observe("engine_flush_seconds", time.perf_counter() - t0)
+        if isinstance(version, Exception) or version is None:
+            if self.history is not None:
+                self.history.rollback(room.room_code, mark)
+            # 저장소와 어긋났을 수 있으니 다음 액션 때 다시 읽는다
+            room.state = None
+            room.dirty = False
+        for p in batch:
+            if p.fut is None or p.fut.done():
+                continue
+            if isinstance(version, Exception):
+                p.fut.set_exception(version)
+            else:
+                p.fut.set_result(version)
+
+    async def _write(self, room: RoomRuntime, batch: List[Pending], mark: Any) -> Optional[int]:
+        """모인 액션들의 마지막 상태를 CAS 한 번으로. 저장된 version / 재시도 다 실패면 None"""
+        for attempt in range(self.store.retries + 1):
+            if attempt > 0:
+                # 다른 프로세스가 먼저 썼다 → 저장소 head로 다시 맞추고 모인 액션을 순서대로 재적용
+                self.write_stats["conflicts"] += 1
+                await asyncio.sleep(random.uniform(0, 0.005 * attempt))
+                await self._sync(room)
+                if self.history is not None:
+                    self.history.rollback(room.room_code, mark)
+                for p in batch:
+                    self._step(room, p)
+            applied = [p for p in batch if p.done is not None]
+            if not applied:
+                return room.version
+            new_state = room.state.to_state()
+            if new_state == room.persisted:
+                # 모아 보니 제자리 (예: 봇 채우고 바로 비우기)
+                self.write_stats["noop"] += 1
+                room.dirty = False
+                return room.version
+            version = await asyncio.to_thread(
+                self.store.compare_and_swap, room.room_code, new_state, room.version, room.persisted
+            )
+            if version is None:
+                continue
+            room.persisted, room.version = new_state, version
+            room.dirty = False
+            room.last_write = time.time()
+            self.applied += len(applied)
+            self.write_stats["writes"] += 1
+            self.write_stats["merged"] += len(applied) - 1
+            self.write_stats["max_batch"] = max(self.write_stats["max_batch"], len(applied))
+            for p in applied:
+                action, args, records, after = p.done
+                if records:
+                    self.history.write(room.room_code, records)
+                for fn in after:
+                    fn()
+            for listener in self.listeners:
+                listener(room.room_code, version, new_state)
+            return version
+        return None
+
+    def _fail_pending(self, room: RoomRuntime, e: Exception) -> None:
+        """메모리 상태를 버릴 때: 안 저장된 액션은 실패로 응답"""
+        if self.history is not None and room.pending:
+            self.history.rollback(room.room_code, None)
+        for p in room.pending:
+            if p.fut is not None and not p.fut.done():
+                p.fut.set_exception(e)
+        room.pending = []
+        room.dirty = False
+
+    async def _flush_all(self) -> None:
+        """모아 둔 쓰기 전부 지금 저장 (종료할 때, 속도 제한 없이)"""
+        for room in list(self.rooms.values()):
+            if room.pending and room.state is not None:
+                await self._flush(room, throttle=False)
+
+    def _unload(self, room: RoomRuntime) -> None:
+        for h in room.timers.values():
+            h.cancel()
+        room.timers.clear()
+        self.rooms.pop(room.room_code, None)
+
+    # ---------- timers ----------
+    def _reschedule(self, room: RoomRuntime) -> None:
+        s = room.state
+        want: Dict[str, float] = {}
+        if s.phase == "GAME_OVER":
+            want["next_hand"] = s.game_over_at + game.AUTO_NEXT_HAND_DELAY
+        elif game.needs_runout(s):
+            want["runout"] = s.turn_started_at + game.RUNOUT_STEP_DELAY
+        elif s.phase != "WAITING":
+            want["timeout"] = s.turn_started_at + game.TURN_TIMEOUT
+            if bots.is_bot_turn(s):
+                want["bot"] = s.turn_started_at + bots.THINK_DELAY
+
+        for kind in list(room.deadlines):
+            if kind not in want:
+                room.timers.pop(kind).cancel()
+                del room.deadlines[kind]
+        for kind, at in want.items():
+            if room.deadlines.get(kind) == at:
+                continue
+            if kind in room.timers:
+                room.timers[kind].cancel()
+            room.deadlines[kind] = at
+            room.timers[kind] = self._schedule(at, self._fire, room, kind)
+
+    def _schedule(self, at: float, fn: Callable[..., None], *args: Any) -> Timer:
+        """휠에 건다. 걸어 둔 깨우기보다 이른 마감이면 다시 건다 (취소는 그대로 둠: 헛깨기 한 번)"""
+        t = self.wheel.schedule(at, fn, *args)
+        if self._tick_handle is None or at < self._tick_at:
+            self._arm_tick()
+        return t
+
+    def _arm_tick(self) -> None:
+        """휠의 다음 찬 칸(없으면 다음 cascade) 시각에 한 번 깨운다. 매 틱 깨우지 않는다"""
+        if self._tick_handle is not None:
+            self._tick_handle.cancel()
+            self._tick_handle = None
+        at = self.wheel.next_at()
+        if at is None:
+            return
+        self._tick_at = at
+        self._tick_handle = self.loop.call_later(max(0.0, at - time.time()), self._tick)
+
+    def _tick(self) -> None:
+        """마감 지난 타이머를 마감 순서로 울리고 다음 깨우기를 건다"""
+        self._tick_handle = None
+        self.tick_wakeups += 1
+        for t in self.wheel.advance(time.time()):
+            t.run()
+        if self._tick_handle is None:
+            self._arm_tick()
+
+    def _fire(self, room: RoomRuntime, kind: str) -> None:
+        room.timers.pop(kind, None)
+        room.deadlines.pop(kind, None)
+        if self.rooms.get(room.room_code) is not room:
+            return
+        self.timer_fired += 1
+        metrics.inc("engine_timers_total", kind=kind)
+        room.queue.put_nowait((kind, (), None))
+
+    # ---------- tournament ----------
+    async def _start_tournament(self, tid: str, names: List[str], started_at: float) -> Dict[str, List[str]]:
+        t = Tournament(tid, started_at)
+        plan = t.seat_all(names)
+        self.tournaments[tid] = t
+        for room_code, seated in plan.items():
+            entrants = [(name, t.start_stack) for name in seated]
+            self._room(room_code).queue.put_nowait(("mtt_setup", (tid, started_at, entrants), None))
+        return plan
+
+    def _moves_for(self, room: RoomRuntime) -> List[Tuple[str, str]]:
+        t = self.tournaments.get(room.state.tournament_id)
+        return t.moves_from(room.room_code) if t is not None else []
+
+    def _tournament_boundary(self, room: RoomRuntime, tid: str, busted: List[str], moved_out: List[tuple]) -> None:
+        """저장된 경계 결과(탈락자/이동자)를 코디네이터에 보고"""
+        t = self.tournaments.get(tid)
+        if t is None:
+            return
+        before = {src: list(ms) for src, ms in t.moves.items()}
+        orders = t.hand_boundary(room.room_code, busted, moved_out)
+        for dest, name, stack in orders:
+            self._room(dest).queue.put_nowait(("mtt_seat", (name, stack), None))
+        # 예약이 새로 생긴 출발 테이블(방금 경계를 지난 이 방 포함): 핸드가 안 돌고 있으면 바로 빼도록
+        for src, ms in t.moves.items():
+            if ms and (src == room.room_code or ms != before.get(src)):
+                self._room(src).queue.put_nowait(("mtt_release", (), None))
+
+    # ---------- presence ----------
+    def _touch(self, room_code: str, seat: int, nickname: str) -> None:
+        at = self.presence.touch((room_code, seat, nickname))
+        if self._reap_timer is None or at < self._reap_at:
+            self._arm_reaper()
+
+    def _arm_reaper(self) -> None:
+        if self._reap_timer is not None:
+            self._reap_timer.cancel()
+            self._reap_timer = None
+        at = self.presence.next_deadline()
+        if at is None:
+            return
+        self._reap_at = at
+        self._reap_timer = self._schedule(at, self._reap)
+
+    def _reap(self) -> None:
+        """마감 지난 자리만 방별로 모아 kick (좌석 전체 스캔 없음)"""
+        self._reap_timer = None
+        by_room: Dict[str, List[Tuple[int, str]]] = {}
+        for room_code, seat, nickname in self.presence.pop_expired():
+            by_room.setdefault(room_code, []).append((seat, nickname))
+        for room_code, targets in by_room.items():
+            room = self.rooms.get(room_code)
+            if room is not None:
+                self.timer_fired += 1
+                metrics.inc("engine_timers_total", kind="kick")
+                room.queue.put_nowait(("kick", (targets,), None))
+        self._arm_reaper()
+
+    # ---------- 읽기 ----------
+    def _collect(self) -> List[metrics.Sample]:
+        """metrics 내보내기용: 쓰기 모으기 통계 + 방/대기 수"""
+        out: List[metrics.Sample] = [
+            (f"engine_write_{k}_total", "counter", {}, v) for k, v in self.write_stats.items() if k != "max_batch"
+        ]
+        out.append(("engine_write_max_batch", "gauge", {}, self.write_stats["max_batch"]))
+        out.append(("engine_rooms", "gauge", {}, len(self.rooms)))
+        out.append(("engine_pending_actions", "gauge", {}, sum(len(r.pending) for r in list(self.rooms.values()))))
+        out.append(("engine_applied_total", "counter", {}, self.applied))
+        out.append(("engine_timers_pending", "gauge", {}, self.wheel.count))
+        out.append(("engine_timer_cascades_total", "counter", {}, self.wheel.cascaded))
+        out.append(("engine_timer_wakeups_total", "counter", {}, self.tick_wakeups))
+        return out
+
+    def snapshot(self, room_code: str) -> Optional[State]:
+        """엔진이 들고 있는 상태 사본 (디버그/도구용)"""
+        room = self.rooms.get(room_code)
+        if room is None or room.state is None:
+            return None
+        return room.state.to_state()
@@ -0,0 +1,474 @@
+"""엔진 샤딩 (워커 프로세스 여러 개 + 일관된 해시로 방 배치)
+
+GameEngine 하나는 프로세스 하나(GIL 하나)라 방이 수천 개가 되면 한 코어에서
+막힌다. EngineRouter는 워커 프로세스마다 GameEngine을 띄우고, 방을
+HashRing(워커마다 가상 노드 VNODES개)으로 정확히 한 워커에 배치한다. 그 방의
+메모리 상태/큐/타이머/presence는 그 워커에만 있다.
+
+    router = EngineRouter(workers=4, store_factory=partial(http_store, url, key)).start()
+    router.call("ABCD", "join", "alice")       # GameEngine과 같은 API
+    router.add_worker()                         # 방 1/(n+1) 정도만 옮겨 간다
+
+- 라우터 ↔ 워커는 multiprocessing 큐. 워커마다 요청 큐 하나, 응답은 공용 큐 하나
+  (라우터의 수신 스레드가 Future를 채운다). 메시지는 작은 튜플이라 피클이 싸다.
+- 토너먼트 테이블(f"{tid}-tN")은 tid로 해시해서 한 워커에 모인다 (테이블 이동/
+  코디네이터가 워커 안에서 끝나게). 시작한 토너먼트는 그 워커에 고정한다.
+- 워커 추가: 주인이 바뀌는 방만 옛 워커에 release(큐까지 적용·저장 후 내림)를
+  보내고, 내려놓은 방을 새 워커에 adopt(불러와서 타이머/presence 다시 걸기) 시킨 뒤
+  링을 바꾼다. 그동안 들어온 액션은 잠깐 기다렸다가 새 주인으로 간다.
+- 워커의 저장 알림(RoomStore.on_commit)은 라우터로 올라와 on_commit 콜백으로
+  나간다 → 화면 프로세스의 캐시 만료/푸시 (app.py on_remote_commit).
+- 워커 프로세스가 죽으면 그 워커로 간(또는 갈) 요청은 응답을 기다리지 않고
+  ClusterError로 끝난다. 시간 초과로 포기한 요청은 대기 목록에서 바로 뺀다.
+
+부하 시험: python -m tools.bench_cluster --rooms 5000 --workers 4
+"""
+import bisect
+import concurrent.futures
+import hashlib
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import metrics
+
+VNODES = 160
+CALL_TIMEOUT = 5.0
+# 수신 스레드가 워커 프로세스 생존을 확인하는 간격 (죽은 워커로 간 요청은 이 안에 실패)
+WATCH_EVERY = 1.0
+# 토너먼트 테이블 코드 (engine.start_tournament가 만드는 f"{tid}-tN")
+_MTT_TABLE = re.compile(r"^(.+)-t\d+$")
+
+StoreFactory = Callable[[Optional[Callable[[str, int], None]]], Any]
+
+
+# =========================
+# 1. Placement
+# =========================
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def placement_key(room_code: str) -> str:
+    """배치에 쓰는 키. 토너먼트 테이블은 tid (같은 토너먼트는 한 워커에)"""
+    m = _MTT_TABLE.match(room_code)
+    return m.group(1) if m else room_code
+
+
+class HashRing:
+    """일관된 해시. 노드 하나를 더하면 키의 약 1/(n+1)만 주인이 바뀐다"""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = VNODES):
+        self.vnodes = vnodes
+        self.nodes: List[str] = []
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for n in nodes:
+            self.add(n)
+
+    def add(self, node: str) -> None:
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for k in range(self.vnodes):
+            p = _hash(f"{node}#{k}")
+            i = bisect.bisect(self._points, p)
+            self._points.insert(i, p)
+            self._owners.insert(i, node)
+
+    def remove(self, node: str) -> None:
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        keep = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in keep]
+        self._owners = [o for _, o in keep]
+
+    def owner(self, key: str) -> str:
+        if not self._points:
+            raise LookupError("empty ring")
+        i = bisect.bisect(self._points, _hash(key))
+        return self._owners[i % len(self._owners)]
+
+    def copy(self) -> "HashRing":
+        ring = HashRing(vnodes=self.vnodes)
+        ring.nodes = list(self.nodes)
+        ring._points = list(self._points)
+        ring._owners = list(self._owners)
+        return ring
+
+
+# =========================
+# 2. Worker process
+# =========================
+def memory_store(on_commit: Optional[Callable[[str, int], None]] = None) -> Any:
+    """워커 프로세스 안 가짜 DB (부하 시험용. 워커끼리 공유 안 됨 → 방 옮기기 불가)"""
+    import game
+    from fake_supabase import FakeSupabase
+    from room_store import RoomCache, RoomStore
+
+    return RoomStore(FakeSupabase(), game.init_room_json, cache=RoomCache(), on_commit=on_commit)
+
+
+def http_store(url: str, key: str, on_commit: Optional[Callable[[str, int], None]] = None) -> Any:
+    """워커마다 PostgREST 커넥션 풀 하나 (운영/공유 가짜 DB)"""
+    import game
+    from room_store import RoomCache, RoomStore
+    from supabase_http import PostgrestClient
+
+    return RoomStore(PostgrestClient(url, key), game.init_room_json, cache=RoomCache(), on_commit=on_commit)
+
+
+def _apply_overrides(overrides: Dict[str, Any]) -> None:
+    # "module.NAME" → 값 (벤치가 게임 지연 등을 줄일 때. spawn이라 부모에서 바꾼 값이 안 넘어온다)
+    import importlib
+
+    for path, value in overrides.items():
+        module, _, name = path.rpartition(".")
+        setattr(importlib.import_module(module), name, value)
+
+
+def _worker_main(
+    name: str,
+    requests: "mp.Queue",
+    responses: "mp.Queue",
+    store_factory: StoreFactory,
+    history_dir: str,
+    deck_secret: str,
+    engine_kwargs: Dict[str, Any],
+    overrides: Dict[str, Any],
+) -> None:
+    import dealing
+    from engine import GameEngine
+    from hand_history import HandHistory
+
+    _apply_overrides(overrides)
+    dealing.set_server_key(deck_secret)
+    store = store_factory(lambda room_code, version: responses.put(("commit", room_code, version)))
+    # 세그먼트 파일은 프로세스 하나만 쓴다 → 워커별 하위 디렉터리
+    history = HandHistory(os.path.join(history_dir, name)) if history_dir else None
+    engine = GameEngine(store, history=history, **engine_kwargs).start()
+
+    def reply(rid: int, fut: "concurrent.futures.Future[Any]") -> None:
+        try:
+            responses.put(("res", rid, True, fut.result()))
+        except Exception as e:
+            responses.put(("res", rid, False, f"{type(e).__name__}: {e}"))
+
+    while True:
+        msg = requests.get()
+        kind = msg[0]
+        if kind == "submit":
+            _, rid, room_code, action, args = msg
+            try:
+                engine.submit(room_code, action, *args).add_done_callback(lambda f, rid=rid: reply(rid, f))
+            except Exception as e:
+                responses.put(("res", rid, False, f"{type(e).__name__}: {e}"))
+        elif kind == "heartbeat":
+            engine.heartbeat(*msg[1:])
+        elif kind == "rpc":
+            _, rid, method, args = msg
+            try:
+                if method == "stats":
+                    value: Any = {
+                        "rooms": len(engine.rooms),
+                        "applied": engine.applied,
+                        "timers": engine.timer_fired,
+                        **engine.write_stats,
+                    }
+                else:
+                    value = getattr(engine, method)(*args)
+                responses.put(("res", rid, True, value))
+            except Exception as e:
+                responses.put(("res", rid, False, f"{type(e).__name__}: {e}"))
+        elif kind == "stop":
+            engine.stop()
+            responses.put(("stopped", name))
+            return
+
+
+class Worker:
+    def __init__(self, name: str, process: Any, requests: "mp.Queue"):
+        self.name = name
+        self.process = process
+        self.requests = requests
+
+
+# =========================
+# 3. Router
+# =========================
+class ClusterError(Exception):
+    """워커 쪽에서 난 예외 (메시지만 넘어온다) 또는 워커 프로세스가 죽음"""
+
+
+class EngineRouter:
+    """GameEngine과 같은 API로 액션을 방 주인 워커에 넘긴다"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        store_factory: StoreFactory = memory_store,
+        history_dir: str = "",
+        deck_secret: str = "",
+        vnodes: int = VNODES,
+        engine_kwargs: Optional[Dict[str, Any]] = None,
+        overrides: Optional[Dict[str, Any]] = None,
+        on_commit: Optional[Callable[[str, int], None]] = None,
+    ):
+        self.n_start = workers
+        self.store_factory = store_factory
+        self.history_dir = history_dir
+        # 방이 워커를 옮겨도 진행 중 핸드의 덱을 다시 만들 수 있게 모든 워커가 같은 비밀을 쓴다
+        self.deck_secret = deck_secret or secrets.token_hex(32)
+        self.engine_kwargs = engine_kwargs or {}
+        self.overrides = overrides or {}
+        self.on_commit = on_commit
+        self.ring = HashRing(vnodes=vnodes)
+        self.workers: Dict[str, Worker] = {}
+        # 라우팅한 방 (워커 추가 때 옮길 후보) / 시작한 토너먼트 → 고정 워커
+        self.rooms: set = set()
+        self.pinned: Dict[str, str] = {}
+        self._ctx = mp.get_context("spawn")  # 스레드가 도는 부모에서 fork 하지 않는다
+        self._responses: "mp.Queue" = self._ctx.Queue()
+        # 요청 id → (Future, 보낸 시각, 워커 이름)
+        self._futures: Dict[int, Tuple["concurrent.futures.Future[Any]", float, str]] = {}
+        self._ids = itertools.count(1)
+        self._names = itertools.count(0)
+        # 주인 찾기 + 요청 큐에 넣기를 한 번에 (워커 추가 중엔 옮기는 방이 옛 주인에 안 가게)
+        self._route_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+        self.sent = 0
+        self.failed = 0
+
+    # ---------- lifecycle ----------
+    def start(self) -> "EngineRouter":
+        if self._reader is not None:
+            return self
+        self._reader = threading.Thread(target=self._read, name="cluster-router", daemon=True)
+        self._reader.start()
+        for _ in range(self.n_start):
+            worker = self._spawn()
+            with self._route_lock:
+                self.workers[worker.name] = worker
+                self.ring.add(worker.name)
+        metrics.add_collector("cluster", self._collect)
+        return self
+
+    def _spawn(self) -> Worker:
+        """워커 프로세스만 띄운다 (링/워커 목록에 넣는 건 부르는 쪽)"""
+        name = f"w{next(self._names)}"
+        requests = self._ctx.Queue()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            name=f"engine-{name}",
+            args=(
+                name,
+                requests,
+                self._responses,
+                self.store_factory,
+                self.history_dir,
+                self.deck_secret,
+                self.engine_kwargs,
+                self.overrides,
+            ),
+            daemon=True,
+        )
+        proc.start()
+        return Worker(name, proc, requests)
+
+    def stop(self, timeout: float = CALL_TIMEOUT) -> None:
+        for w in self.workers.values():
+            w.requests.put(("stop",))
+        deadline = time.time() + timeout
+        for w in self.workers.values():
+            w.process.join(max(0.0, deadline - time.time()))
+            if w.process.is_alive():
+                w.process.terminate()  # 저장 못 끝낸 쓰기는 다음 주인이 저장소 기준으로 다시 읽는다
+        self._responses.put(("quit",))
+        if self._reader is not None:
+            # 수신 스레드가 quit을 읽고 끝날 때까지 (바로 종료하면 큐를 닫는 중에 읽다가 예외)
+            self._reader.join(timeout)
+
+    def _read(self) -> None:
+        next_watch = time.monotonic() + WATCH_EVERY
+        while True:
+            if time.monotonic() >= next_watch:
+                self._fail_dead()
+                next_watch = time.monotonic() + WATCH_EVERY
+            try:
+                msg = self._responses.get(timeout=WATCH_EVERY)
+            except queue.Empty:
+                continue
+            kind = msg[0]
+            if kind == "res":
+                _, rid, ok, value = msg
+                entry = self._futures.pop(rid, None)
+                if entry is None:
+                    continue  # 이미 시간 초과로 포기했거나 워커가 죽어 실패 처리한 요청
+                fut, t0, _ = entry
+                metrics.observe("cluster_roundtrip_seconds", time.perf_counter() - t0)
+                if ok:
+                    fut.set_result(value)
+                else:
+                    self.failed += 1
+                    fut.set_exception(ClusterError(value))
+            elif kind == "commit":
+                if self.on_commit is not None:
+                    try:
+                        self.on_commit(msg[1], msg[2])
+                    except Exception:
+                        pass
+            elif kind == "quit":
+                return
+
+    # ---------- routing ----------
+    def owner(self, room_code: str) -> str:
+        key = placement_key(room_code)
+        return self.pinned.get(key) or self.ring.owner(key)
+
+    def _fail_dead(self) -> None:
+        """죽은 워커로 간 요청을 ClusterError로 끝낸다 (응답이 영영 안 온다)"""
+        dead = {name: w.process.exitcode for name, w in list(self.workers.items()) if not w.process.is_alive()}
+        if not dead:
+            return
+        for rid, (fut, _, name) in list(self._futures.items()):
+            if name in dead and self._futures.pop(rid, None) is not None:
+                self.failed += 1
+                fut.set_exception(ClusterError(f"worker {name} died (exitcode {dead[name]})"))
+
+    def _send(self, worker: Worker, msg_head: str, *body: Any) -> "concurrent.futures.Future[Any]":
+        rid = next(self._ids)
+        fut: "concurrent.futures.Future[Any]" = concurrent.futures.Future()
+        if not worker.process.is_alive():
+            self.failed += 1
+            fut.set_exception(ClusterError(f"worker {worker.name} died (exitcode {worker.process.exitcode})"))
+            return fut
+        self._futures[rid] = (fut, time.perf_counter(), worker.name)
+        worker.requests.put((msg_head, rid, *body))
+        self.sent += 1
+        return fut
+
+    def _result(self, fut: "concurrent.futures.Future[Any]", timeout: float) -> Any:
+        """fut.result(timeout). 시간이 지나면 대기 목록에서 빼고(늦은 응답은 버림) TimeoutError"""
+        try:
+            return fut.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            for rid, entry in list(self._futures.items()):
+                if entry[0] is fut:
+                    self._futures.pop(rid, None)
+                    break
+            raise
+
+    def _rpc(self, worker: Worker, method: str, *args: Any) -> "concurrent.futures.Future[Any]":
+        return self._send(worker, "rpc", method, args)
+
+    # ---------- API (GameEngine과 같은 모양) ----------
+    def submit(self, room_code: str, action: str, *args: Any) -> "concurrent.futures.Future[Optional[int]]":
+        with self._route_lock:
+            self.rooms.add(room_code)
+            return self._send(self.workers[self.owner(room_code)], "submit", room_code, action, args)
+
+    def call(self, room_code: str, action: str, *args: Any, timeout: float = CALL_TIMEOUT) -> Optional[int]:
+        try:
+            return self._result(self.submit(room_code, action, *args), timeout)
+        except concurrent.futures.TimeoutError:
+            return None
+
+    def heartbeat(self, room_code: str, seat: int, nickname: str) -> None:
+        with self._route_lock:
+            self.workers[self.owner(room_code)].requests.put(("heartbeat", room_code, seat, nickname))
+
+    def snapshot(self, room_code: str) -> Optional[Dict[str, Any]]:
+        with self._route_lock:
+            fut = self._rpc(self.workers[self.owner(room_code)], "snapshot", room_code)
+        return self._result(fut, CALL_TIMEOUT)
+
+    def start_tournament(self, tid: str, names: List[str], started_at: Optional[float] = None) -> Dict[str, List[str]]:
+        with self._route_lock:
+            worker = self.workers[self.owner(tid)]
+            self.pinned[tid] = worker.name
+            fut = self._rpc(worker, "start_tournament", tid, names, started_at)
+        plan = self._result(fut, CALL_TIMEOUT)
+        with self._route_lock:
+            self.rooms.update(plan)
+        return plan
+
+    def tournament_table(self, tid: str, nickname: str) -> Optional[str]:
+        with self._route_lock:
+            fut = self._rpc(self.workers[self.owner(tid)], "tournament_table", tid, nickname)
+        return self._result(fut, CALL_TIMEOUT)
+
+    # ---------- scaling ----------
+    def add_worker(self, timeout: float = 30.0) -> Dict[str, Any]:
+        """워커 하나 추가. 주인이 바뀌는 방만 옛 워커에서 저장·내린 뒤 넘긴다"""
+        t0 = time.perf_counter()
+        worker = self._spawn()
+        with self._route_lock:
+            new_ring = self.ring.copy()
+            new_ring.add(worker.name)
+            moving: Dict[str, List[str]] = {}
+            for code in self.rooms:
+                key = placement_key(code)
+                if key in self.pinned:
+                    continue
+                old, new = self.ring.owner(key), new_ring.owner(key)
+                if old != new:
+                    moving.setdefault(old, []).append(code)
+            futs = [self._rpc(self.workers[old], "release", codes, timeout) for old, codes in moving.items()]
+            # 라우트 락을 쥔 채 기다린다: 그동안 오는 액션은 새 링으로 간다
+            released = [code for f in futs for code in self._result(f, timeout)]
+            # 새 주인이 바로 불러와 타이머를 건다 (다음 액션을 기다리면 봇/타임아웃 차례인 방이 멈춘다).
+            # 보내기만 락 안에서: 결과(방 불러오기)는 락 밖에서 기다린다. 그 사이 들어온 액션과
+            # 순서가 엇갈려도 새 주인의 방 큐에서 한 줄로 처리된다
+            adopting = self._rpc(worker, "adopt", released, timeout)
+            self.workers[worker.name] = worker
+            self.ring = new_ring
+        adopted = self._result(adopting, timeout)
+        return {
+            "worker": worker.name,
+            "rooms": len(self.rooms),
+            "moved": sum(len(c) for c in moving.values()),
+            "codes": sorted(c for codes in moving.values() for c in codes),
+            "released": len(released),
+            "adopted": adopted,
+            "seconds": time.perf_counter() - t0,
+        }
+
+    # ---------- 읽기 ----------
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._route_lock:
+            futs = {name: self._rpc(w, "stats") for name, w in self.workers.items()}
+        return {name: self._result(f, CALL_TIMEOUT) for name, f in futs.items()}
+
+    def _collect(self) -> List[metrics.Sample]:
+        return [
+            ("cluster_workers", "gauge", {}, len(self.workers)),
+            ("cluster_rooms", "gauge", {}, len(self.rooms)),
+            ("cluster_inflight", "gauge", {}, len(self._futures)),
+            ("cluster_dead_workers", "gauge", {}, sum(1 for w in list(self.workers.values()) if not w.process.is_alive())),
+            ("cluster_sent_total", "counter", {}, self.sent),
+            ("cluster_failed_total", "counter", {}, self.failed),
+        ]
+
+
+if __name__ == "__main__":
+    # 자체 확인: 링 분포 / 노드 추가 시 옮겨지는 비율
+    keys = [f"room{k}" for k in range(50_000)]
+    for n in (2, 4, 8):
+        ring = HashRing(f"w{i}" for i in range(n))
+        before = {k: ring.owner(k) for k in keys}
+        counts: Dict[str, int] = {}
+        for o in before.values():
+            counts[o] = counts.get(o, 0) + 1
+        ring.add(f"w{n}")
+        moved = sum(1 for k in keys if ring.owner(k) != before[k])
+        spread = max(counts.values()) / (len(keys) / n)
+        print(f"{n} -> {n + 1} workers: moved {moved / len(keys):.1%} (ideal {1 / (n + 1):.1%}), max load x{spread:.2f}")
+        assert all(ring.owner(k) == f"w{n}" for k in keys if ring.owner(k) != before[k])
+    assert placement_key("cup-t3") == placement_key("cup-t12") == "cup"
@@ -0,0 +1,142 @@
+"""올인/HUD용 에퀴티 계산 (NumPy 배치)
+
+런아웃을 (N, k) 정수 배열로 한 번에 뽑고, hand_eval의 테이블을 배열로 옮긴
+배치 판정기로 점수를 매긴다. 남은 보드 조합 수가 샘플 수 이하이면
+(턴/리버, 대부분의 플랍) 몬테카를로 대신 전수 열거한다.
+"""
+import itertools
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import dealing
+import hand_eval
+import tables
+
+DEFAULT_SAMPLES = 4000
+
+_PRIMES = np.array(hand_eval.PRIMES, dtype=np.int64)
+_tables: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+
+def _np_tables() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    global _tables
+    if _tables is None:
+        t = tables.get()
+        if t is not None and "eval_flush" in t.arrays:
+            # 표 파일에 이미 정렬돼 있다 (dict → 배열 변환 생략)
+            _tables = (
+                t.arrays["eval_product_key"].astype(np.int64),
+                t.arrays["eval_product_score"].astype(np.int32),
+                t.arrays["eval_flush"].astype(np.int32),
+            )
+            return _tables
+        products = hand_eval.product_table()
+        keys = np.fromiter(sorted(products), dtype=np.int64, count=len(products))
+        vals = np.fromiter((products[k] for k in keys.tolist()), dtype=np.int32, count=len(products))
+        flush = np.array(hand_eval.flush_table(), dtype=np.int32)
+        _tables = (keys, vals, flush)
+    return _tables
+
+
+def evaluate_batch(cards: np.ndarray) -> np.ndarray:
+    """(N, 5~7) 정수 카드 배열 → (N,) 점수. hand_eval.evaluate와 같은 값"""
+    keys, vals, flush = _np_tables()
+    ranks = cards >> 2
+    suits = cards & 3
+
+    prod = _PRIMES[ranks].prod(axis=1)
+    score = vals[np.searchsorted(keys, prod)]
+
+    bits = np.left_shift(1, ranks)
+    for s in range(4):
+        mask = np.bitwise_or.reduce(np.where(suits == s, bits, 0), axis=1)
+        f = flush[mask]
+        score = np.where(f > 0, f, score)
+    return score
+
+
+def _runouts(remaining: np.ndarray, k: int, samples: int, rng: np.random.Generator) -> np.ndarray:
+    if k == 0:
+        return np.empty((1, 0), dtype=np.int64)
+    if math.comb(len(remaining), k) <= samples:
+        combos = list(itertools.combinations(range(len(remaining)), k))
+        return remaining[np.array(combos, dtype=np.int64)]
+    return dealing.bulk_deal(samples, k, rng, cards=remaining)
+
+
+def equity(
+    hands: Sequence[Sequence[str]],
+    community: Sequence[str],
+    dead: Sequence[str] = (),
+    samples: int = DEFAULT_SAMPLES,
+    seed: Optional[int] = None,
+) -> List[Tuple[float, float]]:
+    """핸드별 (승리%, 무승부%). hands는 각 2장, community는 0~5장"""
+    if len(hands) < 2:
+        return [(100.0, 0.0) for _ in hands]
+
+    holes = np.array([hand_eval.cards_to_ints(h) for h in hands], dtype=np.int64)
+    board = np.array(hand_eval.cards_to_ints(community), dtype=np.int64)
+    used = set(holes.ravel().tolist()) | set(board.tolist()) | set(hand_eval.cards_to_ints(dead))
+    remaining = np.array([c for c in range(52) if c not in used], dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    runs = _runouts(remaining, 5 - len(board), samples, rng)
+    n = len(runs)
+    full_board = np.concatenate([np.broadcast_to(board, (n, len(board))), runs], axis=1)
+
+    scores = np.empty((len(hands), n), dtype=np.int32)
+    for i, hole in enumerate(holes):
+        scores[i] = evaluate_batch(np.concatenate([np.broadcast_to(hole, (n, 2)), full_board], axis=1))
+
+    best = scores.max(axis=0)
+    is_best = scores == best
+    n_best = is_best.sum(axis=0)
+    win = (is_best & (n_best == 1)).sum(axis=1)
+    tie = (is_best & (n_best > 1)).sum(axis=1)
+    return [(100.0 * w / n, 100.0 * t / n) for w, t in zip(win.tolist(), tie.tolist())]
+
+
+@lru_cache(maxsize=256)
+def cached_equity(
+    hands: Tuple[Tuple[str, ...], ...],
+    community: Tuple[str, ...],
+    dead: Tuple[str, ...] = (),
+) -> Tuple[Tuple[float, float], ...]:
+    # 같은 올인 상황은 리런마다 다시 돌리지 않는다 (고정 seed라 화면 값도 안 흔들림)
+    t = tables.get()
+    if t is not None and len(hands) == 2 and not community and not dead:
+        # 프리플랍 헤즈업 올인은 미리 계산한 169 클래스 표에서 바로. 실제 무늬/빠진 카드가 아니라
+        # 클래스 안 무늬 조합 평균이라 근사값이다 (전수 열거는 1.7M 보드라 리런마다 돌리기엔 느리다)
+        a, b = (tables.class_index(*hand_eval.cards_to_ints(h)) for h in hands)
+        win_a, win_b, tie = t.matchup(a, b)
+        return ((win_a, tie), (win_b, tie))
+    return tuple(equity(hands, community, dead, seed=0))
+
+
+def allin_equity(state: Dict[str, Any]) -> Dict[int, Tuple[float, float]]:
+    """더 이상 베팅이 없는 올인 상황에서만 좌석별 (승리%, 무승부%)
+
+    game.needs_runout과 같은 조건: 칩 남은 사람이 한 명 이하이고 그 사람도 더 낼 게 없을 때.
+    콜할지 고민 중인 사람이 있으면 상대 홀카드로 만든 에퀴티를 보여 주면 안 된다.
+    보드가 없으면(프리플랍) 근사값이다 (표 평균 또는 몬테카를로). 플랍부터는 전수 열거.
+    """
+    if state["phase"] not in ["PREFLOP", "FLOP", "TURN", "RIVER"]:
+        return {}
+    players = state["players"]
+    live = [i for i, p in enumerate(players) if p["status"] == "alive" and len(p["hand"]) == 2]
+    with_chips = [i for i in live if players[i]["stack"] > 0]
+    if len(live) < 2 or len(with_chips) > 1:
+        return {}
+    if any(players[i]["bet"] < state["current_bet"] for i in with_chips):
+        return {}
+    dead = tuple(c for p in players if p["status"] == "folded" for c in p["hand"])
+    res = cached_equity(
+        tuple(tuple(players[i]["hand"]) for i in live),
+        tuple(state["community"]),
+        dead,
+    )
+    return dict(zip(live, res))
@@ -0,0 +1,287 @@
+"""로컬 가짜 Supabase (동시성 스트레스/오프라인 실행용)
+
+room_store가 쓰는 supabase-py 체인 API 부분집합만 흉내 낸다.
+모든 테이블 연산은 하나의 락 안에서 원자적으로 처리되고, 값은 JSON 왕복으로
+복사해서 jsonb처럼 참조가 공유되지 않게 한다. latency를 주면 execute()마다
+락 밖에서 잠깐 쉬어서 실제 네트워크처럼 요청이 엇갈린다.
+
+http_transport()는 같은 DB를 PostgREST HTTP 모양(/rest/v1/<table>?col=eq.v ...)으로
+흉내 내는 httpx 전송이다. supabase_http.PostgrestClient를 네트워크 없이 돌려 볼 때
+쓰고, 일정 비율로 503/연결 실패를 섞어 재시도 경로도 확인할 수 있다.
+serve()는 같은 처리를 진짜 로컬 HTTP 서버로 띄운다 (여러 프로세스가 DB 하나를 공유).
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+# 테이블별 기본키 (중복 insert는 23505처럼 실패)
+PRIMARY_KEYS: Dict[str, Tuple[str, ...]] = {
+    "poker_rooms": ("room_code",),
+    "poker_room_events": ("room_code", "version"),
+}
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class FakeResponse:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+def _copy(v: Any) -> Any:
+    return json.loads(json.dumps(v))
+
+
+class _Query:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.payload: Any = None
+        self.columns: Optional[List[str]] = None
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.order_by: Optional[Tuple[str, bool]] = None
+
+    # ----- builders -----
+    def select(self, columns: str = "*") -> "_Query":
+        self.op = "select"
+        self.columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, row: Dict[str, Any]) -> "_Query":
+        self.op, self.payload = "insert", row
+        return self
+
+    def upsert(self, row: Dict[str, Any]) -> "_Query":
+        self.op, self.payload = "upsert", row
+        return self
+
+    def update(self, fields: Dict[str, Any]) -> "_Query":
+        self.op, self.payload = "update", fields
+        return self
+
+    def delete(self) -> "_Query":
+        self.op = "delete"
+        return self
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        self.filters.append(("eq", column, value))
+        return self
+
+    def gt(self, column: str, value: Any) -> "_Query":
+        self.filters.append(("gt", column, value))
+        return self
+
+    def lt(self, column: str, value: Any) -> "_Query":
+        self.filters.append(("lt", column, value))
+        return self
+
+    def lte(self, column: str, value: Any) -> "_Query":
+        self.filters.append(("lte", column, value))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "_Query":
+        self.order_by = (column, desc)
+        return self
+
+    # ----- run -----
+    def _match(self, row: Dict[str, Any]) -> bool:
+        for op, col, val in self.filters:
+            v = row.get(col)
+            if op == "eq" and v != val:
+                return False
+            if op == "gt" and not (v is not None and v > val):
+                return False
+            if op == "lt" and not (v is not None and v < val):
+                return False
+            if op == "lte" and not (v is not None and v <= val):
+                return False
+        return True
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self.columns is None:
+            return _copy(row)
+        return {c: _copy(row.get(c)) for c in self.columns}
+
+    def _candidates(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # 기본키 첫 컬럼 eq 필터가 있으면 그 값의 행만 (방 수천 개 부하 시험에서 전체 스캔 방지)
+        pk = PRIMARY_KEYS.get(self.table, ())
+        if pk:
+            for op, col, val in self.filters:
+                if op == "eq" and col == pk[0]:
+                    return self.db.index(self.table).get(val, [])
+        return rows
+
+    def execute(self) -> FakeResponse:
+        if self.db.latency > 0:
+            time.sleep(self.db.latency)
+        with self.db.lock:
+            self.db.calls += 1
+            rows = self.db.tables.setdefault(self.table, [])
+            pk = PRIMARY_KEYS.get(self.table, ())
+
+            if self.op == "select":
+                found = [r for r in self._candidates(rows) if self._match(r)]
+                if self.order_by:
+                    col, desc = self.order_by
+                    found.sort(key=lambda r: r.get(col), reverse=desc)
+                return FakeResponse([self._project(r) for r in found])
+
+            if self.op == "delete":
+                gone = [r for r in self._candidates(rows) if self._match(r)]
+                if gone:
+                    ids = {id(r) for r in gone}
+                    rows[:] = [r for r in rows if id(r) not in ids]
+                    if pk:
+                        index = self.db.index(self.table)
+                        for r in gone:
+                            index[r.get(pk[0])].remove(r)
+                return FakeResponse([_copy(r) for r in gone])
+
+            if self.op in ("insert", "upsert"):
+                row = _copy(self.payload)
+                row.setdefault("updated_at", time.time())
+                if self.table == "poker_room_events":
+                    # schema.sql poker_room_events_guard: 스냅샷 version 이하는 거절
+                    snap = next(iter(self.db.index("poker_rooms").get(row.get("room_code"), [])), None)
+                    if snap is not None and row.get("version", 0) <= snap.get("version", 0):
+                        raise FakeAPIError("23505", "version already compacted")
+                key = tuple(row.get(c) for c in pk)
+                same = self.db.index(self.table).setdefault(key[0], []) if pk else []
+                for r in same:
+                    if tuple(r.get(c) for c in pk) == key:
+                        if self.op == "insert":
+                            raise FakeAPIError("23505", "duplicate key value violates unique constraint")
+                        r.update(row)  # 자리 그대로 (rows와 인덱스가 같은 dict를 가리킨다)
+                        return FakeResponse([_copy(r)])
+                rows.append(row)
+                if pk:
+                    same.append(row)
+                return FakeResponse([_copy(row)])
+
+            if self.op == "update":
+                out = []
+                for r in self._candidates(rows):
+                    if self._match(r):
+                        r.update(_copy(self.payload))
+                        r["updated_at"] = time.time()
+                        out.append(_copy(r))
+                return FakeResponse(out)
+
+        raise FakeAPIError("PGRST000", f"unsupported op {self.op}")
+
+
+class FakeSupabase:
+    def __init__(self, latency: float = 0.0):
+        self.lock = threading.Lock()
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        # 테이블별 기본키 첫 컬럼 값 → 행들 (tables와 같은 dict 객체)
+        self.indexes: Dict[str, Dict[Any, List[Dict[str, Any]]]] = {}
+        self.latency = latency
+        self.calls = 0
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def index(self, table: str) -> Dict[Any, List[Dict[str, Any]]]:
+        return self.indexes.setdefault(table, {})
+
+
+# =========================
+# PostgREST HTTP 흉내 (httpx 전송)
+# =========================
+_FILTER_OPS = ("eq", "gt", "lt", "lte")
+# URL 필터 값은 전부 문자열. 진짜 PostgREST는 컬럼 타입으로 바꾸므로 숫자 컬럼만 맞춰 준다
+_INT_COLUMNS = ("version",)
+
+
+def handle(db: FakeSupabase, request: httpx.Request) -> httpx.Response:
+    """PostgREST 요청 하나를 db에 적용해 응답 (http_transport / serve 공용)"""
+    q = db.table(request.url.path.rsplit("/", 1)[-1])
+    for key, raw in request.url.params.multi_items():
+        if key == "select":
+            q.select(raw)
+        elif key == "order":
+            col, _, direction = raw.partition(".")
+            q.order(col, desc=direction == "desc")
+        else:
+            op, _, val = raw.partition(".")
+            if op not in _FILTER_OPS:
+                return httpx.Response(400, json={"code": "PGRST100", "message": f"bad filter {raw}"})
+            getattr(q, op)(key, int(val) if key in _INT_COLUMNS else val)
+    body = json.loads(request.content) if request.content else None
+    if request.method == "POST":
+        prefer = request.headers.get("prefer", "")
+        (q.upsert if "merge-duplicates" in prefer else q.insert)(body)
+    elif request.method == "PATCH":
+        q.update(body)
+    elif request.method == "DELETE":
+        q.delete()
+    try:
+        res = q.execute()
+    except FakeAPIError as e:
+        return httpx.Response(409, json={"code": e.code, "message": e.message})
+    return httpx.Response(201 if request.method == "POST" else 200, json=res.data)
+
+
+def http_transport(
+    db: FakeSupabase, latency: float = 0.0, fail_rate: float = 0.0, seed: Optional[int] = None
+) -> httpx.MockTransport:
+    """db를 PostgREST처럼 응답하는 전송. fail_rate 비율로 503 또는 연결 실패"""
+    rng = random.Random(seed)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency > 0:
+            await asyncio.sleep(latency)
+        if fail_rate and rng.random() < fail_rate:
+            if rng.random() < 0.5:
+                raise httpx.ConnectError("fake connect failure", request=request)
+            return httpx.Response(503, json={"message": "fake unavailable"})
+        # 실제 처리는 락을 잡는 동기 코드라 루프를 막지 않게 스레드로
+        return await asyncio.to_thread(handle, db, request)
+
+    return httpx.MockTransport(handler)
+
+
+def serve(db: FakeSupabase, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """db를 진짜 로컬 HTTP로 (데몬 스레드). 여러 프로세스가 같은 가짜 DB를 쓸 때 (engine_cluster 부하 시험)
+
+    주소는 server.server_address. 클라이언트는 PostgrestClient(f"http://{host}:{port}", ...)
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive (PostgrestClient 풀이 연결을 다시 쓴다)
+
+        def _serve(self) -> None:
+            n = int(self.headers.get("Content-Length") or 0)
+            req = httpx.Request(
+                self.command, f"http://{host}{self.path}", headers=dict(self.headers), content=self.rfile.read(n)
+            )
+            res = handle(db, req)
+            body = res.content
+            self.send_response(res.status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _serve
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-postgrest", daemon=True).start()
+    return server
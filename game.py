@@ -0,0 +1,686 @@
+"""게임 규칙/진행 (Streamlit, Supabase와 무관한 순수 상태 변환)
+
+방 상태는 table_model.Room/Seat(__slots__) 객체로 다룬다. jsonb(dict) 모양과는
+저장소 경계에서만 바꾼다(Room.from_state / to_state). engine.py(서버 권한 엔진)와
+tools/simulate.py가 같이 쓴다.
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import dealing
+import hand_eval
+import metrics
+import pots
+from table_model import ALIVE, FOLDED, NUM_SEATS, STANDBY, Room, Seat
+
+# =========================
+# 1. Game config
+# =========================
+BLIND_STRUCTURE = [
+    (100, 200, 0),
+    (200, 400, 0),
+    (300, 600, 600),
+    (400, 800, 800),
+    (500, 1000, 1000),
+    (1000, 2000, 2000),
+    (2000, 4000, 4000),
+    (5000, 10000, 10000),
+]
+LEVEL_DURATION = 600
+TURN_TIMEOUT = 30
+AUTO_NEXT_HAND_DELAY = 4
+RUNOUT_STEP_DELAY = 1.5  # 전원 올인 후 스트리트 하나씩 까는 간격
+DISCONNECT_TIMEOUT = 20  # 이 시간 동안 하트비트 없으면 강퇴 (presence.py)
+START_STACK = 60000
+REBUY_STACKS = [60000, 70000, 80000]  # 총 3엔트리
+
+# 카드 인코딩과 같이 써야 하므로 판정기 쪽 정의를 그대로 쓴다
+RANKS = hand_eval.RANKS
+SUITS = hand_eval.SUITS
+DISPLAY_MAP = hand_eval.DISPLAY_MAP
+
+
+# =========================
+# 2. Room state
+# =========================
+def new_hand_deck(state: Room) -> dealing.Deck:
+    """이번 핸드 덱 (hand_no를 올린 뒤에 부른다). 상태에는 nonce와 커밋만 남는다"""
+    nonce = dealing.hand_nonce(state.room_code, state.hand_no)
+    seed = dealing.secret_seed(nonce, state.room_code, state.hand_no)
+    state.deck_nonce = nonce.hex()
+    state.deck_commit = dealing.commitment(seed, state.room_code, state.hand_no)
+    state.deck_pos = 0
+    state.deck_reveal = ""
+    state.deck_seed = seed.hex()
+    for key in ("deck", "deck_seed"):
+        state.extra.pop(key, None)
+    return dealing.Deck(seed)
+
+
+def deck_seed(state: Room) -> bytes:
+    """이번 핸드 시드 (서버에서만). 다시 만든 시드가 커밋과 다르면 DeckError"""
+    if state.deck_seed:
+        return bytes.fromhex(state.deck_seed)
+    if state.extra.get("deck_seed"):
+        # 시드를 방 상태에 그대로 두던 버전이 남긴 진행 중 핸드
+        return bytes.fromhex(state.extra["deck_seed"])
+    if not state.deck_commit:
+        raise dealing.DeckError("no deck for this hand")
+    seed = dealing.secret_seed(bytes.fromhex(state.deck_nonce), state.room_code, state.hand_no)
+    if dealing.commitment(seed, state.room_code, state.hand_no) != state.deck_commit:
+        raise dealing.DeckError("deck commitment mismatch (DECK_SECRET changed?)")
+    state.deck_seed = seed.hex()
+    return seed
+
+
+def draw_cards(state: Room, n: int) -> List[str]:
+    """이번 핸드 덱에서 n장 더. 시드 + 뽑은 수로 덱을 다시 세우므로 필요한 장만 섞는다"""
+    if "deck" in state.extra and not state.deck_commit:
+        # 남은 덱 목록을 저장하던 버전이 남긴 진행 중 핸드
+        legacy = state.extra["deck"] = list(state.extra["deck"] or [])
+        return [legacy.pop() for _ in range(n)]
+    deck = dealing.Deck(deck_seed(state), state.deck_pos)
+    cards = deck.deal(n)
+    state.deck_pos = deck.pos
+    return [hand_eval.CARD_STRS[c] for c in cards]
+
+
+def reveal_deck(state: Room) -> None:
+    """핸드 끝: 시드를 공개해 누구나 커밋과 맞춰 볼 수 있게 (dealing.verify)"""
+    if not state.deck_commit:
+        return
+    try:
+        state.deck_reveal = deck_seed(state).hex()
+    except dealing.DeckError:
+        state.deck_reveal = ""
+
+
+def void_hand(state: Room) -> Room:
+    """덱을 다시 만들 수 없는 핸드 (서버 비밀이 바뀐 채 재시작 등): 넣은 칩을 돌려주고 끝낸다"""
+    for p in state.players:
+        if p.occupied:
+            p.stack += p.contrib
+        p.contrib = 0
+        p.bet = 0
+    state.pot = 0
+    state.winners = []
+    state.showdown = []
+    state.msg = "⚠️ 덱을 복구할 수 없어 이번 핸드는 무효 (칩 반환)"
+    state.phase = "GAME_OVER"
+    state.game_over_at = time.time()
+    return state
+
+
+def init_players() -> List[Seat]:
+    return [Seat(i + 1) for i in range(NUM_SEATS)]
+
+
+def init_room_state(room_code: str) -> Room:
+    state = Room(room_code)
+    state.msg = "플레이어를 기다리는 중... (최소 2명)"
+    return state
+
+
+def reset_room(state: Room) -> Room:
+    # 방 초기화. 핸드 번호는 이어간다 (핸드 기록 키가 겹치지 않게)
+    fresh = init_room_state(state.room_code)
+    fresh.hand_no = state.hand_no
+    return fresh
+
+
+def init_room_json(room_code: str) -> Dict[str, Any]:
+    # 저장소(RoomStore)가 새 방 행을 만들 때 쓰는 jsonb 모양
+    return init_room_state(room_code).to_state()
+
+
+def get_hand_strength_detail(cards: List[str]) -> Tuple[int, List[int], str]:
+    # 룩업 테이블 판정기 (hand_eval.py). 반환 계약은 (rank, tiebreak, desc) 그대로
+    return hand_eval.get_hand_strength_detail(cards)
+
+
+# =========================
+# 3. Game flow
+# =========================
+def active_player_indices(players: List[Seat]) -> List[int]:
+    return [i for i, p in enumerate(players) if p.occupied and p.stack > 0]
+
+
+def find_next_alive(players: List[Seat], start_idx: int) -> int:
+    for k in range(1, 10):
+        j = (start_idx + k) % 9
+        if players[j].status == ALIVE:
+            return j
+    return start_idx
+
+
+def find_next_actor(players: List[Seat], start_idx: int) -> int:
+    # 칩이 남은 생존자 우선 (올인한 자리에 턴이 멈추지 않게)
+    for k in range(1, 10):
+        j = (start_idx + k) % 9
+        if players[j].status == ALIVE and players[j].stack > 0:
+            return j
+    return find_next_alive(players, start_idx)
+
+
+def needs_runout(state: Room) -> bool:
+    """더 베팅할 사람이 없는 상태(전원 올인 등). 남은 보드만 깔면 된다"""
+    if state.phase not in ("PREFLOP", "FLOP", "TURN", "RIVER"):
+        return False
+    live = [p for p in state.players if p.status == ALIVE]
+    if len(live) < 2:
+        return False
+    with_chips = [p for p in live if p.stack > 0]
+    if len(with_chips) > 1:
+        return False
+    return all(p.bet >= state.current_bet for p in with_chips)
+
+
+def apply_blinds_and_deal(state: Room) -> Room:
+    players = state.players
+    alive_idxs = active_player_indices(players)
+    if len(alive_idxs) < 2:
+        return wait_for_players(state)
+
+    now = time.time()
+    elapsed = max(0, now - state.started_at)
+    lvl = min(len(BLIND_STRUCTURE), int(elapsed // LEVEL_DURATION) + 1)
+    sb_amt, bb_amt, ante_amt = BLIND_STRUCTURE[lvl - 1]
+    state.level = lvl
+
+    pot = 0
+
+    # move dealer to next alive
+    cur_d = state.dealer_idx
+    new_d = cur_d
+    for k in range(1, 10):
+        j = (cur_d + k) % 9
+        if players[j].occupied and players[j].stack > 0:
+            new_d = j
+            break
+    state.dealer_idx = new_d
+    state.hand_no += 1
+    deck = new_hand_deck(state)
+    cards = hand_eval.CARD_STRS
+
+    # reset players
+    for p in players:
+        p.contrib = 0
+        if p.occupied and p.stack > 0:
+            p.status = ALIVE
+            p.hand = [cards[deck.draw()], cards[deck.draw()]]
+            if ante_amt > 0:
+                a = min(p.stack, ante_amt)
+                p.stack -= a
+                p.contrib = a
+                pot += a
+        else:
+            p.status = STANDBY
+            p.hand = []
+        p.bet = 0
+        p.action = ""
+        p.has_acted = False
+        p.role = ""
+
+    if len(alive_idxs) == 2:
+        sb_idx = new_d
+        bb_idx = find_next_alive(players, sb_idx)
+        players[sb_idx].role = "D-SB"
+        players[bb_idx].role = "BB"
+        turn_start = sb_idx
+    else:
+        sb_idx = find_next_alive(players, new_d)
+        bb_idx = find_next_alive(players, sb_idx)
+        players[new_d].role = "D"
+        players[sb_idx].role = "SB"
+        players[bb_idx].role = "BB"
+        turn_start = find_next_alive(players, bb_idx)
+
+    # post blinds
+    sb = players[sb_idx]
+    if sb.status == ALIVE:
+        pay = min(sb.stack, sb_amt)
+        sb.stack -= pay
+        sb.bet = pay
+        sb.contrib += pay
+        pot += pay
+
+    bb = players[bb_idx]
+    if bb.status == ALIVE:
+        pay = min(bb.stack, bb_amt)
+        bb.stack -= pay
+        bb.bet = pay
+        bb.contrib += pay
+        pot += pay
+
+    state.pot = pot
+    state.deck_pos = deck.pos
+    state.community = []
+    state.phase = "PREFLOP"
+    state.current_bet = bb_amt
+    state.turn_idx = turn_start
+    state.hand_started_at = now
+    state.turn_started_at = now
+    state.game_over_at = 0.0
+    state.msg = f"Level {lvl} 시작! (SB {sb_amt}/BB {bb_amt})"
+    state.showdown = []
+    state.winners = []
+    return state
+
+
+def has_human(state: Room) -> bool:
+    return any(p.occupied and p.is_human for p in state.players)
+
+
+def wait_for_players(state: Room, msg: str = "플레이어를 기다리는 중... (최소 2명)") -> Room:
+    state.phase = "WAITING"
+    if not state.tournament_id:
+        state.started_at = 0.0
+    state.msg = msg
+    return state
+
+
+def start_if_ready(state: Room) -> Room:
+    # 봇(bots.py)만 있는 방은 시작하지 않는다. 사람 1명 + 아무나 1명이면 시작
+    alive_idxs = active_player_indices(state.players)
+    if state.phase == "WAITING" and len(alive_idxs) >= 2 and has_human(state):
+        # 토너먼트 테이블은 공용 블라인드 시계(started_at)를 그대로 쓴다
+        if not state.tournament_id:
+            state.started_at = time.time()
+        state = apply_blinds_and_deal(state)
+    return state
+
+
+def kick_seats(state: Room, targets: List[Tuple[int, str]]) -> Room:
+    """(seat, nickname) 중 아직 그 사람이 앉아 있는 자리만 비운다"""
+    players = state.players
+    changed = False
+
+    for seat, nickname in targets:
+        p = players[seat]
+        if p.occupied and p.name == nickname:
+            p.vacate()
+            changed = True
+
+    if changed:
+        alive_idxs = active_player_indices(players)
+        if len(alive_idxs) < 2:
+            wait_for_players(state, "플레이어 퇴장으로 게임 중단. 대기 중... (최소 2명)")
+            state.current_bet = 0
+            state.pot = 0
+            state.community = []
+            state.showdown = []
+            state.winners = []
+    return state
+
+
+def pass_turn(state: Room) -> None:
+    players = state.players
+    curr = state.turn_idx
+    for k in range(1, 10):
+        j = (curr + k) % 9
+        p = players[j]
+        if p.status == ALIVE:
+            if p.stack > 0:
+                state.turn_idx = j
+                state.turn_started_at = time.time()
+                return
+            p.has_acted = True
+    state.turn_started_at = time.time()
+
+
+def end_hand_all_fold(state: Room) -> Room:
+    alive = [i for i, p in enumerate(state.players) if p.status == ALIVE]
+    if len(alive) == 1:
+        winner = state.players[alive[0]]
+        winner.stack += state.pot
+        state.pot = 0
+        state.winners = alive
+        state.showdown = [{"name": winner.name, "hole": list(winner.hand), "desc": "전원 폴드"}]
+        state.msg = f"🏆 {winner.name} 승리! (전원 폴드)"
+        state.phase = "GAME_OVER"
+        reveal_deck(state)
+        state.game_over_at = time.time()
+    return state
+
+
+@metrics.timed("game_transition_seconds", step="showdown_and_end")
+def showdown_and_end(state: Room) -> Room:
+    """사이드팟(pots.py)으로 정산. 참가자마다 점수는 한 번만 매긴다"""
+    players = state.players
+    alive_idxs = [i for i, p in enumerate(players) if p.status == ALIVE]
+    board = hand_eval.cards_to_ints(state.community)
+    scores = {i: hand_eval.evaluate(hand_eval.cards_to_ints(players[i].hand) + board) for i in alive_idxs}
+
+    contribs = [(i, p.contrib, p.status == ALIVE) for i, p in enumerate(players) if p.contrib > 0]
+    # 강퇴로 비워진 자리가 넣었던 칩 등 기여액으로 안 잡히는 칩은 메인팟으로
+    dead = max(0, state.pot - sum(c for _, c, _ in contribs))
+    side_pots = pots.build_pots(contribs, dead)
+    paid, winners_by_pot = pots.settle(side_pots, scores, state.dealer_idx)
+    for i, amount in paid.items():
+        players[i].stack += amount
+
+    # 혼자 자격인 팟은 아무도 안 받은 초과 베팅을 돌려준 것 → 승자로 치지 않는다
+    contested = [w for (_, elig), w in zip(side_pots, winners_by_pot) if len(elig) > 1]
+    main_winners = contested[0] if contested else (winners_by_pot[0] if winners_by_pot else [])
+    winners = sorted({i for w in contested for i in w} or set(main_winners))
+
+    state.pot = 0
+    state.winners = winners
+    win_desc = hand_eval.describe(scores[main_winners[0]]) if main_winners else ""
+    msg = f"🏆 {', '.join(players[i].name for i in main_winners)} 승리! [{win_desc}]"
+    for k, w in enumerate(contested[1:], 1):
+        if w != main_winners:
+            msg += f" / 사이드팟{k}: {', '.join(players[i].name for i in w)}"
+
+    # 설명 문자열은 화면에 찍히는 쇼다운 라인에서만 만든다
+    state.showdown = [
+        {"name": players[i].name, "hole": list(players[i].hand), "desc": hand_eval.describe(scores[i])}
+        for i in alive_idxs
+    ]
+    state.msg = msg
+    state.phase = "GAME_OVER"
+    state.game_over_at = time.time()
+    reveal_deck(state)
+    return state
+
+
+def check_phase_end(state: Room) -> Room:
+    players = state.players
+    active = [p for p in players if p.status == ALIVE]
+    if len(active) <= 1:
+        return end_hand_all_fold(state)
+
+    target = state.current_bet
+    for p in active:
+        if not p.has_acted or (p.bet != target and p.stack != 0):
+            return state
+    return next_street(state)
+
+
+# 액션마다 불리는 위쪽 검사는 재지 않고(시뮬레이터 뜨거운 경로) 실제로 스트리트가 넘어갈 때만 잰다
+@metrics.timed("game_transition_seconds", step="next_street")
+def next_street(state: Room) -> Room:
+    players = state.players
+    phase = state.phase
+    try:
+        if phase == "PREFLOP":
+            state.phase = "FLOP"
+            state.community = draw_cards(state, 3)
+        elif phase == "FLOP":
+            state.phase = "TURN"
+            state.community += draw_cards(state, 1)
+        elif phase == "TURN":
+            state.phase = "RIVER"
+            state.community += draw_cards(state, 1)
+        elif phase == "RIVER":
+            return showdown_and_end(state)
+    except dealing.DeckError:
+        return void_hand(state)
+
+    state.current_bet = 0
+    for p in players:
+        p.bet = 0
+        p.has_acted = False
+        if p.status == ALIVE:
+            p.action = ""
+
+    state.turn_idx = find_next_actor(players, state.dealer_idx)
+    state.turn_started_at = time.time()
+    state.msg = f"{state.phase} 시작!"
+    return state
+
+
+def force_timeout_fold(state: Room) -> Room:
+    p = state.players[state.turn_idx]
+    if p.status == ALIVE:
+        p.status = FOLDED
+        p.has_acted = True
+        p.action = "시간초과"
+        state = check_phase_end(state)
+        if state.phase != "GAME_OVER":
+            pass_turn(state)
+    return state
+
+
+def auto_rebuy_if_bust(player: Seat) -> bool:
+    if player.stack > 0:
+        return False
+    if player.rebuy_count >= 2:
+        return False
+    player.rebuy_count += 1
+    player.stack = REBUY_STACKS[player.rebuy_count]
+    player.status = FOLDED
+    player.action = f"자동 리바인 ({player.stack:,})"
+    player.has_acted = True
+    return True
+
+
+# =========================
+# 4. Player actions (CAS 재시도/엔진 큐에서 최신 상태에 적용됨)
+# =========================
+# 조건이 더 이상 맞지 않으면(이미 처리됨/내 차례 아님 등) None → 저장 안 함
+def is_turn_of(state: Room, seat: int) -> bool:
+    if state.phase in ("WAITING", "GAME_OVER") or state.turn_idx != seat:
+        return False
+    p = state.players[seat]
+    return p.status == ALIVE and p.stack > 0
+
+
+def raise_bounds(level: int, current_bet: int, bet: int, stack: int) -> Tuple[int, int]:
+    """레이즈 총액(raise_to) 허용 범위 (최소, 최대). 최소는 BB와 현재 베팅 2배 중 큰 값, 칩이 모자라면 올인 금액"""
+    bb_amt = BLIND_STRUCTURE[level - 1][1]
+    max_to = stack + bet
+    return min(max(bb_amt, current_bet * 2), max_to), max_to
+
+
+def finish_action(state: Room) -> Room:
+    state = check_phase_end(state)
+    if state.phase != "GAME_OVER":
+        pass_turn(state)
+    return state
+
+
+def act_call_check(state: Room, seat: int) -> Optional[Room]:
+    if not is_turn_of(state, seat):
+        return None
+    me = state.players[seat]
+    to_call = max(0, state.current_bet - me.bet)
+    pay = min(to_call, me.stack)
+    me.stack -= pay
+    me.bet += pay
+    me.contrib += pay
+    state.pot += pay
+    me.has_acted = True
+    me.action = "체크" if pay == 0 else f"콜({pay:,})"
+    return finish_action(state)
+
+
+def act_fold(state: Room, seat: int) -> Optional[Room]:
+    if not is_turn_of(state, seat):
+        return None
+    me = state.players[seat]
+    me.status = FOLDED
+    me.has_acted = True
+    me.action = "폴드"
+    return finish_action(state)
+
+
+def _reopen_action(state: Room, me: Seat) -> None:
+    # 베팅이 올라가면 칩이 남은 다른 생존자는 다시 액션해야 한다
+    for p in state.players:
+        if p is not me and p.status == ALIVE and p.stack > 0:
+            p.has_acted = False
+
+
+def act_allin(state: Room, seat: int) -> Optional[Room]:
+    if not is_turn_of(state, seat):
+        return None
+    me = state.players[seat]
+    pay = me.stack
+    me.stack = 0
+    me.bet += pay
+    me.contrib += pay
+    state.pot += pay
+    me.has_acted = True
+    me.action = f"올인({pay:,})"
+    if me.bet > state.current_bet:
+        state.current_bet = me.bet
+        _reopen_action(state, me)
+    return finish_action(state)
+
+
+def act_raise(state: Room, seat: int, raise_to: int) -> Optional[Room]:
+    if not is_turn_of(state, seat):
+        return None
+    me = state.players[seat]
+    # 화면/봇/엔진/ws 어디서 오든 raise_bounds 밖이면 거절 (최소 미달, me.bet 아래면 pay가 음수)
+    min_to, max_to = raise_bounds(state.level, state.current_bet, me.bet, me.stack)
+    if not min_to <= int(raise_to) <= max_to:
+        return None
+    pay = int(raise_to) - me.bet
+    pay = min(pay, me.stack)
+    me.stack -= pay
+    me.bet += pay
+    me.contrib += pay
+    state.pot += pay
+    state.current_bet = max(state.current_bet, me.bet)
+    me.has_acted = True
+    me.action = f"레이즈({me.bet:,})"
+    _reopen_action(state, me)
+    return finish_action(state)
+
+
+def timeout_now(state: Room) -> Room:
+    p = state.players[state.turn_idx]
+    if p.status != ALIVE or p.stack == 0:
+        # 차례인 자리가 강퇴로 비었거나 올인 상태면 폴드시키지 않고 턴만 넘긴다
+        return finish_action(state)
+    return force_timeout_fold(state)
+
+
+def timeout_if_due(state: Room) -> Optional[Room]:
+    # 같은 턴에 대해 타이머가 여러 번 들어와도 한 번만 처리된다
+    if state.phase in ("WAITING", "GAME_OVER"):
+        return None
+    if time.time() - state.turn_started_at < TURN_TIMEOUT:
+        return None
+    return timeout_now(state)
+
+
+def runout_step(state: Room) -> Optional[Room]:
+    # 스트리트 하나 진행 (리버였으면 쇼다운)
+    if not needs_runout(state):
+        return None
+    for p in state.players:
+        if p.status == ALIVE:
+            p.has_acted = True
+    return check_phase_end(state)
+
+
+def next_hand_if_due(state: Room, moves: List[Tuple[str, str]] = ()) -> Optional[Room]:
+    if state.phase != "GAME_OVER":
+        return None
+    if time.time() - state.game_over_at < AUTO_NEXT_HAND_DELAY:
+        return None
+    if state.tournament_id:
+        # 토너먼트는 리바인 없음: 탈락 처리 + 예약된 이동자 빼기
+        tournament_boundary(state, moves)
+    else:
+        for p in state.players:
+            if p.occupied and not auto_rebuy_if_bust(p) and p.stack <= 0 and not p.is_human:
+                p.vacate()  # 리바인 다 쓴 봇은 자리를 비운다
+        if not has_human(state):
+            return wait_for_players(state, "사람 플레이어가 없어 대기 중...")
+    return apply_blinds_and_deal(state)
+
+
+# =========================
+# 5. Seats
+# =========================
+def ensure_join(state: Room, nickname: str) -> int:
+    players = state.players
+    for i, p in enumerate(players):
+        if p.name == nickname:
+            p.is_human = True
+            return i
+
+    target = -1
+    if not players[4].occupied:
+        target = 4
+    else:
+        for i in range(9):
+            if not players[i].occupied:
+                target = i
+                break
+    if target == -1:
+        # 만석이면 이번 핸드에 안 들어가 있는 봇 자리를 넘겨받는다
+        in_hand = state.phase in ("PREFLOP", "FLOP", "TURN", "RIVER")
+        for i, p in enumerate(players):
+            if not p.is_human and not (in_hand and p.status == ALIVE):
+                target = i
+                break
+
+    if target != -1:
+        players[target].sit(nickname, REBUY_STACKS[0], True)
+    return target
+
+
+# =========================
+# 6. Tournament tables (코디네이터는 tournament.py)
+# =========================
+def setup_tournament_table(
+    state: Room,
+    tournament_id: str,
+    started_at: float,
+    entrants: List[Tuple[str, int]],
+) -> Room:
+    """방을 토너먼트 테이블로 새로 만들고 참가자를 앉힌다"""
+    hand_no = state.hand_no
+    state = init_room_state(state.room_code)
+    state.hand_no = hand_no  # 핸드 기록 키(room, hand_no)가 겹치지 않게
+    state.tournament_id = tournament_id
+    state.started_at = started_at
+    for i, (name, stack) in enumerate(entrants[:NUM_SEATS]):
+        state.players[i].sit(name, int(stack), True)
+    return start_if_ready(state)
+
+
+def tournament_boundary(state: Room, moves: List[Tuple[str, str]]) -> None:
+    """핸드 사이: 칩 없는 자리 탈락 + (이름, 도착 테이블) 이동자 빼기.
+
+    결과는 busted / moved_out에 남기고 엔진이 코디네이터에 넘긴다.
+    """
+    busted: List[str] = []
+    for p in state.players:
+        if p.occupied and p.stack <= 0:
+            busted.append(p.name)
+            p.vacate()
+    moved_out: List[List[Any]] = []
+    for name, dest in moves:
+        for p in state.players:
+            if p.occupied and p.name == name:
+                moved_out.append([name, p.stack, dest])
+                p.vacate()
+                break
+    state.busted = busted
+    state.moved_out = moved_out
+
+
+def release_if_waiting(state: Room, moves: List[Tuple[str, str]]) -> Optional[Room]:
+    # 핸드가 안 돌고 있는 테이블(혼자 남음 등)은 다음 경계를 기다리지 않고 바로 뺀다
+    if state.phase != "WAITING" or not moves:
+        return None
+    tournament_boundary(state, moves)
+    return state
+
+
+def seat_entrant(state: Room, name: str, stack: int) -> Optional[Room]:
+    """이동해 온 참가자를 빈 자리에 앉힌다 (다음 핸드부터 참여)"""
+    for p in state.players:
+        if p.occupied and p.name == name:
+            return None
+    for p in state.players:
+        if not p.occupied:
+            p.sit(name, int(stack), True)
+            return start_if_ready(state)
+    return None
@@ -0,0 +1,340 @@
+"""룩업 테이블 기반 족보 판정기
+
+카드는 0~51 정수로 인코딩한다 (rank_idx * 4 + suit_idx).
+CARD_STRS = [r + s for r in RANKS for s in SUITS]의 인덱스다 (dealing.Deck이 뽑는 값).
+
+- 플러시가 아닌 핸드: 랭크별 소수의 곱(prime product) → 점수 테이블
+- 플러시 핸드: 해당 수트의 13비트 랭크 마스크 → 점수 테이블
+
+점수는 (rank, tiebreak)를 하나의 int로 묶은 값이라 그대로 대소 비교가 된다.
+설명 문자열은 describe()에서 화면에 찍을 때만 만든다.
+"""
+import itertools
+import random
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+RANKS = "23456789TJQKA"
+SUITS = ["♠", "♥", "♦", "♣"]
+DISPLAY_MAP = {"T": "10", "J": "J", "Q": "Q", "K": "K", "A": "A"}
+
+CARD_STRS: List[str] = [r + s for r in RANKS for s in SUITS]
+CARD_INDEX: Dict[str, int] = {c: i for i, c in enumerate(CARD_STRS)}
+
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+
+# rank별 tiebreak 길이 (점수 ↔ (rank, tb) 변환용)
+TB_LEN = {8: 1, 7: 2, 6: 2, 5: 5, 4: 1, 3: 3, 2: 3, 1: 4, 0: 5}
+
+NO_HAND = -1
+
+
+# =========================
+# 1. Card encoding
+# =========================
+def card_to_int(card: str) -> int:
+    return CARD_INDEX[card]
+
+
+def int_to_card(c: int) -> str:
+    return CARD_STRS[c]
+
+
+def cards_to_ints(cards: Iterable[str]) -> List[int]:
+    return [CARD_INDEX[c] for c in cards]
+
+
+# =========================
+# 2. Score packing
+# =========================
+def pack_score(rank: int, tb: Sequence[int]) -> int:
+    # tiebreak 값(2~14)은 4비트씩, 왼쪽 정렬로 최대 5개
+    v = rank
+    for k in range(5):
+        v = (v << 4) | (tb[k] if k < len(tb) else 0)
+    return v
+
+
+def unpack_score(score: int) -> Tuple[int, List[int]]:
+    if score < 0:
+        return (NO_HAND, [])
+    rank = score >> 20
+    n = TB_LEN[rank]
+    tb = [(score >> (16 - 4 * k)) & 0xF for k in range(n)]
+    return (rank, tb)
+
+
+def _straight_high(mask: int) -> int:
+    # mask: bit (v - 2) = 랭크 v 존재. 가장 높은 스트레이트의 top 랭크, 없으면 -1
+    for top in range(14, 5, -1):
+        need = 0x1F << (top - 6)
+        if mask & need == need:
+            return top
+    if mask & 0x100F == 0x100F:  # A-2-3-4-5
+        return 5
+    return -1
+
+
+def _score_from_counts(counts: Dict[int, int]) -> int:
+    """플러시가 아닌 랭크 멀티셋의 점수 (랭크 값은 2~14)"""
+    ranks = sorted(counts, reverse=True)
+    groups = sorted(counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
+    mask = 0
+    for r in ranks:
+        mask |= 1 << (r - 2)
+
+    top, top_n = groups[0]
+    if top_n == 4:
+        kicker = [r for r in ranks if r != top][0]
+        return pack_score(7, [top, kicker])
+    if top_n == 3 and groups[1][1] >= 2:
+        return pack_score(6, [top, groups[1][0]])
+    high = _straight_high(mask)
+    if high > 0:
+        return pack_score(4, [high])
+    if top_n == 3:
+        kickers = [r for r in ranks if r != top][:2]
+        return pack_score(3, [top] + kickers)
+    if top_n == 2 and groups[1][1] == 2:
+        second = groups[1][0]
+        kicker = [r for r in ranks if r != top and r != second][0]
+        return pack_score(2, [top, second, kicker])
+    if top_n == 2:
+        kickers = [r for r in ranks if r != top][:3]
+        return pack_score(1, [top] + kickers)
+    return pack_score(0, ranks[:5])
+
+
+# =========================
+# 3. Tables (첫 사용 시 1회: 표 파일에서 읽기, 없으면 생성)
+# =========================
+_PRODUCT_TABLE: Dict[int, int] = {}
+_FLUSH_TABLE: List[int] = []
+
+
+def _build_tables() -> None:
+    flush = [0] * 8192
+    for mask in range(8192):
+        if bin(mask).count("1") < 5:
+            continue
+        high = _straight_high(mask)
+        if high > 0:
+            flush[mask] = pack_score(8, [high])
+        else:
+            ranks = [v for v in range(14, 1, -1) if mask & (1 << (v - 2))]
+            flush[mask] = pack_score(5, ranks[:5])
+
+    products: Dict[int, int] = {}
+    for n in (5, 6, 7):
+        for combo in itertools.combinations_with_replacement(range(13), n):
+            # combo는 정렬돼 있으므로 같은 랭크가 붙어 있다
+            counts: Dict[int, int] = {}
+            key = 1
+            for r in combo:
+                counts[r + 2] = counts.get(r + 2, 0) + 1
+                key *= PRIMES[r]
+            if max(counts.values()) > 4:
+                continue
+            products[key] = _score_from_counts(counts)
+
+    _FLUSH_TABLE[:] = flush
+    _PRODUCT_TABLE.clear()
+    _PRODUCT_TABLE.update(products)
+
+
+def _load_tables() -> bool:
+    """tables.py 표 파일에 판정기 표가 있으면 그걸로 (생성 ~1초 대신 수 ms)"""
+    import tables  # numpy를 끌고 오므로 표가 필요할 때만
+
+    t = tables.get()
+    if t is None or "eval_flush" not in t.arrays:
+        return False
+    _FLUSH_TABLE[:] = t.arrays["eval_flush"].tolist()
+    _PRODUCT_TABLE.clear()
+    _PRODUCT_TABLE.update(zip(t.arrays["eval_product_key"].tolist(), t.arrays["eval_product_score"].tolist()))
+    return True
+
+
+def ensure_tables() -> None:
+    if not _FLUSH_TABLE and not _load_tables():
+        _build_tables()
+
+
+def product_table() -> Dict[int, int]:
+    ensure_tables()
+    return _PRODUCT_TABLE
+
+
+def flush_table() -> List[int]:
+    ensure_tables()
+    return _FLUSH_TABLE
+
+
+# =========================
+# 4. Evaluate
+# =========================
+def evaluate(cards: Sequence[int]) -> int:
+    """정수 카드 5~7장의 점수. 5장 미만이면 -1"""
+    if len(cards) < 5:
+        return NO_HAND
+    if not _FLUSH_TABLE:
+        ensure_tables()
+
+    key = 1
+    m0 = m1 = m2 = m3 = 0
+    for c in cards:
+        r = c >> 2
+        key *= PRIMES[r]
+        s = c & 3
+        if s == 0:
+            m0 |= 1 << r
+        elif s == 1:
+            m1 |= 1 << r
+        elif s == 2:
+            m2 |= 1 << r
+        else:
+            m3 |= 1 << r
+
+    # 7장 이하에서 플러시가 있으면 포카드/풀하우스는 불가능 → 플러시 점수가 곧 정답
+    for m in (m0, m1, m2, m3):
+        v = _FLUSH_TABLE[m]
+        if v:
+            return v
+    return _PRODUCT_TABLE[key]
+
+
+def evaluate_strs(cards: Sequence[str]) -> int:
+    return evaluate([CARD_INDEX[c] for c in cards])
+
+
+def _r_name(v: int) -> str:
+    r = RANKS[v - 2]
+    return DISPLAY_MAP.get(r, r)
+
+
+def describe(score: int) -> str:
+    if score < 0:
+        return "No Hand"
+    rank, tb = unpack_score(score)
+    n = _r_name
+    if rank == 8:
+        return f"스트레이트 플러시 ({n(tb[0])})"
+    if rank == 7:
+        return f"포카드 ({n(tb[0])})"
+    if rank == 6:
+        return f"풀하우스 ({n(tb[0])}, {n(tb[1])})"
+    if rank == 5:
+        return f"플러시 ({n(tb[0])})"
+    if rank == 4:
+        return f"스트레이트 ({n(tb[0])})"
+    if rank == 3:
+        return f"트리플 ({n(tb[0])})"
+    if rank == 2:
+        return f"투페어 ({n(tb[0])}, {n(tb[1])})"
+    if rank == 1:
+        return f"원페어 ({n(tb[0])}) - 킥 {n(tb[1])}"
+    return f"하이카드 ({n(tb[0])}, {n(tb[1])})"
+
+
+def get_hand_strength_detail(cards: List[str]) -> Tuple[int, List[int], str]:
+    """기존 (rank, tiebreak, desc) 계약 그대로"""
+    if not cards or len(cards) < 5:
+        return (-1, [], "No Hand")
+    score = evaluate_strs(cards)
+    rank, tb = unpack_score(score)
+    return (rank, tb, describe(score))
+
+
+# =========================
+# 5. Reference (기존 구현, 차등 검증용)
+# =========================
+def reference_hand_strength_detail(cards: List[str]) -> Tuple[int, List[int], str]:
+    # 교차 검증용 예전 구현이라 여기서만 쓰는 모듈은 여기서 (판정기 import에는 안 얹는다)
+    from collections import Counter
+
+    if not cards or len(cards) < 5:
+        return (-1, [], "No Hand")
+
+    rank_map = {r: i for i, r in enumerate("..23456789TJQKA", 0)}
+    ranks = sorted([rank_map[c[0]] for c in cards], reverse=True)
+    suits = [c[1] for c in cards]
+
+    flush_suit = None
+    for s in SUITS:
+        if suits.count(s) >= 5:
+            flush_suit = s
+            break
+    is_flush = flush_suit is not None
+    flush_ranks = (
+        sorted([rank_map[c[0]] for c in cards if c[1] == flush_suit], reverse=True) if is_flush else []
+    )
+
+    def check_straight(unique_ranks: List[int]) -> Tuple[bool, int]:
+        for i in range(len(unique_ranks) - 4):
+            if unique_ranks[i] - unique_ranks[i + 4] == 4:
+                return True, unique_ranks[i]
+        if set([14, 5, 4, 3, 2]).issubset(set(unique_ranks)):
+            return True, 5
+        return False, -1
+
+    unique_ranks = sorted(list(set(ranks)), reverse=True)
+    is_straight, straight_high = check_straight(unique_ranks)
+
+    is_sf = False
+    sf_high = -1
+    if is_flush:
+        is_sf, sf_high = check_straight(flush_ranks)
+
+    counts = Counter(ranks)
+    sorted_counts = sorted(counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
+
+    def r_name(v: int) -> str:
+        return _r_name(v)
+
+    if is_sf:
+        return (8, [sf_high], f"스트레이트 플러시 ({r_name(sf_high)})")
+    if sorted_counts[0][1] == 4:
+        kicker = [r for r in ranks if r != sorted_counts[0][0]][0]
+        return (7, [sorted_counts[0][0], kicker], f"포카드 ({r_name(sorted_counts[0][0])})")
+    if sorted_counts[0][1] == 3 and sorted_counts[1][1] >= 2:
+        return (6, [sorted_counts[0][0], sorted_counts[1][0]], f"풀하우스 ({r_name(sorted_counts[0][0])}, {r_name(sorted_counts[1][0])})")
+    if is_flush:
+        return (5, flush_ranks[:5], f"플러시 ({r_name(flush_ranks[0])})")
+    if is_straight:
+        return (4, [straight_high], f"스트레이트 ({r_name(straight_high)})")
+    if sorted_counts[0][1] == 3:
+        kickers = sorted([r for r in ranks if r != sorted_counts[0][0]], reverse=True)[:2]
+        return (3, [sorted_counts[0][0]] + kickers, f"트리플 ({r_name(sorted_counts[0][0])})")
+    if sorted_counts[0][1] == 2 and sorted_counts[1][1] == 2:
+        kicker = [r for r in ranks if r != sorted_counts[0][0] and r != sorted_counts[1][0]][0]
+        return (2, [sorted_counts[0][0], sorted_counts[1][0], kicker], f"투페어 ({r_name(sorted_counts[0][0])}, {r_name(sorted_counts[1][0])})")
+    if sorted_counts[0][1] == 2:
+        kickers = sorted([r for r in ranks if r != sorted_counts[0][0]], reverse=True)[:3]
+        return (1, [sorted_counts[0][0]] + kickers, f"원페어 ({r_name(sorted_counts[0][0])}) - 킥 {r_name(kickers[0])}")
+    return (0, ranks[:5], f"하이카드 ({r_name(ranks[0])}, {r_name(ranks[1])})")
+
+
+def differential_check(samples: int = 200_000, seed: Optional[int] = None) -> int:
+    """랜덤 5~7장 샘플로 기존 구현과 비교. 불일치 개수 반환"""
+    rng = random.Random(seed)
+    ensure_tables()
+    mismatches = 0
+    for _ in range(samples):
+        hand = rng.sample(CARD_STRS, rng.choice((5, 6, 7, 7, 7)))
+        if get_hand_strength_detail(hand) != reference_hand_strength_detail(hand):
+            mismatches += 1
+            if mismatches <= 10:
+                print("mismatch:", hand, get_hand_strength_detail(hand), reference_hand_strength_detail(hand))
+    return mismatches
+
+
+if __name__ == "__main__":
+    # python hand_eval.py [샘플 수]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    t0 = time.perf_counter()
+    ensure_tables()
+    print(f"tables: {len(_PRODUCT_TABLE)} products, {time.perf_counter() - t0:.3f}s")
+    bad = differential_check(n)
+    print(f"{n} samples, {bad} mismatches")
+    sys.exit(1 if bad else 0)
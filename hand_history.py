@@ -0,0 +1,532 @@
+"""핸드 기록 (append-only 바이너리 로그 + 방/핸드 인덱스 + 리플레이)
+
+엔진이 저장에 성공한 액션마다 observe()를 부르면 핸드 단위로 기록이 남는다.
+모아서 저장하는 엔진은 적용할 때 stage()로 만들어 두고 저장에 성공하면 write()한다.
+
+- 세그먼트 파일 seg-000001.log ...: [varint 길이][payload] 레코드를 뒤에 붙이기만
+  한다. SEGMENT_BYTES를 넘으면 다음 세그먼트로 넘어간다.
+- payload의 숫자는 전부 LEB128 varint, 카드는 hand_eval 인코딩(0–51) 1바이트,
+  문자열은 varint 길이 + utf-8. 방 코드는 세그먼트마다 한 번 ROOM 레코드로
+  번호를 붙이고 이후엔 번호만 쓴다.
+- seg-000001.idx: 핸드가 시작할 때마다 (방, hand_no, 세그먼트 안 오프셋, 방 번호) 한 줄.
+  열 때 idx만 읽어 메모리 dict를 만들므로 조회는 로그를 훑지 않고 그 핸드
+  시작 위치로 바로 간다(거기서부터 그 핸드 끝까지만 읽는다).
+
+레코드 종류
+    ROOM   room_id, room_code
+    START  room_id, hand_no, ts_ms, level, dealer, turn, current_bet, pot,
+           좌석 수, [seat, name, stack, bet, contrib, status, role, hole×2],
+           덱 시드(varint 길이 + 바이트), 뽑은 장 수
+           (예전 START: 종류 1은 contrib 없음 → 읽을 때 contrib = bet,
+            종류 1/4는 시드 대신 남은 덱 카드 목록)
+    ACTION room_id, hand_no, 시작 후 ms, op, op별 인자
+    END    room_id, hand_no, 시작 후 ms, 보드, 승자, [seat, stack]
+
+리플레이는 START 스냅샷으로 Room을 만들고 ACTION을 game.py의 같은 함수
+(act_*, timeout_now, runout_step, kick_seats ...)로 다시 적용한다.
+
+    python hand_history.py DIR              # 세그먼트/핸드 수
+"""
+import mmap
+import os
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import dealing
+import game
+import hand_eval
+from table_model import Room
+
+SEGMENT_BYTES = 8 * 1024 * 1024
+
+REC_ROOM, REC_START_V1, REC_ACTION, REC_END, REC_START_V2, REC_START = 0, 1, 2, 3, 4, 5
+# 기록하는 액션 (엔진 ACTIONS 이름 그대로). 번호가 파일 포맷이므로 뒤에만 추가
+OPS = ("call", "fold", "allin", "raise", "timeout", "runout", "kick", "join", "mtt_seat", "reset")
+OP_CODES = {name: i for i, name in enumerate(OPS)}
+ROLES = ("", "D", "SB", "BB", "D-SB")
+ROLE_CODES = {r: i for i, r in enumerate(ROLES)}
+IN_HAND = ("PREFLOP", "FLOP", "TURN", "RIVER")
+
+HandKey = Tuple[str, int]
+# stage()가 돌려주는 아직 안 쓴 레코드: (종류, hand_no, 본문, 핸드가 닫히는지)
+Staged = Tuple[int, int, bytes, bool]
+
+
+# =========================
+# 1. varint encoding
+# =========================
+def put_uvarint(buf: bytearray, n: int) -> None:
+    n = int(n)
+    if n < 0:
+        raise ValueError("negative varint")
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def put_str(buf: bytearray, s: str) -> None:
+    b = s.encode("utf-8")
+    put_uvarint(buf, len(b))
+    buf += b
+
+
+def put_cards(buf: bytearray, cards: List[str]) -> None:
+    put_uvarint(buf, len(cards))
+    buf += bytes(hand_eval.card_to_int(c) for c in cards)
+
+
+class Reader:
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def uvarint(self) -> int:
+        shift = 0
+        n = 0
+        while True:
+            b = self.data[self.pos]
+            self.pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def str(self) -> str:
+        n = self.uvarint()
+        s = self.data[self.pos:self.pos + n].decode("utf-8")
+        self.pos += n
+        return s
+
+    def raw(self) -> bytes:
+        n = self.uvarint()
+        raw = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return raw
+
+    def cards(self) -> List[str]:
+        n = self.uvarint()
+        raw = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return [hand_eval.int_to_card(c) for c in raw]
+
+
+# =========================
+# 2. Records
+# =========================
+# 본문은 방 번호 없이 만든다. 방 번호는 세그먼트마다 달라서 실제로 쓸 때(frame) 붙인다
+def frame(kind: int, room_id: int, body: bytes) -> bytes:
+    buf = bytearray([kind])
+    put_uvarint(buf, room_id)
+    return bytes(buf) + body
+
+
+def start_body(state: Room, ts: float) -> bytes:
+    buf = bytearray()
+    put_uvarint(buf, state.hand_no)
+    put_uvarint(buf, int(ts * 1000))
+    for v in (state.level, state.dealer_idx, state.turn_idx, state.current_bet, state.pot):
+        put_uvarint(buf, v)
+    seated = [p for p in state.players if p.occupied]
+    put_uvarint(buf, len(seated))
+    for p in seated:
+        put_uvarint(buf, p.seat - 1)
+        put_str(buf, p.name)
+        put_uvarint(buf, p.stack)
+        put_uvarint(buf, p.bet)
+        put_uvarint(buf, p.contrib)
+        put_uvarint(buf, p.status)
+        put_uvarint(buf, ROLE_CODES.get(p.role, 0))
+        put_cards(buf, p.hand)
+    seed = game.deck_seed(state)  # 기록은 서버에만 남으므로 시드를 그대로 (커밋이 아니라)
+    put_uvarint(buf, len(seed))
+    buf += seed
+    put_uvarint(buf, state.deck_pos)
+    return bytes(buf)
+
+
+def action_body(hand_no: int, dt_ms: int, op: str, args: tuple) -> bytes:
+    buf = bytearray()
+    put_uvarint(buf, hand_no)
+    put_uvarint(buf, max(0, dt_ms))
+    put_uvarint(buf, OP_CODES[op])
+    if op in ("call", "fold", "allin"):
+        put_uvarint(buf, args[0])
+    elif op == "raise":
+        put_uvarint(buf, args[0])
+        put_uvarint(buf, args[1])
+    elif op == "kick":
+        put_uvarint(buf, len(args[0]))
+        for seat, name in args[0]:
+            put_uvarint(buf, seat)
+            put_str(buf, name)
+    elif op == "join":
+        put_str(buf, args[0])
+    elif op == "mtt_seat":
+        put_str(buf, args[0])
+        put_uvarint(buf, args[1])
+    return bytes(buf)
+
+
+def end_body(state: Room, dt_ms: int) -> bytes:
+    buf = bytearray()
+    put_uvarint(buf, state.hand_no)
+    put_uvarint(buf, max(0, dt_ms))
+    put_cards(buf, state.community)
+    put_uvarint(buf, len(state.winners))
+    for i in state.winners:
+        put_uvarint(buf, i)
+    seated = [p for p in state.players if p.occupied]
+    put_uvarint(buf, len(seated))
+    for p in seated:
+        put_uvarint(buf, p.seat - 1)
+        put_uvarint(buf, p.stack)
+    return bytes(buf)
+
+
+def decode(payload: bytes, rooms: Dict[int, str]) -> Dict[str, Any]:
+    """payload → dict (kind/room/hand_no ...). ROOM 레코드는 rooms를 갱신"""
+    r = Reader(payload, 1)
+    kind = payload[0]
+    if kind == REC_ROOM:
+        rid = r.uvarint()
+        rooms[rid] = r.str()
+        return {"kind": "room", "room": rooms[rid]}
+    room = rooms.get(r.uvarint(), "?")
+    hand_no = r.uvarint()
+    if kind in (REC_START, REC_START_V2, REC_START_V1):
+        rec: Dict[str, Any] = {"kind": "start", "room": room, "hand_no": hand_no, "ts": r.uvarint() / 1000}
+        for f in ("level", "dealer_idx", "turn_idx", "current_bet", "pot"):
+            rec[f] = r.uvarint()
+        seats = []
+        for _ in range(r.uvarint()):
+            seat = dict(seat=r.uvarint(), name=r.str(), stack=r.uvarint(), bet=r.uvarint())
+            seat["contrib"] = seat["bet"] if kind == REC_START_V1 else r.uvarint()
+            seat.update(status=r.uvarint(), role=ROLES[r.uvarint()], hand=r.cards())
+            seats.append(seat)
+        rec["seats"] = seats
+        if kind == REC_START:
+            rec["deck_seed"] = r.raw().hex()
+            rec["deck_pos"] = r.uvarint()
+        else:
+            rec["deck"] = r.cards()
+        return rec
+    if kind == REC_ACTION:
+        rec = {"kind": "action", "room": room, "hand_no": hand_no, "dt_ms": r.uvarint()}
+        op = OPS[r.uvarint()]
+        rec["op"] = op
+        args: tuple = ()
+        if op in ("call", "fold", "allin"):
+            args = (r.uvarint(),)
+        elif op == "raise":
+            args = (r.uvarint(), r.uvarint())
+        elif op == "kick":
+            args = ([(r.uvarint(), r.str()) for _ in range(r.uvarint())],)
+        elif op == "join":
+            args = (r.str(),)
+        elif op == "mtt_seat":
+            args = (r.str(), r.uvarint())
+        rec["args"] = args
+        return rec
+    if kind == REC_END:
+        rec = {"kind": "end", "room": room, "hand_no": hand_no, "dt_ms": r.uvarint()}
+        rec["board"] = r.cards()
+        rec["winners"] = [r.uvarint() for _ in range(r.uvarint())]
+        rec["stacks"] = {r.uvarint(): r.uvarint() for _ in range(r.uvarint())}
+        return rec
+    raise ValueError(f"unknown record kind {kind}")
+
+
+# =========================
+# 3. Log (writer + index)
+# =========================
+class HandHistory:
+    def __init__(self, directory: str, segment_bytes: int = SEGMENT_BYTES):
+        self.dir = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        # (room, hand_no) → (세그먼트 번호, 오프셋, 그 세그먼트의 room_id)
+        self.index: Dict[HandKey, Tuple[int, int, int]] = {}
+        self._seg = 0
+        self._log: Optional[BinaryIO] = None
+        self._idx: Optional[BinaryIO] = None
+        self._size = 0
+        self._room_ids: Dict[str, int] = {}
+        # 진행 중인 핸드: room → (hand_no, 시작 시각)
+        self._open: Dict[str, Tuple[int, float]] = {}
+        self.records = 0
+        self.bytes_written = 0
+        self._load_index()
+
+    # ---------- files ----------
+    def _path(self, seg: int, ext: str) -> str:
+        return os.path.join(self.dir, f"seg-{seg:06d}.{ext}")
+
+    def segments(self) -> List[int]:
+        return sorted(int(f[4:10]) for f in os.listdir(self.dir) if f.startswith("seg-") and f.endswith(".log"))
+
+    def _load_index(self) -> None:
+        for seg in self.segments():
+            self._seg = max(self._seg, seg)
+            path = self._path(seg, "idx")
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                r = Reader(f.read())
+            while r.pos < len(r.data):
+                try:
+                    key = (r.str(), r.uvarint())
+                    self.index[key] = (seg, r.uvarint(), r.uvarint())
+                except IndexError:
+                    break  # 마지막 줄이 쓰다 만 상태 (비정상 종료)
+
+    def _roll(self) -> None:
+        self.close()
+        self._seg += 1
+        self._log = open(self._path(self._seg, "log"), "ab")
+        self._idx = open(self._path(self._seg, "idx"), "ab")
+        self._size = self._log.tell()
+        self._room_ids = {}
+
+    def _append(self, payload: bytes) -> int:
+        if self._log is None or self._size >= self.segment_bytes:
+            self._roll()
+        buf = bytearray()
+        put_uvarint(buf, len(payload))
+        buf += payload
+        offset = self._size
+        self._log.write(buf)
+        self._size += len(buf)
+        self.records += 1
+        self.bytes_written += len(buf)
+        return offset
+
+    def _room_id(self, room_code: str) -> int:
+        if self._log is None or self._size >= self.segment_bytes:
+            self._roll()
+        rid = self._room_ids.get(room_code)
+        if rid is None:
+            rid = self._room_ids[room_code] = len(self._room_ids) + 1
+            buf = bytearray([REC_ROOM])
+            put_uvarint(buf, rid)
+            put_str(buf, room_code)
+            self._append(bytes(buf))
+        return rid
+
+    def flush(self) -> None:
+        if self._log is not None:
+            self._log.flush()
+            self._idx.flush()
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._idx.close()
+            self._log = self._idx = None
+
+    # ---------- 기록 ----------
+    def stage(self, prev_hand: int, prev_phase: str, action: str, args: tuple, state: Room) -> List[Staged]:
+        """액션 하나 → 남길 레코드 (아직 안 씀, write로 쓴다). prev_*는 그 액션 적용 전 값
+
+        진행 중 핸드 표시는 바로 바뀐다. 쓰지 않고 버릴 거면 mark/rollback으로 되돌린다.
+        """
+        room_code = state.room_code
+        now = time.time()
+        open_hand = self._open.get(room_code)
+        out: List[Staged] = []
+
+        if open_hand is not None and open_hand[0] == prev_hand and prev_phase in IN_HAND and action in OP_CODES:
+            out.append((REC_ACTION, prev_hand, action_body(prev_hand, int((now - open_hand[1]) * 1000), action, args), action == "reset"))
+            if action == "reset":
+                del self._open[room_code]
+                return out
+
+        if open_hand is not None and open_hand[0] == prev_hand and state.phase == "GAME_OVER" and prev_phase != "GAME_OVER":
+            out.append((REC_END, prev_hand, end_body(state, int((now - open_hand[1]) * 1000)), True))
+            del self._open[room_code]
+
+        if state.hand_no != prev_hand and state.phase in IN_HAND:
+            out.append((REC_START, state.hand_no, start_body(state, now), False))
+            self._open[room_code] = (state.hand_no, now)
+        return out
+
+    def write(self, room_code: str, staged: List[Staged]) -> None:
+        closed = False
+        for kind, hand_no, body, closes in staged:
+            rid = self._room_id(room_code)
+            offset = self._append(frame(kind, rid, body))
+            if kind == REC_START:
+                buf = bytearray()
+                put_str(buf, room_code)
+                put_uvarint(buf, hand_no)
+                put_uvarint(buf, offset)
+                put_uvarint(buf, rid)
+                self._idx.write(buf)
+                self.index[(room_code, hand_no)] = (self._seg, offset, rid)
+            closed = closed or closes
+        if closed:
+            self.flush()
+
+    def observe(self, prev_hand: int, prev_phase: str, action: str, args: tuple, state: Room) -> None:
+        """저장된 액션 하나 반영 (stage + write)"""
+        self.write(state.room_code, self.stage(prev_hand, prev_phase, action, args, state))
+
+    def mark(self, room_code: str) -> Optional[Tuple[int, float]]:
+        return self._open.get(room_code)
+
+    def rollback(self, room_code: str, mark: Optional[Tuple[int, float]]) -> None:
+        """stage로 만들고 쓰지 않은 것들 버리기: 진행 중 핸드 표시를 mark 시점으로"""
+        if mark is None:
+            self._open.pop(room_code, None)
+        else:
+            self._open[room_code] = mark
+
+    # ---------- 읽기 ----------
+    def _iter_from(self, seg: int, offset: int, rid: int, room_code: str) -> Iterator[Dict[str, Any]]:
+        """seg의 offset부터 끝까지(다음 세그먼트로 이어서) 레코드.
+
+        mmap으로 열어 오프셋 근처 페이지만 읽는다. 첫 세그먼트의 방 번호는 인덱스에
+        있으므로 앞쪽 ROOM 레코드를 읽으러 돌아가지 않는다.
+        """
+        self.flush()
+        first = True
+        for s in self.segments():
+            if s < seg:
+                continue
+            with open(self._path(s, "log"), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            rooms: Dict[int, str] = {rid: room_code} if first else {}
+            r = Reader(data, offset if first else 0)
+            first = False
+            try:
+                while r.pos < len(data):
+                    try:
+                        n = r.uvarint()
+                    except IndexError:
+                        break
+                    payload = data[r.pos:r.pos + n]
+                    r.pos += n
+                    if len(payload) < n:
+                        break  # 쓰다 만 마지막 레코드
+                    rec = decode(payload, rooms)
+                    if rec["kind"] != "room":
+                        yield rec
+            finally:
+                data.close()
+
+    def hand(self, room_code: str, hand_no: int) -> List[Dict[str, Any]]:
+        """(room, hand_no) 핸드의 START..END 레코드. 인덱스로 시작 위치로 바로 간다"""
+        loc = self.index.get((room_code, hand_no))
+        if loc is None:
+            return []
+        out: List[Dict[str, Any]] = []
+        for rec in self._iter_from(*loc, room_code):
+            if rec["room"] != room_code or rec["hand_no"] != hand_no:
+                continue
+            out.append(rec)
+            if rec["kind"] == "end" or (rec["kind"] == "action" and rec["op"] == "reset"):
+                break
+        return out
+
+    def hands_of(self, room_code: str) -> List[int]:
+        return sorted(h for r, h in self.index if r == room_code)
+
+
+# =========================
+# 4. Replay
+# =========================
+def room_from_start(rec: Dict[str, Any]) -> Room:
+    state = Room(rec["room"])
+    state.hand_no = rec["hand_no"]
+    state.phase = "PREFLOP"
+    state.started_at = time.time() - (rec["level"] - 1) * game.LEVEL_DURATION
+    state.hand_started_at = state.turn_started_at = time.time()
+    for f in ("level", "dealer_idx", "turn_idx", "current_bet", "pot"):
+        setattr(state, f, rec[f])
+    if "deck_seed" in rec:
+        seed = bytes.fromhex(rec["deck_seed"])
+        state.deck_seed = rec["deck_seed"]
+        state.deck_commit = dealing.commitment(seed, state.room_code, state.hand_no)
+        state.deck_pos = rec["deck_pos"]
+    else:
+        state.extra["deck"] = list(rec["deck"])  # 예전 기록: 남은 덱에서 뒤부터 뽑는다
+    for s in rec["seats"]:
+        p = state.players[s["seat"]]
+        p.sit(s["name"], s["stack"], True)
+        p.bet = s["bet"]
+        p.contrib = s["contrib"]
+        p.status = s["status"]
+        p.role = s["role"]
+        p.hand = list(s["hand"])
+        p.action = ""
+        p.has_acted = False
+    return state
+
+
+def _apply_op(state: Room, op: str, args: tuple) -> Optional[Room]:
+    if op == "call":
+        return game.act_call_check(state, *args)
+    if op == "fold":
+        return game.act_fold(state, *args)
+    if op == "allin":
+        return game.act_allin(state, *args)
+    if op == "raise":
+        return game.act_raise(state, *args)
+    if op == "timeout":
+        return game.timeout_now(state)
+    if op == "runout":
+        return game.runout_step(state)
+    if op == "kick":
+        return game.kick_seats(state, [tuple(t) for t in args[0]])
+    if op == "join":
+        game.ensure_join(state, args[0])
+        return state
+    if op == "mtt_seat":
+        return game.seat_entrant(state, *args)
+    return None
+
+
+def replay(records: List[Dict[str, Any]]) -> Iterator[Tuple[str, Room]]:
+    """핸드 레코드 → (라벨, 그 시점 상태) 순서대로. 상태 객체는 매번 같은 Room"""
+    if not records or records[0]["kind"] != "start":
+        return
+    state = room_from_start(records[0])
+    yield "deal", state
+    for rec in records[1:]:
+        if rec["kind"] == "action":
+            if rec["op"] == "reset":
+                yield "reset", state
+                return
+            res = _apply_op(state, rec["op"], rec["args"])
+            state = res if res is not None else state
+            label = rec["op"] + ("" if not rec["args"] else " " + " ".join(str(a) for a in rec["args"]))
+            yield label, state
+        elif rec["kind"] == "end":
+            return
+
+
+def verify(records: List[Dict[str, Any]]) -> bool:
+    """리플레이 마지막 상태가 END 레코드(보드/승자/스택)와 같은지"""
+    last: Optional[Room] = None
+    for _, state in replay(records):
+        last = state
+    end = records[-1] if records else None
+    if last is None or end is None or end["kind"] != "end":
+        return False
+    stacks = {i: p.stack for i, p in enumerate(last.players) if p.occupied}
+    return last.community == end["board"] and last.winners == end["winners"] and stacks == end["stacks"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    hh = HandHistory(sys.argv[1] if len(sys.argv) > 1 else "hand_history")
+    segs = hh.segments()
+    size = sum(os.path.getsize(hh._path(s, "log")) for s in segs)
+    rooms = sorted({r for r, _ in hh.index})
+    print(f"segments {len(segs)}  bytes {size:,}  hands {len(hh.index):,}  rooms {len(rooms)}")
+    for room in rooms[:20]:
+        hands = hh.hands_of(room)
+        print(f"  {room}: hands {hands[0]}..{hands[-1]} ({len(hands)})")
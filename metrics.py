@@ -0,0 +1,277 @@
+"""지표 (카운터 / 지연 히스토그램) + Prometheus 텍스트 내보내기
+
+프로세스 공용 REGISTRY 하나에 화면 리런 단계, 저장소 읽기/CAS, 게임 전이,
+엔진 액션/저장, HTTP 요청을 모은다. 값은 전부 초 단위.
+
+    metrics.inc("room_store_conflicts_total")
+    metrics.observe("app_stage_seconds", dt, stage="db_read")
+    with metrics.timer("engine_flush_seconds"): ...
+    @metrics.timed("game_transition_seconds", step="showdown_and_end")
+
+히스토그램은 고정 버킷(50us부터 1.5배씩, 약 6초까지)이라 관측이 O(log 버킷)이고
+메모리가 늘지 않는다. p50/p99는 Prometheus histogram_quantile처럼 버킷 안에서
+선형 보간한다.
+
+내보내기
+- serve(port): GET /metrics (Prometheus 텍스트 포맷), 데몬 스레드
+- FileSink(path): 몇 초마다 같은 텍스트를 파일로 (node_exporter textfile 수집용)
+- summary(): 사이드바 관리 패널용 행 목록
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+BUCKETS: Tuple[float, ...] = tuple(50e-6 * 1.5 ** k for k in range(30))
+
+LabelKey = Tuple[Tuple[str, str], ...]
+# 수집 함수가 돌려주는 값: (이름, 종류 counter/gauge, 라벨, 값)
+Sample = Tuple[str, str, Dict[str, str], float]
+
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "n")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)  # 마지막 칸 = +Inf
+        self.sum = 0.0
+        self.n = 0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, v)] += 1
+        self.sum += v
+        self.n += 1
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = BUCKETS[i - 1] if i > 0 else 0.0
+                hi = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return BUCKETS[-1]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.collectors: Dict[str, Callable[[], List[Sample]]] = {}
+
+    # ---------- 기록 ----------
+    def inc(self, name: str, n: float = 1, **labels: Any) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + n
+
+    def histogram(self, name: str, **labels: Any) -> Histogram:
+        key = _key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = Histogram()
+            return h
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        h = self.histogram(name, **labels)
+        with self._lock:
+            h.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def timed(self, name: str, **labels: Any) -> Callable[[Callable], Callable]:
+        # 뜨거운 경로(게임 전이 등)에서 쓰므로 시리즈는 미리 잡아 두고 관측만 한다
+        h = self.histogram(name, **labels)
+        lock = self._lock
+        clock = time.perf_counter
+
+        def deco(fn: Callable) -> Callable:
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                t0 = clock()
+                out = fn(*args, **kwargs)  # 예외로 끝난 호출은 재지 않는다
+                dt = clock() - t0
+                with lock:
+                    h.observe(dt)
+                return out
+
+            return wrapper
+
+        return deco
+
+    def add_collector(self, key: str, fn: Callable[[], List[Sample]]) -> None:
+        """내보낼 때마다 불러 값을 읽는다 (다른 곳에서 세고 있는 통계용). 같은 key는 교체"""
+        with self._lock:
+            self.collectors[key] = fn
+
+    # ---------- 읽기 ----------
+    def _collected(self) -> List[Sample]:
+        out: List[Sample] = []
+        for fn in list(self.collectors.values()):
+            try:
+                out.extend(fn())
+            except Exception:
+                continue  # 수집 하나가 깨져도 나머지는 내보낸다
+        return out
+
+    def render(self) -> str:
+        """Prometheus 텍스트 포맷"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, v in series.items():
+                    lines.append(f"{name}{_fmt_labels(key)} {v:g}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in series.items():
+                    cum = 0
+                    for le, c in zip(BUCKETS, h.counts):
+                        cum += c
+                        le_label = 'le="%.6g"' % le
+                        lines.append(f"{name}_bucket{_fmt_labels(key, le_label)} {cum}")
+                    inf_label = 'le="+Inf"'
+                    lines.append(f"{name}_bucket{_fmt_labels(key, inf_label)} {h.n}")
+                    lines.append(f"{name}_sum{_fmt_labels(key)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{_fmt_labels(key)} {h.n}")
+        typed = set()
+        for name, kind, labels, v in self._collected():
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{_fmt_labels(_key(labels))} {v:g}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """히스토그램별 (이름, 라벨, n, p50 ms, p99 ms) + 카운터/수집값"""
+        rows: List[Dict[str, Any]] = []
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                for key, h in sorted(series.items()):
+                    if not h.n:
+                        continue
+                    rows.append({
+                        "metric": name + _fmt_labels(key),
+                        "n": h.n,
+                        "p50_ms": round(h.quantile(0.5) * 1000, 2),
+                        "p99_ms": round(h.quantile(0.99) * 1000, 2),
+                    })
+            for name, series in sorted(self.counters.items()):
+                for key, v in sorted(series.items()):
+                    rows.append({"metric": name + _fmt_labels(key), "n": v, "p50_ms": None, "p99_ms": None})
+        for name, _, labels, v in self._collected():
+            rows.append({"metric": name + _fmt_labels(_key(labels)), "n": v, "p50_ms": None, "p99_ms": None})
+        return rows
+
+
+# 프로세스 공용
+REGISTRY = Registry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+add_collector = REGISTRY.add_collector
+
+
+class Stopwatch:
+    """한 흐름(화면 리런 등)을 단계별로 끊어 재기. lap(단계)마다 직전 lap부터의 시간"""
+
+    def __init__(self, name: str, registry: Registry = REGISTRY):
+        self.name = name
+        self.registry = registry
+        self.t0 = self.last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.registry.observe(self.name, now - self.last, stage=stage)
+        self.last = now
+
+    def total(self, name: str) -> None:
+        self.registry.observe(name, time.perf_counter() - self.t0)
+
+
+# =========================
+# Export
+# =========================
+def serve(port: int, registry: Registry = REGISTRY, host: str = "0.0.0.0") -> "ThreadingHTTPServer":
+    """GET /metrics 엔드포인트 (데몬 스레드)"""
+    # http.server는 import만 ~40ms라 내보내기를 켤 때만 (game/room_store가 metrics를 import한다)
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class FileSink:
+    """interval초마다 render() 결과를 path에 통째로 (임시 파일 + rename)"""
+
+    def __init__(self, path: str, interval: float = 10.0, registry: Registry = REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, name="metrics-file", daemon=True).start()
+
+    def write(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.registry.render())
+        os.replace(tmp, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+                self.error = None
+            except OSError as e:
+                self.error = str(e)
+
+    def stop(self) -> None:
+        self._stop.set()
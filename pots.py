@@ -0,0 +1,103 @@
+"""팟 / 사이드팟 정산
+
+좌석마다 이번 핸드에 넣은 총액(Seat.contrib)으로 팟을 나눈다. 기여액 기준으로
+한 번 정렬하고(O(n log n)) 낮은 단계부터 훑으면서
+
+    단계 금액 = (이번 단계 - 이전 단계) × 아직 남은 기여자 수
+    자격     = 남은 기여자 중 폴드 안 한 사람
+
+으로 팟을 만든다. 폴드한 사람의 기여액은 단계만 만들고 자격은 없으므로 자격이
+같은 이웃 단계는 한 팟으로 합친다. 맨 위 단계에 자격자가 한 명뿐이면 그건
+아무도 못 받은 초과 베팅(uncalled)이라 그 사람에게 돌아간다.
+
+정산은 참가자마다 점수를 한 번만 매기고(score 인자), 팟마다 그 안의 자격자 중
+최고 점수가 나눠 가진다. 나눠 떨어지지 않는 칩은 딜러 왼쪽부터 가까운 승자
+순서로 1칩씩 준다.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+# (금액, 자격 좌석들)
+Pot = Tuple[int, List[int]]
+
+
+def build_pots(contribs: Sequence[Tuple[int, int, bool]], dead: int = 0) -> List[Pot]:
+    """(좌석, 기여액, 자격) → 메인팟부터 차례대로. dead는 주인 없는 칩(강퇴된 자리 등), 메인팟에 더한다"""
+    order = sorted((c, seat, ok) for seat, c, ok in contribs if c > 0)
+    n = len(order)
+    # 현재 단계 이상 넣은 자격자 수. 자격 집합은 뒤쪽(suffix)이라 수가 같으면 집합도 같다
+    left = sum(1 for _, _, ok in order if ok)
+    raw: List[List[int]] = []  # [금액, 시작 위치, 자격자 수]
+    prev = 0
+    for k, (level, _, ok) in enumerate(order):
+        if level > prev:
+            amount = (level - prev) * (n - k)
+            prev = level
+            if raw and (raw[-1][2] == left or left == 0):
+                # 자격이 같거나(폴드한 사람이 만든 단계) 받을 사람이 없으면 아래 팟에 합친다
+                raw[-1][0] += amount
+            else:
+                raw.append([amount, k, left])
+        if ok:
+            left -= 1
+    pots: List[Pot] = [(amount, sorted(seat for _, seat, ok in order[start:] if ok)) for amount, start, _ in raw]
+    if dead:
+        if pots:
+            pots[0] = (pots[0][0] + dead, pots[0][1])
+        else:
+            pots.append((dead, []))
+    return pots
+
+
+def seats_from(dealer_idx: int, seats: Sequence[int], n_seats: int = 9) -> List[int]:
+    """딜러 왼쪽(다음 자리)부터 시계 방향 순서로"""
+    return sorted(seats, key=lambda s: (s - dealer_idx - 1) % n_seats)
+
+
+def settle(pots: Sequence[Pot], scores: Dict[int, int], dealer_idx: int) -> Tuple[Dict[int, int], List[List[int]]]:
+    """팟별 승자 → (좌석별 받은 칩, 팟별 승자 목록)"""
+    paid: Dict[int, int] = {}
+    winners_by_pot: List[List[int]] = []
+    for amount, eligible in pots:
+        contenders = [s for s in eligible if s in scores]
+        if not contenders:
+            winners_by_pot.append([])
+            continue
+        best = max(scores[s] for s in contenders)
+        winners = seats_from(dealer_idx, [s for s in contenders if scores[s] == best])
+        share, odd = divmod(amount, len(winners))
+        for k, s in enumerate(winners):
+            paid[s] = paid.get(s, 0) + share + (1 if k < odd else 0)
+        winners_by_pot.append(winners)
+    return paid, winners_by_pot
+
+
+if __name__ == "__main__":
+    # 자체 확인: 무작위 기여액/자격/점수로 칩 보존 + 상한(자기가 맞춘 만큼만 이김) 검사
+    import random
+    import time
+
+    rng = random.Random(0)
+    t0 = time.perf_counter()
+    cases = 200_000
+    for _ in range(cases):
+        n = rng.randint(2, 9)
+        seats = rng.sample(range(9), n)
+        contribs = [(s, rng.choice((0, 50, 100, 100, 250, 400, 1000)) + rng.randint(0, 3), rng.random() < 0.7) for s in seats]
+        top = max((c for _, c, ok in contribs if ok), default=0)
+        if not top:
+            continue
+        # 폴드한 사람은 살아 있는 최대 베팅보다 많이 넣었을 수 없다 (그 베팅에 폴드했으니)
+        contribs = [(s, c if ok else min(c, top), ok) for s, c, ok in contribs]
+        dead = rng.choice((0, 0, 0, 37))
+        pots = build_pots(contribs, dead)
+        assert sum(a for a, _ in pots) == sum(c for _, c, _ in contribs) + dead
+        scores = {s: rng.randint(0, 5) for s, c, ok in contribs if ok}
+        paid, _ = settle(pots, scores, rng.randrange(9))
+        assert sum(paid.values()) == sum(a for a, e in pots if any(s in scores for s in e))
+        by_seat = {s: c for s, c, _ in contribs}
+        for s, got in paid.items():
+            # 한 사람이 받을 수 있는 최대 = 각 기여자에게서 min(그 사람 기여, 내 기여)
+            cap = sum(min(c, by_seat[s]) for c in by_seat.values()) + dead
+            assert got <= cap, (contribs, s, got, cap)
+    dt = time.perf_counter() - t0
+    print(f"{cases:,} random pots ok  {dt / cases * 1e6:.1f} us/case (build + settle)")
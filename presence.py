@@ -0,0 +1,109 @@
+"""접속 유지(presence) TTL 맵
+
+하트비트는 방 상태(poker_rooms.state)를 건드리지 않고 여기만 갱신한다.
+key마다 마지막 하트비트 + ttl을 마감 시각으로 들고, 마감 시각 힙에서 지난 것만
+꺼내므로 강퇴 판단은 좌석 전체를 훑지 않고 O(만료된 수 · log n)로 끝난다.
+
+힙은 지연 삭제 방식이다. touch 할 때마다 새 (마감, key)를 넣고, 꺼낼 때
+맵의 마감 시각과 다르면(그 사이 다시 touch 됐거나 discard 됨) 버린다.
+낡은 항목이 살아 있는 key 수보다 너무 많아지면 힙을 다시 만든다.
+
+엔진(engine.py)이 프로세스에 하나 들고, key는 (room_code, seat, nickname).
+"""
+import heapq
+import itertools
+import time
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+# 힙 크기가 살아 있는 key의 이 배수를 넘으면 다시 만든다
+COMPACT_RATIO = 4
+COMPACT_MIN = 64
+
+
+class PresenceMap(Generic[K]):
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._deadline: Dict[K, float] = {}
+        self._heap: List[Tuple[float, int, K]] = []
+        self._seq = itertools.count()
+        self.touches = 0
+        self.expired = 0
+        self.stale = 0
+
+    def __len__(self) -> int:
+        return len(self._deadline)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._deadline
+
+    def touch(self, key: K, now: Optional[float] = None) -> float:
+        """하트비트. 새 마감 시각을 돌려준다"""
+        at = (time.time() if now is None else now) + self.ttl
+        self._deadline[key] = at
+        heapq.heappush(self._heap, (at, next(self._seq), key))
+        self.touches += 1
+        if len(self._heap) > COMPACT_RATIO * len(self._deadline) + COMPACT_MIN:
+            self._compact()
+        return at
+
+    def discard(self, key: K) -> None:
+        # 힙 항목은 꺼낼 때 버려진다
+        self._deadline.pop(key, None)
+
+    def next_deadline(self) -> Optional[float]:
+        """가장 먼저 만료되는 시각 (없으면 None)"""
+        heap = self._heap
+        while heap:
+            at, _, key = heap[0]
+            if self._deadline.get(key) == at:
+                return at
+            heapq.heappop(heap)
+            self.stale += 1
+        return None
+
+    def pop_expired(self, now: Optional[float] = None) -> List[K]:
+        """마감이 지난 key를 맵에서 빼서 돌려준다"""
+        now = time.time() if now is None else now
+        heap = self._heap
+        out: List[K] = []
+        while heap and heap[0][0] <= now:
+            at, _, key = heapq.heappop(heap)
+            if self._deadline.get(key) != at:
+                self.stale += 1
+                continue
+            del self._deadline[key]
+            out.append(key)
+        self.expired += len(out)
+        return out
+
+    def _compact(self) -> None:
+        self._heap = [(at, next(self._seq), key) for key, at in self._deadline.items()]
+        heapq.heapify(self._heap)
+
+
+if __name__ == "__main__":
+    # 1만 좌석이 5초마다 하트비트, 그중 1%만 끊긴 상황에서 만료 처리 비용
+    rooms, seats = 1200, 9
+    pm: PresenceMap[Tuple[str, int]] = PresenceMap(20.0)
+    keys = [(f"r{r}", s) for r in range(rooms) for s in range(seats)]
+    now = 0.0
+    for k in keys:
+        pm.touch(k, now)
+    gone = set(keys[:: 100])
+    t0 = time.perf_counter()
+    kicked: List[Tuple[str, int]] = []
+    for step in range(1, 13):
+        now = step * 5.0
+        for k in keys:
+            if k not in gone:
+                pm.touch(k, now)
+        t1 = time.perf_counter()
+        kicked += pm.pop_expired(now)
+        if step == 12:
+            last_pop = time.perf_counter() - t1
+    total = time.perf_counter() - t0
+    assert set(kicked) == gone, (len(kicked), len(gone))
+    print(f"keys {len(keys):,}  kicked {len(kicked)}  heap {len(pm._heap):,}  stale skipped {pm.stale:,}")
+    print(f"touches {pm.touches:,} in {total:.3f}s  last pop_expired {last_pop * 1e6:.0f} us")
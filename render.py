@@ -0,0 +1,290 @@
+"""테이블 HTML 조각 (HUD/좌석/보드/쇼다운) 메모이즈
+
+리런마다 9좌석 + 보드 + 쇼다운 HTML을 새로 이어 붙이지 않고, 좌석마다 화면에
+보이는 값만 인자로 받는 seat_html을 lru_cache로 캐시한다. 바뀐 좌석만 새로
+만들고 나머지는 이전 리런에서 만든 문자열을 그대로 쓴다. 보드 가운데(커뮤니티
+카드/팟/메시지/쇼다운)도 같은 방식.
+
+턴/레벨 남은 시간은 서버가 매초 다시 그리지 않는다. countdown_html이 CSS
+애니메이션(@property 정수 카운터)으로 브라우저에서 줄어들게 하므로, 내 차례라고
+1초마다 리런할 필요가 없다. CSS는 app.py 스타일 블록의 countdown 부분.
+
+    python render.py [N]   # 핸드 진행을 흉내 내며 board_html 시간/캐시 적중률 측정
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from hand_eval import DISPLAY_MAP
+
+EMPTY_NAME = "빈 자리"
+ACTIVE_PHASES = ("PREFLOP", "FLOP", "TURN", "RIVER")
+
+State = Dict[str, Any]
+
+
+# =========================
+# 1. Cards
+# =========================
+def r_str(r: str) -> str:
+    return DISPLAY_MAP.get(r, r)
+
+
+@lru_cache(maxsize=256)
+def make_card(card: str, big: bool = False) -> str:
+    if not card or len(card) < 2:
+        return "🂠"
+    color = "red" if card[1] in ["♥", "♦"] else "black"
+    cls = "card-span comm-card-span" if big else "card-span"
+    return f"<span class='{cls}' style='color:{color}'>{r_str(card[0])}{card[1]}</span>"
+
+
+# =========================
+# 2. Countdown (브라우저에서 줄어드는 타이머)
+# =========================
+def countdown_html(left: float, total: float, cls: str, clock: bool = False, loop: bool = False) -> str:
+    """total초짜리 카운트다운을 left초 남은 지점부터 보여준다.
+
+    clock이면 mm:ss, 아니면 "Ns". loop면 0이 된 뒤 total부터 다시 (레벨 타이머).
+    """
+    done = min(total, max(0.0, total - left))
+    kind = "cd-clock" if clock else "cd-sec"
+    if loop:
+        kind += " cd-loop"
+    return (
+        f"<div class='{cls} countdown {kind}' "
+        f"style='--cd-from:{int(total)};animation-duration:{total:g}s;animation-delay:-{done:.1f}s'></div>"
+    )
+
+
+# =========================
+# 3. HUD
+# =========================
+@lru_cache(maxsize=64)
+def _hud_pills(lvl: int, players_label: str, sb_amt: int, bb_amt: int, ante_amt: int, avg_stack: int) -> str:
+    return (
+        '<div class="hud-left">'
+        f'<span class="pill pill-white">LV {lvl}</span>'
+        f'<span class="pill pill-white">{players_label}</span>'
+        f'<span class="pill">SB {sb_amt:,}</span>'
+        f'<span class="pill">BB {bb_amt:,}</span>'
+        f'<span class="pill">Ante {ante_amt:,}</span>'
+        f'<span class="pill">Avg {avg_stack:,}</span>'
+        "</div>"
+    )
+
+
+def hud_html(
+    lvl: int,
+    players_label: str,
+    blinds: Tuple[int, int, int],
+    avg_stack: int,
+    level_left: Optional[float],
+    level_duration: float,
+) -> str:
+    """level_left가 None이면(대기 중) 타이머 자리에 --:--"""
+    pills = _hud_pills(lvl, players_label, blinds[0], blinds[1], blinds[2], avg_stack)
+    if level_left is None:
+        timer = '<div class="timer-box">--:--</div>'
+    else:
+        timer = countdown_html(level_left, level_duration, "timer-box", clock=True, loop=True)
+    return f'<div class="hud-wrap">{pills}{timer}</div>'
+
+
+# =========================
+# 4. Seats / board
+# =========================
+@lru_cache(maxsize=2048)
+def seat_html(
+    i: int,
+    name: str,
+    stack: int,
+    folded: bool,
+    cards: Optional[Tuple[str, ...]],
+    role: str,
+    action: str,
+    active: bool,
+    hero: bool,
+    winner: bool,
+    equity_txt: str,
+) -> Tuple[str, str]:
+    """(여는 태그, 내용). 턴 타이머는 그 사이에 끼운다.
+
+    cards가 None이면 뒷면, 튜플이면 앞면(빈 튜플이면 카드 없음).
+    """
+    if not name:
+        return f'<div class="seat pos-{i}" style="opacity:0.18;">', f"<div>{EMPTY_NAME}</div></div>"
+
+    active_cls = "active-turn" if active else ""
+    hero_cls = "hero-seat" if hero else ""
+    folded_cls = "folded-seat" if folded else ""
+    winner_cls = "winner-seat" if winner else ""
+
+    if folded:
+        cards_div = "<div class='fold-text'>FOLD</div>"
+    elif cards is None:
+        cards_div = "<div style='font-size:16px;'>🂠 🂠</div>"
+    elif cards:
+        cards_div = f"<div>{make_card(cards[0])}{make_card(cards[1])}</div>"
+    else:
+        cards_div = ""
+
+    equity_div = f"<div class='equity-badge'>{equity_txt}</div>" if equity_txt else ""
+    role_cls = "role-D-SB" if role == "D-SB" else f"role-{role}"
+    role_div = f"<div class='role-badge {role_cls}'>{role}</div>" if role else ""
+
+    return (
+        f'<div class="seat pos-{i} {active_cls} {hero_cls} {folded_cls} {winner_cls}">',
+        f"{role_div}{equity_div}"
+        f"<div><b>{name}</b></div>"
+        f"<div>{stack:,}</div>"
+        f"{cards_div}"
+        f"<div class='action-badge'>{action}</div>"
+        "</div>",
+    )
+
+
+@lru_cache(maxsize=256)
+def center_html(
+    community: Tuple[str, ...],
+    pot: int,
+    msg: str,
+    showdown: Tuple[Tuple[str, Tuple[str, ...], str], ...],
+) -> str:
+    comm = "".join(make_card(c, big=True) for c in community)
+
+    showdown_div = ""
+    if showdown:
+        lines = []
+        for name, hole, desc in showdown:
+            hole_html = "".join(make_card(c) for c in hole)
+            lines.append(
+                f"<div class='showdown-line'><b>{name}</b> {hole_html} "
+                f"<span style='color:#ffeb3b;font-weight:900;'>→ {desc}</span></div>"
+            )
+        confetti = "🎉" * 10
+        showdown_div = (
+            '<div class="showdown-box">'
+            f'<div style="font-size:18px; font-weight:900; color:#00e676; margin-bottom:4px;">{confetti}</div>'
+            f"{''.join(lines)}"
+            "</div>"
+        )
+
+    return (
+        f"<div class='center-msg'>"
+        f"<div>{comm}</div>"
+        f"<h3>Pot: {pot:,}</h3>"
+        f"<div class='phase'>{msg}</div>"
+        f"{showdown_div}"
+        f"</div>"
+    )
+
+
+def _equity_txt(eq: Optional[Tuple[float, float]], approx: bool = False) -> str:
+    if eq is None:
+        return ""
+    win_pct, tie_pct = eq
+    tie_txt = f" (T {tie_pct:.0f}%)" if tie_pct >= 0.5 else ""
+    # 프리플랍 값은 근사 (equity.allin_equity)
+    return f"{'≈' if approx else ''}{win_pct:.1f}%{tie_txt}"
+
+
+def board_html(
+    state: State,
+    my_seat: int,
+    seat_equity: Dict[int, Tuple[float, float]],
+    time_left: float,
+    turn_timeout: float,
+) -> str:
+    phase = state["phase"]
+    in_hand = phase in ACTIVE_PHASES
+    game_over = phase == "GAME_OVER"
+    winner_set = set(state.get("winners") or [])
+    curr_idx = state["turn_idx"]
+    approx_equity = not state["community"]
+
+    parts = ['<div class="game-board-container"><div class="poker-table"></div>']
+    for i, p in enumerate(state["players"]):
+        if p["name"] == EMPTY_NAME:
+            head, body = seat_html(i, "", 0, False, None, "", "", False, False, False, "")
+            parts.append(head + body)
+            continue
+        folded = p["status"] == "folded"
+        show = i == my_seat or game_over
+        active = in_hand and i == curr_idx
+        head, body = seat_html(
+            i,
+            p["name"],
+            int(p["stack"]),
+            folded,
+            tuple(p["hand"]) if show else None,
+            p.get("role", ""),
+            p.get("action", ""),
+            active,
+            i == my_seat,
+            game_over and i in winner_set,
+            _equity_txt(seat_equity.get(i), approx_equity),
+        )
+        parts.append(head)
+        if active:
+            parts.append(countdown_html(time_left, turn_timeout, "turn-timer"))
+        parts.append(body)
+
+    showdown: Tuple[Tuple[str, Tuple[str, ...], str], ...] = ()
+    if game_over and state.get("showdown"):
+        showdown = tuple(
+            (line["name"], tuple(line.get("hole") or ()), line["desc"]) for line in state["showdown"]
+        )
+    parts.append(center_html(tuple(state["community"]), int(state["pot"]), state["msg"], showdown))
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def cache_stats() -> Dict[str, Tuple[int, int]]:
+    """조각별 (hits, misses)"""
+    return {
+        fn.__name__: (fn.cache_info().hits, fn.cache_info().misses)
+        for fn in (make_card, seat_html, center_html, _hud_pills)
+    }
+
+
+# =========================
+# 5. Self-check
+# =========================
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    import game
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(0)
+    random.seed(0)
+    room = game.init_room_state("render")
+    for k in range(6):
+        game.ensure_join(room, f"p{k + 1}")
+    game.start_if_ready(room)
+
+    # 액션 하나마다 관전자 3명이 리런 2번씩 한다고 치고 그린다
+    renders = 0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        if room.phase == "GAME_OVER":
+            room.game_over_at = 0.0
+            game.next_hand_if_due(room)
+        elif game.needs_runout(room):
+            game.runout_step(room)
+        elif rng.random() < 0.2:
+            game.act_fold(room, room.turn_idx)
+        else:
+            game.act_call_check(room, room.turn_idx)
+        state = room.to_state()
+        for viewer in (0, 1, 2):
+            for _ in range(2):
+                board_html(state, viewer, {}, 17.0, game.TURN_TIMEOUT)
+                renders += 1
+    dt = time.perf_counter() - t0
+    print(f"renders: {renders:,}  {dt / renders * 1e6:.1f} us/render (to_state 포함)")
+    for name, (hits, misses) in cache_stats().items():
+        total = max(1, hits + misses)
+        print(f"{name:<12} hits {hits:>8,}  misses {misses:>6,}  ({hits / total:.0%})")
@@ -0,0 +1,84 @@
+"""방 상태 JSON-patch (RFC 6902 부분집합: add / remove / replace)
+
+diff(old, new)는 바뀐 필드만 op로 만들고, apply_patch(doc, ops)는 그 op를
+제자리에서 적용한다. 리스트는 길이가 같으면 원소 단위, 끝에 붙거나(community)
+끝에서 빠진 경우는 add/remove로, 그 외에는 통째로 replace 한다.
+"""
+from typing import Any, Dict, List
+
+Op = Dict[str, Any]
+
+
+def _esc(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unesc(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Op]:
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+
+    if isinstance(new, dict):
+        ops: List[Op] = []
+        for k in old:
+            if k not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_esc(k)}"})
+        for k, v in new.items():
+            p = f"{path}/{_esc(k)}"
+            if k not in old:
+                ops.append({"op": "add", "path": p, "value": v})
+            elif old[k] != v:
+                ops.extend(diff(old[k], v, p))
+        return ops
+
+    if isinstance(new, list):
+        n_old, n_new = len(old), len(new)
+        if n_old == n_new:
+            ops = []
+            for i in range(n_new):
+                if old[i] != new[i]:
+                    ops.extend(diff(old[i], new[i], f"{path}/{i}"))
+            return ops
+        if n_new > n_old and new[:n_old] == old:
+            return [{"op": "add", "path": f"{path}/-", "value": v} for v in new[n_old:]]
+        if n_new < n_old and old[:n_new] == new:
+            return [{"op": "remove", "path": f"{path}/{i}"} for i in range(n_old - 1, n_new - 1, -1)]
+        return [{"op": "replace", "path": path, "value": new}]
+
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def apply_patch(doc: Any, ops: List[Op]) -> Any:
+    """ops를 doc에 적용한 결과. 루트 replace가 아니면 doc을 제자리에서 바꾼다"""
+    for op in ops:
+        path = op["path"]
+        if path == "":
+            doc = op["value"]
+            continue
+        tokens = [_unesc(t) for t in path[1:].split("/")]
+        parent = doc
+        for t in tokens[:-1]:
+            parent = parent[int(t)] if isinstance(parent, list) else parent[t]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            if op["op"] == "add":
+                if last == "-":
+                    parent.append(op["value"])
+                else:
+                    parent.insert(int(last), op["value"])
+            elif op["op"] == "remove":
+                del parent[int(last)]
+            else:
+                parent[int(last)] = op["value"]
+        else:
+            if op["op"] == "remove":
+                del parent[last]
+            else:
+                parent[last] = op["value"]
+    return doc
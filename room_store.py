@@ -0,0 +1,327 @@
+"""방 상태 저장소 (버전 기반 낙관적 동시성 + 델타 저장)
+
+- poker_rooms: 스냅샷 (state, version)
+- poker_room_events: 스냅샷 이후의 변경분. (room_code, version) 기본키,
+  patch는 room_patch의 JSON-patch op 목록
+
+저장은 "읽었던 version + 1"로 이벤트 행을 insert 한다. 같은 version을 다른
+클라이언트가 먼저 넣었으면 기본키 충돌(23505) → 최신 상태를 다시 읽어 같은
+액션을 다시 적용한다(최대 retries번). SNAPSHOT_EVERY 버전마다 스냅샷을
+갱신하고 그 이전 이벤트는 지운다. 스냅샷에 이미 들어간(지워진) version으로 넣는
+이벤트는 schema.sql의 poker_room_events_guard가 같은 23505로 거절하므로 오래된
+version으로 저장하려던 쪽도 충돌로 처리된다.
+
+읽기는 프로세스 공용 RoomCache를 거친다. TTL 안이면 DB를 안 읽고, 지나면
+캐시된 version 이후 이벤트만 받아 이어 붙인다. 같은 방을 여러 세션이 동시에
+읽어도 방별 락으로 한 번만 가져온다. 이 프로세스에서 저장하면 바로 갱신된다.
+
+client는 supabase_http.PostgrestClient 또는 fake_supabase.FakeSupabase (같은 체인 API).
+실패는 삼키고 errors / last_error / conflicts 지표로 남긴다 (요청 단위 지표는 client.stats()).
+"""
+import copy
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import metrics
+from room_patch import apply_patch, diff
+
+TABLE = "poker_rooms"
+EVENTS = "poker_room_events"
+SNAPSHOT_EVERY = 25
+# 패치가 이보다 크면(리셋/새 핸드 등) 바로 스냅샷도 갱신
+BIG_PATCH_BYTES = 4096
+ROOM_CACHE_TTL = 1.0  # 초. 폴링 주기(1.2초)보다 짧게
+
+State = Dict[str, Any]
+# 액션: 상태를 바꿔서 돌려준다. 쓸 게 없으면(조건 불충족 등) None
+Mutator = Callable[[State], Optional[State]]
+
+
+def _nbytes(v: Any) -> int:
+    return len(json.dumps(v, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _is_conflict(e: Exception) -> bool:
+    return str(getattr(e, "code", "")) == "23505"
+
+
+def _describe(e: Exception) -> str:
+    code = getattr(e, "code", "")
+    return f"{type(e).__name__}({code}): {e}" if code else f"{type(e).__name__}: {e}"
+
+
+class RoomCache:
+    """room_code → (state, version, 가져온 시각). 모든 세션이 공유"""
+
+    def __init__(self, ttl: float = ROOM_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[State, int, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lock_for(self, room_code: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(room_code)
+            if lock is None:
+                lock = self._locks[room_code] = threading.Lock()
+            return lock
+
+    def peek(self, room_code: str) -> Optional[Tuple[State, int, float]]:
+        return self._entries.get(room_code)
+
+    def put(self, room_code: str, state: State, version: int) -> None:
+        cur = self._entries.get(room_code)
+        if cur is not None and cur[1] > version:
+            return
+        self._entries[room_code] = (copy.deepcopy(state), version, time.monotonic())
+
+    def invalidate(self, room_code: str) -> None:
+        self._entries.pop(room_code, None)
+
+    def expire(self, room_code: str) -> None:
+        # 상태는 남겨두고 다음 읽기 때 이어 받기만 하게
+        cur = self._entries.get(room_code)
+        if cur is not None:
+            self._entries[room_code] = (cur[0], cur[1], float("-inf"))
+
+
+# Streamlit 서버 한 프로세스 안의 모든 세션이 공유
+shared_cache = RoomCache()
+
+
+class RoomStore:
+    def __init__(
+        self,
+        client: Any,
+        init_state: Callable[[str], State],
+        retries: int = 5,
+        cache: Optional[RoomCache] = shared_cache,
+        on_commit: Optional[Callable[[str, int], None]] = None,
+    ):
+        self.client = client
+        self.init_state = init_state
+        self.retries = retries
+        self.cache = cache
+        # 저장 성공 시 (room_code, version) 알림 (room_sync 브로커 publish 등)
+        self.on_commit = on_commit
+        self.conflicts = 0
+        self.errors = 0
+        self.last_error = ""
+        self.bytes_written = 0
+
+    def _failed(self, e: Exception) -> None:
+        # 삼키더라도 지표에는 남긴다 (화면/관리 패널에서 본다)
+        self.errors += 1
+        self.last_error = _describe(e)
+        metrics.inc("room_store_errors_total")
+
+    # ---------- raw row I/O ----------
+    def _apply_events(self, room_code: str, state: State, version: int) -> Tuple[State, int]:
+        ev = (
+            self.client
+            .table(EVENTS)
+            .select("version,patch")
+            .eq("room_code", room_code)
+            .gt("version", version)
+            .order("version")
+            .execute()
+        )
+        for e in ev.data or []:
+            if int(e["version"]) != version + 1:
+                # 읽는 사이에 스냅샷이 당겨지고 이벤트가 지워졌다 → 다시 읽기
+                raise LookupError("event gap")
+            state = apply_patch(state, e["patch"])
+            version += 1
+        return state, version
+
+    def _read_once(self, room_code: str) -> Optional[Tuple[State, int]]:
+        res = (
+            self.client
+            .table(TABLE)
+            .select("room_code,state,version,updated_at")
+            .eq("room_code", room_code)
+            .execute()
+        )
+        if not res.data:
+            return None
+        row = res.data[0]
+        return self._apply_events(room_code, row.get("state"), int(row.get("version") or 0))
+
+    @metrics.timed("room_store_seconds", op="get")
+    def get(self, room_code: str) -> Optional[Tuple[State, int]]:
+        """(state, version). 행이 없거나 읽기 실패면 None. 반환값은 호출자 소유"""
+        if self.client is None:
+            return None
+        cache = self.cache
+        if cache is None:
+            return self._read(room_code)
+
+        with cache.lock_for(room_code):
+            entry = cache.peek(room_code)
+            if entry is not None and time.monotonic() - entry[2] < cache.ttl:
+                cache.hits += 1
+                return copy.deepcopy(entry[0]), entry[1]
+            cache.misses += 1
+
+            got = None
+            if entry is not None:
+                # TTL이 지났으면 캐시된 version 이후 이벤트만 받아온다 (보통 0건)
+                try:
+                    got = self._apply_events(room_code, copy.deepcopy(entry[0]), entry[1])
+                except LookupError:
+                    got = None
+                except Exception as e:
+                    self._failed(e)
+                    return None
+            if got is None:
+                got = self._read(room_code)
+            if got is None:
+                cache.invalidate(room_code)
+                return None
+            cache.put(room_code, got[0], got[1])
+            return got
+
+    def _read(self, room_code: str) -> Optional[Tuple[State, int]]:
+        for _ in range(3):
+            try:
+                return self._read_once(room_code)
+            except LookupError:
+                continue
+            except Exception as e:
+                # 네트워크/권한/정책 문제 등으로 깨져도 앱 전체가 죽지 않게
+                self._failed(e)
+                return None
+        return None
+
+    def insert(self, room_code: str, state: State) -> bool:
+        """새 방 생성 (version 1). 이미 있으면 False"""
+        if self.client is None:
+            return False
+        try:
+            payload = {"room_code": room_code, "state": state, "version": 1}
+            self.client.table(TABLE).insert(payload).execute()
+            self.bytes_written += _nbytes(payload)
+            if self.cache is not None:
+                self.cache.put(room_code, state, 1)
+            if self.on_commit is not None:
+                self.on_commit(room_code, 1)
+            return True
+        except Exception as e:
+            if not _is_conflict(e):
+                self._failed(e)
+            return False
+
+    @metrics.timed("room_store_seconds", op="cas")
+    def compare_and_swap(
+        self,
+        room_code: str,
+        state: State,
+        version: int,
+        base: Optional[State] = None,
+    ) -> Optional[int]:
+        """version이 그대로일 때만 base → state 변경분을 이벤트로 저장.
+
+        성공 시 새 version, 충돌/실패 시 None. base가 없으면 전체 교체 패치.
+        """
+        if self.client is None:
+            return None
+        ops: List[Dict[str, Any]] = (
+            diff(base, state) if base is not None else [{"op": "replace", "path": "", "value": state}]
+        )
+        if not ops:
+            return version
+
+        new_version = version + 1
+        payload = {"room_code": room_code, "version": new_version, "patch": ops}
+        try:
+            self.client.table(EVENTS).insert(payload).execute()
+        except Exception as e:
+            if _is_conflict(e):
+                self.conflicts += 1
+                metrics.inc("room_store_conflicts_total")
+            else:
+                self._failed(e)
+            # 누군가 먼저 썼다 → 다음 읽기는 DB에서 이어 받기
+            if self.cache is not None:
+                self.cache.expire(room_code)
+            return None
+
+        if self.cache is not None:
+            self.cache.put(room_code, state, new_version)
+        if self.on_commit is not None:
+            self.on_commit(room_code, new_version)
+        size = _nbytes(payload)
+        self.bytes_written += size
+        if new_version % SNAPSHOT_EVERY == 0 or size > BIG_PATCH_BYTES:
+            self.compact(room_code, state, new_version)
+        return new_version
+
+    @metrics.timed("room_store_seconds", op="compact")
+    def compact(self, room_code: str, state: State, version: int) -> None:
+        """스냅샷을 version으로 당기고 그 이하 이벤트 삭제 (실패해도 다음 기회에)"""
+        try:
+            res = (
+                self.client
+                .table(TABLE)
+                .update({"state": state, "version": version})
+                .eq("room_code", room_code)
+                .lt("version", version)
+                .execute()
+            )
+            if res.data:
+                self.bytes_written += _nbytes(state)
+            (
+                self.client
+                .table(EVENTS)
+                .delete()
+                .eq("room_code", room_code)
+                .lte("version", version)
+                .execute()
+            )
+        except Exception as e:
+            self._failed(e)
+
+    # ---------- room level ----------
+    def load(self, room_code: str) -> Tuple[State, int]:
+        got = self.get(room_code)
+        if got is not None:
+            return got
+        state = self.init_state(room_code)
+        if self.insert(room_code, state):
+            return state, 1
+        # 다른 클라이언트가 먼저 만들었으면 그걸 쓴다
+        got = self.get(room_code)
+        return got if got is not None else (state, 0)
+
+    def mutate(
+        self,
+        room_code: str,
+        fn: Mutator,
+        base: Optional[Tuple[State, int]] = None,
+    ) -> Optional[Tuple[State, int]]:
+        """읽기 → fn 적용 → CAS 저장. 충돌하면 새 상태로 fn을 다시 적용한다.
+
+        base를 주면 첫 시도는 이미 읽어둔 (state, version)을 쓴다.
+        fn이 None을 돌려주면 저장 없이 읽은 상태를 그대로 반환한다.
+        재시도를 다 써도 저장 못 하면 None.
+        """
+        for attempt in range(self.retries + 1):
+            if attempt == 0 and base is not None:
+                state, version = base
+            else:
+                state, version = self.load(room_code)
+            before = copy.deepcopy(state)
+            new_state = fn(state)
+            if new_state is None:
+                return before, version
+            new_version = self.compare_and_swap(room_code, new_state, version, base=before)
+            if new_version is not None:
+                return new_state, new_version
+            # 같은 틱에 몰린 클라이언트끼리 다시 부딪히지 않게 조금 흩어준다
+            time.sleep(random.uniform(0, 0.005 * (attempt + 1)))
+        return None
@@ -0,0 +1,113 @@
+"""방 변경 알림 (폴링 대신 푸시)
+
+저장이 성공하면 (room_code, version)을 브로커에 publish 하고, 화면 스크립트는
+마지막으로 본 version보다 새 version이 올 때까지(또는 타이머 마감까지) 기다렸다가
+다시 그린다. 아무 일 없는 테이블은 DB도 안 읽고 리런도 안 한다.
+
+- InMemoryBroker: 한 프로세스 안의 세션끼리 (Streamlit 서버 1대, 테스트)
+- PostgresListener: LISTEN poker_rooms → 다른 프로세스/서버의 저장도 받아서
+  로컬 브로커로 다시 publish (schema.sql의 pg_notify 트리거가 보냄)
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class InMemoryBroker:
+    def __init__(self) -> None:
+        self._versions: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self.published = 0
+
+    def publish(self, room_code: str, version: int) -> None:
+        with self._cond:
+            if version <= self._versions.get(room_code, 0):
+                return
+            self._versions[room_code] = version
+            self.published += 1
+            self._cond.notify_all()
+
+    def latest(self, room_code: str) -> int:
+        return self._versions.get(room_code, 0)
+
+    def wait_for_change(self, room_code: str, known_version: int, timeout: float) -> bool:
+        """known_version보다 새 version이 오면 True, timeout이면 False"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._versions.get(room_code, 0) > known_version, timeout)
+
+
+class PostgresListener:
+    """poker_rooms 채널 LISTEN (psycopg 3 필요, 없으면 start()가 False)"""
+
+    CHANNEL = "poker_rooms"
+
+    def __init__(self, dsn: str, on_remote: Callable[[str, int], None]):
+        self.dsn = dsn
+        self.on_remote = on_remote
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None
+
+    def start(self) -> bool:
+        try:
+            import psycopg  # noqa: F401
+        except Exception as e:
+            self.error = str(e)
+            return False
+        self._thread = threading.Thread(target=self._run, name="poker-rooms-listen", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self) -> None:
+        import psycopg
+
+        while True:
+            try:
+                with psycopg.connect(self.dsn, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {self.CHANNEL}")
+                    self.error = None
+                    for n in conn.notifies():
+                        room_code, _, version = n.payload.rpartition(":")
+                        if room_code and version.isdigit():
+                            self.on_remote(room_code, int(version))
+            except Exception as e:
+                # 연결 끊김 → 잠깐 쉬고 재연결. 그동안은 화면 쪽 마감 타이머로 버틴다
+                self.error = str(e)
+                time.sleep(2.0)
+
+
+def wait_for_change(
+    broker: InMemoryBroker,
+    room_code: str,
+    known_version: int,
+    until: float,
+    on_tick: Callable[[], None],
+    slice_sec: float = 0.25,
+) -> bool:
+    """until(time.time 기준)까지 변경을 기다린다.
+
+    on_tick은 조각마다 불린다. 화면 쪽에서는 여기서 Streamlit 명령을 하나 불러
+    그 사이 들어온 버튼 클릭(리런 요청)이 바로 반영되게 한다.
+    """
+    while True:
+        left = until - time.time()
+        if left <= 0:
+            return False
+        if broker.wait_for_change(room_code, known_version, min(slice_sec, left)):
+            return True
+        on_tick()
+
+
+# Streamlit 서버 한 프로세스 안의 모든 세션이 공유
+shared_broker = InMemoryBroker()
+_listener: Optional[PostgresListener] = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener(dsn: str, on_remote: Callable[[str, int], None]) -> PostgresListener:
+    """프로세스당 LISTEN 스레드 하나"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = PostgresListener(dsn, on_remote)
+            _listener.start()
+        return _listener
@@ -0,0 +1,62 @@
+-- Supabase (Postgres) 스키마
+
+create table if not exists poker_rooms (
+  room_code  text primary key,
+  state      jsonb not null,
+  version    bigint not null default 0,  -- CAS 저장용, 저장마다 +1
+  updated_at timestamptz not null default now()
+);
+
+-- 기존 테이블 마이그레이션
+alter table poker_rooms add column if not exists version bigint not null default 0;
+
+create or replace function poker_rooms_touch() returns trigger as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists poker_rooms_touch on poker_rooms;
+create trigger poker_rooms_touch before update on poker_rooms
+  for each row execute function poker_rooms_touch();
+
+-- 스냅샷 이후 변경분 (JSON-patch). (room_code, version) 기본키가 곧 CAS
+create table if not exists poker_room_events (
+  room_code  text not null references poker_rooms(room_code) on delete cascade,
+  version    bigint not null,
+  patch      jsonb not null,
+  created_at timestamptz not null default now(),
+  primary key (room_code, version)
+);
+
+-- 스냅샷에 이미 들어간(압축으로 지워진) version에는 이벤트를 못 넣게: 오래된 상태로 CAS 한
+-- 클라이언트가 지워진 번호에 써서 성공한 것처럼 보이는 것을 막는다. 기본키 충돌과 같은 23505
+create or replace function poker_room_events_guard() returns trigger as $$
+begin
+  if new.version <= (select version from poker_rooms where room_code = new.room_code for share) then
+    raise exception 'version % already compacted', new.version using errcode = 'unique_violation';
+  end if;
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists poker_room_events_guard on poker_room_events;
+create trigger poker_room_events_guard before insert on poker_room_events
+  for each row execute function poker_room_events_guard();
+
+-- 저장 알림 (room_sync.PostgresListener가 LISTEN poker_rooms). payload = 'room_code:version'
+create or replace function poker_rooms_notify() returns trigger as $$
+begin
+  perform pg_notify('poker_rooms', new.room_code || ':' || new.version);
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists poker_room_events_notify on poker_room_events;
+create trigger poker_room_events_notify after insert on poker_room_events
+  for each row execute function poker_rooms_notify();
+
+drop trigger if exists poker_rooms_notify on poker_rooms;
+create trigger poker_rooms_notify after insert on poker_rooms
+  for each row execute function poker_rooms_notify();
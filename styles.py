@@ -0,0 +1,215 @@
+"""화면 CSS (사이드바/위젯 글씨 가독성 + 전체 테마)
+
+app.py 리런 경로에서 큰 문자열 리터럴을 매번 다시 만들지 않도록 모듈 상수로 둔다.
+"""
+
+CSS = """
+<style>
+/* base */
+.stApp { background:#0f0f10; color:#fff; }
+.stApp > header { visibility:hidden; }
+div[data-testid="stStatusWidget"]{visibility:hidden;}
+div[data-testid="stDecoration"] {display:none;} /* 상단 빈 막대 제거 */
+footer {visibility:hidden;}
+
+/* ===== Sidebar 가독성 Fix ===== */
+section[data-testid="stSidebar"]{
+  background:#0f0f10 !important;
+  border-right:1px solid #222 !important;
+}
+section[data-testid="stSidebar"] *{
+  color:#ffffff !important;
+}
+section[data-testid="stSidebar"] input,
+section[data-testid="stSidebar"] textarea{
+  background:#151515 !important;
+  color:#ffffff !important;
+  border:1px solid #333 !important;
+}
+section[data-testid="stSidebar"] input::placeholder,
+section[data-testid="stSidebar"] textarea::placeholder{
+  color:#bdbdbd !important;
+}
+section[data-testid="stSidebar"] .stCaption,
+section[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] p{
+  color:#e0e0e0 !important;
+}
+
+/* Streamlit 기본 위젯 글씨 */
+label, .stMarkdown, .stCaption, .stText{
+  color:#fff !important;
+}
+div[data-baseweb="input"] input{
+  color:#fff !important;
+}
+
+/* 버튼 글씨가 안 보이는 문제 방지 */
+.stButton > button{
+  color:#000 !important;
+  font-weight:900 !important;
+}
+
+/* HUD */
+.hud-wrap{
+  display:flex; align-items:center; justify-content:space-between;
+  gap:12px; padding:10px 12px; border-radius:16px;
+  border:1px solid #2a2a2a; background: rgba(0,0,0,0.35);
+  margin-bottom: 10px;
+}
+.hud-left{ display:flex; gap:8px; flex-wrap:wrap; align-items:center; }
+.pill{
+  padding:6px 10px; border-radius:999px; font-weight:800; font-size:12px;
+  border:1px solid rgba(255,0,0,0.6);
+  background: rgba(255,0,0,0.12);
+  color:#ff4d4d;
+}
+.pill-white{
+  border:1px solid #2a2a2a; background:rgba(255,255,255,0.06);
+  color:#fff;
+}
+.timer-box{
+  min-width:120px; text-align:center;
+  padding:8px 12px; border-radius:14px;
+  border:1px solid rgba(255,235,59,0.35);
+  background: rgba(0,0,0,0.55);
+  color:#ffeb3b; font-weight:900; font-size:18px;
+}
+
+/* Table board */
+.game-board-container{
+  position:relative; width:100%;
+  min-height:520px; height: 72vh;
+  background:#151515; border-radius:22px;
+  border:2px solid #262626; overflow:hidden;
+}
+.poker-table{
+  position:absolute; top:50%; left:50%;
+  transform:translate(-50%,-50%);
+  width: 92%; height: 75%;
+  background: radial-gradient(#5d4037, #2b1a17);
+  border: 12px solid #1b0f0e;
+  border-radius: 160px;
+  box-shadow: inset 0 0 30px rgba(0,0,0,0.85);
+}
+.seat{
+  position:absolute; width:105px; height:115px;
+  background:#0f0f10; border:2px solid #3a3a3a;
+  border-radius:14px; color:white;
+  text-align:center; font-size:10px;
+  display:flex; flex-direction:column;
+  justify-content:center; align-items:center;
+  z-index:10;
+}
+.pos-0 {top:5%; right:20%;}
+.pos-1 {top:25%; right:3%;}
+.pos-2 {bottom:25%; right:3%;}
+.pos-3 {bottom:5%; right:20%;}
+.pos-4 {bottom:2%; left:50%; transform:translateX(-50%);}
+.pos-5 {bottom:5%; left:20%;}
+.pos-6 {bottom:25%; left:3%;}
+.pos-7 {top:25%; left:3%;}
+.pos-8 {top:5%; left:20%;}
+
+.hero-seat{ border:3px solid #ffeb3b; box-shadow:0 0 18px rgba(255,235,59,0.55); }
+.active-turn{ border:3px solid #ffeb3b !important; box-shadow:0 0 18px rgba(255,235,59,0.55); }
+
+.winner-seat{
+  border:3px solid #00e676 !important;
+  box-shadow:0 0 22px rgba(0,230,118,0.7);
+  animation: winnerPulse 0.9s ease-in-out infinite alternate;
+}
+@keyframes winnerPulse { from { transform: scale(1.0); } to { transform: scale(1.03); } }
+
+.role-badge{
+  position:absolute; top:-9px; left:-9px;
+  min-width:28px; height:28px;
+  padding:0 6px; border-radius:999px;
+  color:#000; font-weight:900; line-height:26px;
+  border:1px solid #111;
+  z-index:50; font-size:11px;
+  background:#fff;
+}
+.role-D { background:#ffeb3b; }
+.role-SB { background:#90caf9; }
+.role-BB { background:#ef9a9a; }
+.role-D-SB { background: linear-gradient(135deg, #ffeb3b 50%, #90caf9 50%); font-size:10px; }
+
+.action-badge{
+  position:absolute; bottom:-12px;
+  background:#ffeb3b; color:#000;
+  font-weight:900; padding:2px 6px;
+  border-radius:6px; font-size:10px;
+  border:1px solid #000;
+  z-index:50; white-space: nowrap;
+}
+.equity-badge{
+  position:absolute; top:-9px; right:-9px;
+  background:rgba(0,0,0,0.8); color:#00e676;
+  font-weight:900; padding:1px 6px;
+  border-radius:6px; font-size:11px;
+  border:1px solid rgba(0,230,118,0.55);
+  z-index:55; white-space: nowrap;
+}
+.turn-timer{
+  position:absolute; top:-24px;
+  width:100%; text-align:center;
+  color:#ffeb3b; font-weight:900; font-size:12px;
+  z-index:60;
+}
+.turn-note{
+  padding:10px 14px; border-radius:10px; margin-bottom:8px;
+  background:rgba(0,230,118,0.15); border:1px solid rgba(0,230,118,0.45);
+  color:#00e676; font-weight:900;
+}
+.turn-note .countdown{ display:inline-block; margin-left:4px; }
+
+/* 카운트다운: 남은 초를 브라우저가 줄인다 (render.countdown_html) */
+@property --cd { syntax:'<integer>'; inherits:false; initial-value:0; }
+@property --cd-m { syntax:'<integer>'; inherits:false; initial-value:0; }
+@keyframes cdTick { from { --cd: var(--cd-from); } to { --cd: 0; } }
+.countdown{ animation-name:cdTick; animation-timing-function:linear; animation-fill-mode:forwards; }
+.cd-loop{ animation-iteration-count:infinite; }
+.cd-sec{ counter-reset: cds var(--cd); }
+.cd-sec::after{ content: counter(cds) "s"; }
+.cd-clock{ --cd-m: calc((var(--cd) - 29.5) / 60); counter-reset: cdm var(--cd-m) cds calc(var(--cd) - var(--cd-m) * 60); }
+.cd-clock::after{ content: counter(cdm, decimal-leading-zero) ":" counter(cds, decimal-leading-zero); }
+.card-span{
+  background:white; padding:2px 6px; border-radius:6px;
+  margin:1px; font-weight:900; font-size:18px;
+  color:black; border:1px solid #ccc; display:inline-block;
+}
+.comm-card-span{ font-size:30px !important; padding:4px 8px !important; }
+
+.fold-text{ color:#ff5252; font-weight:900; font-size:14px; }
+.folded-seat{ opacity:0.45; }
+
+.center-msg{
+  position:absolute; top:48%; left:50%;
+  transform:translate(-50%,-50%);
+  text-align:center; color:white; width:100%;
+}
+.center-msg h3{ margin:6px 0; font-size:22px; }
+.center-msg .phase{
+  display:inline-block;
+  padding:6px 10px;
+  background:rgba(0,0,0,0.65);
+  border:1px solid rgba(255,235,59,0.22);
+  border-radius:10px;
+  color:#ffeb3b;
+  font-weight:900;
+}
+.showdown-box{
+  margin-top:10px;
+  font-size:14px;
+  color:#fff;
+}
+.showdown-line{
+  margin:6px auto;
+  width: fit-content;
+  padding:6px 10px;
+  border-radius:12px;
+  background: rgba(0,0,0,0.55);
+  border: 1px solid rgba(255,255,255,0.12);
+}
+</style>
+"""
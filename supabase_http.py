@@ -0,0 +1,273 @@
+"""Supabase(PostgREST) HTTP 클라이언트 — 프로세스 공용 커넥션 풀
+
+supabase-py create_client 대신 쓴다. room_store가 쓰는 체인 API
+(table().select/insert/upsert/update/delete + eq/gt/lt/lte/order + execute)를
+그대로 흉내 내므로 RoomStore에 FakeSupabase 자리 그대로 넣으면 된다.
+
+- 전송은 httpx.AsyncClient 하나 (keep-alive 풀, h2가 있으면 HTTP/2 멀티플렉싱,
+  연결/읽기 타임아웃). 전용 스레드의 이벤트 루프에서 돌고, 동기 execute()는
+  그 루프에 요청을 넘기고 기다린다. async 쪽은 execute_async()를 await.
+- 재시도: 연결 실패/타임아웃/429/5xx는 지수 백오프(+지터)로 RETRIES번까지.
+  단 POST(insert/upsert)는 서버에 안 닿은 게 확실한 경우(연결 실패, 429)만
+  다시 보낸다. 이벤트 insert가 두 번 들어가면 가짜 충돌(23505)이 나므로.
+- 실패는 APIError(code, message)로 올린다. code는 PostgREST 오류 코드
+  (23505 등) 또는 "http_<status>" / "network". 요청 수/재시도/오류 종류/지연
+  분포는 stats()로 본다.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+import metrics
+
+TIMEOUT = httpx.Timeout(5.0, connect=3.0)
+LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=30.0)
+RETRIES = 3
+BACKOFF = 0.05  # 첫 재시도 대기(초). 매번 2배 + 지터
+RETRY_STATUS = (408, 429, 500, 502, 503, 504)
+LATENCY_SAMPLES = 4096  # 지연 분포는 최근 이만큼만
+
+
+def _has_h2() -> bool:
+    try:
+        import h2  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+class APIError(Exception):
+    def __init__(self, code: str, message: str, status: int = 0):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+class Response:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+def _value(v: Any) -> str:
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if v is None:
+        return "null"
+    return str(v)
+
+
+class Query:
+    def __init__(self, client: "PostgrestClient", table: str):
+        self.client = client
+        self.table = table
+        self.method = "GET"
+        self.payload: Any = None
+        self.params: List[Tuple[str, str]] = []
+        self.prefer: List[str] = []
+
+    # ----- builders -----
+    def select(self, columns: str = "*") -> "Query":
+        self.method = "GET"
+        self.params.append(("select", columns.replace(" ", "")))
+        return self
+
+    def insert(self, row: Dict[str, Any]) -> "Query":
+        self.method, self.payload = "POST", row
+        self.prefer.append("return=representation")
+        return self
+
+    def upsert(self, row: Dict[str, Any]) -> "Query":
+        self.method, self.payload = "POST", row
+        self.prefer += ["resolution=merge-duplicates", "return=representation"]
+        return self
+
+    def update(self, fields: Dict[str, Any]) -> "Query":
+        self.method, self.payload = "PATCH", fields
+        self.prefer.append("return=representation")
+        return self
+
+    def delete(self) -> "Query":
+        self.method = "DELETE"
+        self.prefer.append("return=representation")
+        return self
+
+    def _filter(self, op: str, column: str, value: Any) -> "Query":
+        self.params.append((column, f"{op}.{_value(value)}"))
+        return self
+
+    def eq(self, column: str, value: Any) -> "Query":
+        return self._filter("eq", column, value)
+
+    def gt(self, column: str, value: Any) -> "Query":
+        return self._filter("gt", column, value)
+
+    def lt(self, column: str, value: Any) -> "Query":
+        return self._filter("lt", column, value)
+
+    def lte(self, column: str, value: Any) -> "Query":
+        return self._filter("lte", column, value)
+
+    def order(self, column: str, desc: bool = False) -> "Query":
+        self.params.append(("order", f"{column}.{'desc' if desc else 'asc'}"))
+        return self
+
+    # ----- run -----
+    async def execute_async(self) -> Response:
+        headers = {"Prefer": ",".join(self.prefer)} if self.prefer else {}
+        data = await self.client.request(self.method, self.table, self.params, self.payload, headers)
+        return Response(data)
+
+    def execute(self) -> Response:
+        return self.client.run(self.execute_async())
+
+
+class PostgrestClient:
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        http2: Optional[bool] = None,
+        retries: int = RETRIES,
+        timeout: httpx.Timeout = TIMEOUT,
+        limits: httpx.Limits = LIMITS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = url.rstrip("/") + "/rest/v1/"
+        self.headers = {"apikey": key, "Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+        self.http2 = _has_h2() if http2 is None else http2
+        self.retries = retries
+        self.timeout = timeout
+        self.limits = limits
+        self.transport = transport
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # 지표 (루프 스레드에서만 쓴다)
+        self.counts: Dict[str, int] = dict.fromkeys(("requests", "ok", "retries", "failed"), 0)
+        self.errors: Dict[str, int] = {}
+        self.latency: Dict[str, Deque[float]] = {}
+
+    # ---------- lifecycle ----------
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self.loop is not None:
+                return self.loop
+            ready = threading.Event()
+
+            def run() -> None:
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self.loop = loop
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="supabase-http", daemon=True)
+            self._thread.start()
+            ready.wait()
+            return self.loop
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self.transport,
+            )
+        return self._http
+
+    def run(self, coro: Any) -> Any:
+        """동기 호출용: 클라이언트 루프에서 돌리고 결과를 기다린다"""
+        loop = self._start()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self) -> None:
+        if self.loop is None:
+            return
+        if self._http is not None:
+            self.run(self._http.aclose())
+            self._http = None
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop = None
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    # ---------- request ----------
+    def _error(self, kind: str) -> None:
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+        metrics.inc("supabase_http_errors_total", kind=kind)
+
+    async def request(
+        self, method: str, table: str, params: List[Tuple[str, str]], payload: Any, headers: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        if self.loop is None or asyncio.get_running_loop() is not self.loop:
+            # 다른 루프(엔진 등)에서 await 해도 풀은 클라이언트 루프 것 하나만 쓴다
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(
+                    self.request(method, table, params, payload, headers), self._start()
+                )
+            )
+        http = self._client()
+        body = None if payload is None else json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        samples = self.latency.setdefault(f"{method} {table}", deque(maxlen=LATENCY_SAMPLES))
+        self.counts["requests"] += 1
+        attempt = 0
+        while True:
+            t0 = time.perf_counter()
+            retry_ok = False
+            try:
+                res = await http.request(method, table, params=params, content=body, headers=headers)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # 서버에 안 닿았다 → 어떤 요청이든 다시 보내도 안전
+                kind, err, retry_ok = "connect", APIError("network", str(e) or type(e).__name__), True
+            except httpx.TransportError as e:
+                kind, err, retry_ok = "network", APIError("network", str(e) or type(e).__name__), method != "POST"
+            else:
+                dt = time.perf_counter() - t0
+                samples.append(dt)
+                metrics.observe("supabase_http_seconds", dt, method=method, table=table)
+                if res.status_code < 400:
+                    self.counts["ok"] += 1
+                    return res.json() if res.content else []
+                try:
+                    info = res.json()
+                except ValueError:
+                    info = {}
+                code = str(info.get("code") or f"http_{res.status_code}")
+                kind = "conflict" if code == "23505" else f"http_{res.status_code}"
+                err = APIError(code, str(info.get("message") or res.text[:200]), res.status_code)
+                if res.status_code in RETRY_STATUS:
+                    retry_ok = method != "POST" or res.status_code == 429
+            self._error(kind)
+            if not retry_ok or attempt >= self.retries:
+                self.counts["failed"] += 1
+                raise err
+            attempt += 1
+            self.counts["retries"] += 1
+            metrics.inc("supabase_http_retries_total")
+            await asyncio.sleep(BACKOFF * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+
+    # ---------- metrics ----------
+    def stats(self) -> Dict[str, Any]:
+        """요청/재시도/오류 수와 요청 종류별 지연 p50/p99(ms)"""
+        latency = {}
+        for op, samples in list(self.latency.items()):
+            xs = sorted(samples)
+            if xs:
+                latency[op] = {
+                    "n": len(xs),
+                    "p50_ms": xs[len(xs) // 2] * 1000,
+                    "p99_ms": xs[min(len(xs) - 1, int(len(xs) * 0.99))] * 1000,
+                }
+        return {**self.counts, "errors": dict(self.errors), "latency": latency, "http2": self.http2}
@@ -0,0 +1,190 @@
+"""엔진 메모리용 방/좌석 모델 (__slots__)
+
+엔진과 game.py는 이 객체를 직접 다루고, jsonb(dict) 모양으로는 저장소
+경계(Room.from_state / Room.to_state)에서만 바꾼다. 좌석 상태는 int 코드,
+빈 자리 여부는 occupied 플래그라서 좌석 스캔이 문자열 비교 없이 끝난다.
+접속 유지(하트비트) 시각은 방 상태에 없다 → presence.py
+"""
+from typing import Any, Dict, List
+
+EMPTY_NAME = "빈 자리"
+NUM_SEATS = 9
+
+# 좌석 상태 코드 ↔ 저장용 문자열
+STANDBY, ALIVE, FOLDED = 0, 1, 2
+STATUS_NAMES = ("standby", "alive", "folded")
+STATUS_CODES = {name: i for i, name in enumerate(STATUS_NAMES)}
+
+
+class Seat:
+    __slots__ = (
+        "occupied",
+        "name",
+        "seat",
+        "stack",
+        "hand",
+        "bet",
+        "contrib",
+        "status",
+        "action",
+        "is_human",
+        "role",
+        "has_acted",
+        "rebuy_count",
+    )
+
+    def __init__(self, seat: int):
+        self.seat = seat
+        self.vacate()
+
+    def vacate(self) -> None:
+        self.occupied = False
+        self.name = EMPTY_NAME
+        self.stack = 0
+        self.hand: List[str] = []
+        self.bet = 0
+        self.contrib = 0  # 이번 핸드에 팟에 넣은 총액 (스트리트 지나도 유지, pots.py)
+        self.status = STANDBY
+        self.action = ""
+        self.is_human = False
+        self.role = ""
+        self.has_acted = False
+        self.rebuy_count = 0
+
+    def sit(self, name: str, stack: int, is_human: bool) -> None:
+        self.occupied = True
+        self.name = name
+        self.stack = stack
+        self.hand = []
+        self.bet = 0
+        self.contrib = 0
+        self.status = FOLDED
+        self.action = "관전 대기 중"
+        self.is_human = is_human
+        self.role = ""
+        self.has_acted = True
+        self.rebuy_count = 0
+
+    # ---------- storage boundary ----------
+    @classmethod
+    def from_state(cls, d: Dict[str, Any], idx: int) -> "Seat":
+        s = cls.__new__(cls)
+        s.name = d.get("name", EMPTY_NAME)
+        s.occupied = s.name != EMPTY_NAME
+        s.seat = int(d.get("seat", idx + 1))
+        s.stack = int(d.get("stack", 0))
+        s.hand = list(d.get("hand") or [])
+        s.bet = int(d.get("bet", 0))
+        s.contrib = int(d.get("contrib", 0))
+        s.status = STATUS_CODES.get(d.get("status", "standby"), STANDBY)
+        s.action = d.get("action", "")
+        s.is_human = bool(d.get("is_human", False))
+        s.role = d.get("role", "")
+        s.has_acted = bool(d.get("has_acted", False))
+        s.rebuy_count = int(d.get("rebuy_count", 0))
+        return s
+
+    def to_state(self) -> Dict[str, Any]:
+        return dict(
+            name=self.name,
+            seat=self.seat,
+            stack=self.stack,
+            hand=list(self.hand),
+            bet=self.bet,
+            contrib=self.contrib,
+            status=STATUS_NAMES[self.status],
+            action=self.action,
+            is_human=self.is_human,
+            role=self.role,
+            has_acted=self.has_acted,
+            rebuy_count=self.rebuy_count,
+        )
+
+
+# Room 필드 중 저장 시 그대로 복사되는 것 (players 제외)
+ROOM_FIELDS = (
+    "room_code",
+    "pot",
+    # 이번 핸드 덱: 공개 nonce + 시드 커밋(sha256) + 뽑은 장 수. 시드는 서버 비밀로만 만들 수 있고
+    # 핸드가 끝나면 deck_reveal로 공개한다 (dealing.py 커밋-공개)
+    "deck_nonce",
+    "deck_commit",
+    "deck_pos",
+    "deck_reveal",
+    "community",
+    "phase",
+    "current_bet",
+    "turn_idx",
+    "dealer_idx",
+    "level",
+    "started_at",
+    "hand_started_at",
+    "turn_started_at",
+    "game_over_at",
+    "msg",
+    "showdown",
+    "winners",
+    "hand_no",
+    # 토너먼트 테이블 ("" = 일반 방). busted/moved_out은 마지막 핸드 경계 결과
+    "tournament_id",
+    "busted",
+    "moved_out",
+)
+
+
+class Room:
+    # deck_seed: 서버 메모리에서만 쓰는 이번 핸드 시드 캐시 (hex, 저장/전송 안 함)
+    __slots__ = ROOM_FIELDS + ("players", "extra", "deck_seed")
+
+    def __init__(self, room_code: str):
+        self.room_code = room_code
+        self.players: List[Seat] = [Seat(i + 1) for i in range(NUM_SEATS)]
+        self.pot = 0
+        self.deck_nonce = ""
+        self.deck_commit = ""
+        self.deck_pos = 0
+        self.deck_reveal = ""
+        self.deck_seed = ""
+        self.community: List[str] = []
+        self.phase = "WAITING"  # WAITING/PREFLOP/FLOP/TURN/RIVER/GAME_OVER
+        self.current_bet = 0
+        self.turn_idx = 0
+        self.dealer_idx = 0
+        self.level = 1
+        self.started_at = 0.0
+        self.hand_started_at = 0.0
+        self.turn_started_at = 0.0
+        self.game_over_at = 0.0
+        self.msg = ""
+        self.showdown: List[Dict[str, Any]] = []
+        self.winners: List[int] = []
+        self.hand_no = 0
+        self.tournament_id = ""
+        self.busted: List[str] = []
+        self.moved_out: List[List[Any]] = []
+        # 모델에 없는 키(다른 버전이 쓴 필드)는 그대로 들고 있다가 다시 저장
+        self.extra: Dict[str, Any] = {}
+
+    @classmethod
+    def from_state(cls, d: Dict[str, Any]) -> "Room":
+        r = cls.__new__(cls)
+        r.players = [Seat.from_state(p, i) for i, p in enumerate(d.get("players") or [])]
+        while len(r.players) < NUM_SEATS:
+            r.players.append(Seat(len(r.players) + 1))
+        for f in ROOM_FIELDS:
+            v = d.get(f, _ROOM_DEFAULTS[f])
+            setattr(r, f, list(v) if isinstance(v, list) else v)
+        r.extra = {k: v for k, v in d.items() if k not in ROOM_FIELDS and k != "players"}
+        r.deck_seed = ""
+        return r
+
+    def to_state(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = dict(self.extra)
+        for f in ROOM_FIELDS:
+            v = getattr(self, f)
+            d[f] = list(v) if isinstance(v, list) else v
+        d["players"] = [p.to_state() for p in self.players]
+        return d
+
+
+_ROOM_DEFAULTS: Dict[str, Any] = {f: getattr(Room(""), f) for f in ROOM_FIELDS}
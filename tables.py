@@ -0,0 +1,154 @@
+"""미리 계산한 포커 표 (프리플랍 에퀴티 / 플랍 강도 버킷) — mmap 로더
+
+tools/build_tables.py가 만든 바이너리 파일 하나를 읽기 전용 mmap으로 열고
+np.frombuffer로 배열을 얹는다. 복사가 없으므로 Streamlit 워커/엔진 프로세스가
+여러 개여도 OS 페이지 캐시의 한 벌을 같이 쓰고, 로드는 헤더만 읽어서 바로 끝난다.
+
+키는 전부 hand_eval / dealing과 같은 카드 정수(rank_idx*4 + suit_idx).
+
+    preflop_win[i, j], preflop_tie[i, j]   클래스 i가 클래스 j와 올인했을 때 (uint16, /65535)
+    preflop_vs_random[i]                    클래스 i의 무작위 한 손 상대 에퀴티 (uint16, /65535)
+    flop_bucket[flop_idx, hole_idx]         bots.postflop_bucket과 같은 0~5 (uint8, 255 = 카드 겹침)
+    eval_flush[mask]                        hand_eval 플러시 표 (uint32, 8192)
+    eval_product_key / eval_product_score   hand_eval 소수곱 → 점수 (uint64 / uint32, 정렬)
+
+eval_* 섹션은 없어도 된다(예전 파일). 없으면 hand_eval이 처음 쓸 때 직접 만든다.
+
+클래스 번호는 class_index(13*hi+lo 수딧 / 13*lo+hi 오프수트 / 대각선 페어).
+hole_idx / flop_idx는 카드 정수 조합의 colex 순위(combo_index).
+
+턴은 표로 만들지 않았다. (턴 보드 270,725 × 홀 1,326 = 359MB) 턴/리버는
+bots.postflop_bucket의 계산 + lru_cache 경로 그대로.
+
+파일 포맷: 헤더 [magic 4B][version u32][섹션 수 u32] + 섹션마다
+[이름 24B][dtype 4B][rows u32][cols u32][offset u64], 데이터는 64B 정렬.
+"""
+import mmap
+import os
+import struct
+from math import comb
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"PKTB"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+SECTION = struct.Struct("<24s4sIIQ")
+ALIGN = 64
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "poker_tables.bin")
+
+NO_BUCKET = 255
+EQ_SCALE = 65535
+
+
+# =========================
+# 1. Index
+# =========================
+def combo_index(cards: Sequence[int]) -> int:
+    """서로 다른 카드 정수 k장 → colex 순위 (0 .. C(52,k)-1)"""
+    return sum(comb(c, k + 1) for k, c in enumerate(sorted(cards)))
+
+
+def class_index(c1: int, c2: int) -> int:
+    """두 장(정수 카드) → 169 클래스. 13*hi+lo: 수딧은 hi>lo, 오프수트는 lo>hi 칸"""
+    r1, r2 = c1 >> 2, c2 >> 2
+    hi, lo = max(r1, r2), min(r1, r2)
+    if hi == lo:
+        return 13 * hi + hi
+    if (c1 & 3) == (c2 & 3):
+        return 13 * hi + lo
+    return 13 * lo + hi
+
+
+# =========================
+# 2. Write (빌드 단계에서만)
+# =========================
+def write_tables(path: str, arrays: Dict[str, np.ndarray]) -> int:
+    """이름 → 2차원(또는 1차원) 배열을 파일로. 쓴 바이트 수"""
+    entries = []
+    offset = HEADER.size + SECTION.size * len(arrays)
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        offset = (offset + ALIGN - 1) // ALIGN * ALIGN
+        rows = arr.shape[0]
+        cols = arr.shape[1] if arr.ndim == 2 else 0
+        entries.append((name, arr, rows, cols, offset))
+        offset += arr.nbytes
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for name, arr, rows, cols, off in entries:
+            f.write(SECTION.pack(name.encode(), arr.dtype.str.encode(), rows, cols, off))
+        for _, arr, _, _, off in entries:
+            f.write(b"\0" * (off - f.tell()))
+            f.write(arr.tobytes())
+        size = f.tell()
+    # 읽는 쪽이 반쯤 쓴 파일을 mmap 하지 않게 rename으로 바꿔 끼운다
+    os.replace(tmp, path)
+    return size
+
+
+# =========================
+# 3. Load
+# =========================
+class Tables:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a v{VERSION} table file")
+        self.arrays: Dict[str, np.ndarray] = {}
+        for k in range(n):
+            name, dtype, rows, cols, off = SECTION.unpack_from(self._mm, HEADER.size + SECTION.size * k)
+            count = rows * (cols or 1)
+            arr = np.frombuffer(self._mm, dtype=np.dtype(dtype.rstrip(b"\0").decode()), count=count, offset=off)
+            self.arrays[name.rstrip(b"\0").decode()] = arr.reshape((rows, cols) if cols else (rows,))
+        self.preflop_win = self.arrays["preflop_win"]
+        self.preflop_tie = self.arrays["preflop_tie"]
+        self.preflop_vs_random = self.arrays["preflop_vs_random"]
+        self.flop_bucket = self.arrays["flop_bucket"]
+
+    def nbytes(self) -> int:
+        return len(self._mm)
+
+    def matchup(self, a: int, b: int) -> Tuple[float, float, float]:
+        """클래스 a 대 b 헤즈업 (a 승%, b 승%, 무승부%)"""
+        win = float(self.preflop_win[a, b]) / EQ_SCALE * 100
+        tie = float(self.preflop_tie[a, b]) / EQ_SCALE * 100
+        return win, max(0.0, 100.0 - win - tie), tie
+
+    def flop(self, hole: Sequence[int], flop: Sequence[int]) -> int:
+        return int(self.flop_bucket[combo_index(flop), combo_index(hole)])
+
+
+_loaded: Dict[str, Optional[Tables]] = {}
+
+
+def get(path: str = DEFAULT_PATH) -> Optional[Tables]:
+    """프로세스당 한 번 연다. 파일이 없으면 None (호출하는 쪽이 직접 계산으로 대신)"""
+    if path not in _loaded:
+        try:
+            _loaded[path] = Tables(path)
+        except (OSError, ValueError):
+            _loaded[path] = None
+    return _loaded[path]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    t0 = time.perf_counter()
+    t = get(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
+    dt = time.perf_counter() - t0
+    if t is None:
+        print("표 파일 없음: python -m tools.build_tables")
+        sys.exit(1)
+    print(f"loaded {t.path} ({t.nbytes() / 1e6:.1f} MB) in {dt * 1000:.1f} ms")
+    for name, arr in t.arrays.items():
+        print(f"  {name:<18} {arr.dtype} {arr.shape}")
@@ -0,0 +1,272 @@
+"""계층 타이밍 휠 (엔진 타이머: 턴 시간초과 / 봇 / 런아웃 / 다음 핸드 / 강퇴)
+
+방마다 asyncio call_later 핸들(이벤트 루프 힙에 하나씩)을 거는 대신, 엔진이
+휠 하나에 마감을 넣고 틱마다 한 번 깨어나 그 틱에 찬 칸만 꺼낸다.
+
+- 칸 = 2^BITS개, 단계 = LEVELS개. 0단계 한 칸이 tick초, k단계 한 칸이 tick·2^(BITS·k)초.
+  기본(10ms, 256칸, 4단계)이면 0단계가 2.56초, 1단계가 약 11분을 덮는다.
+- schedule / cancel은 O(1) (칸은 dict라 핸들로 바로 뺀다).
+- 0단계가 한 바퀴 돌 때마다 위 단계의 현재 칸 하나를 아래로 다시 나눠 넣는다(cascade).
+  마감이 먼 타이머는 몇 번 내려오고, 대부분(턴 30초 안쪽)은 1단계에서 한 번 내려온다.
+- 마감 틱이 지나야(now >= (마감 틱 + 1)·tick) 꺼내므로 일찍 울리는 일은 없고, 늦어도
+  tick + 루프 지연만큼. 울린 핸들/취소한 핸들은 다시 울리지 않는다 (마감마다 한 번).
+- 매 틱 깨울 필요는 없다. next_at()이 다음으로 찬 칸(없으면 다음 cascade)의 시각을
+  알려 주므로 그때 한 번 advance 하면 된다. 0단계가 비어 있는 구간은 칸 단위가 아니라
+  한 바퀴씩 건너뛰므로 오래 멈췄다 advance 해도 밀린 틱을 하나하나 돌지 않는다.
+
+시간은 clock() 초 (기본 time.time, 방 상태의 turn_started_at 등과 같은 시계). 휠 자체는
+스레드에 안전하지 않다. 엔진 루프 스레드에서만 만진다.
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+TICK = 0.01
+BITS = 8
+LEVELS = 4
+
+
+class Timer:
+    """schedule()이 돌려주는 핸들. cancel()은 아직 안 울렸으면 True"""
+
+    __slots__ = ("deadline", "when", "fn", "args", "_wheel", "_slot", "_level")
+
+    def __init__(self, wheel: "TimerWheel", deadline: float, fn: Callable[..., Any], args: tuple):
+        self.deadline = deadline
+        self.when = 0  # 마감 틱 번호
+        self.fn = fn
+        self.args = args
+        self._wheel = wheel
+        self._slot: Optional[Dict["Timer", None]] = None
+        self._level = 0
+
+    def cancel(self) -> bool:
+        slot = self._slot
+        if slot is None:
+            return False
+        del slot[self]
+        self._slot = None
+        self._wheel.count -= 1
+        self._wheel._counts[self._level] -= 1
+        return True
+
+    def pending(self) -> bool:
+        return self._slot is not None
+
+    def run(self) -> None:
+        self.fn(*self.args)
+
+
+class TimerWheel:
+    def __init__(
+        self, tick: float = TICK, bits: int = BITS, levels: int = LEVELS, clock: Callable[[], float] = time.time
+    ):
+        self.tick = tick
+        self.clock = clock
+        self.bits = bits
+        self.levels = levels
+        self.mask = (1 << bits) - 1
+        self._span = 1 << (bits * levels)  # 맨 위 단계까지 덮는 틱 수 (넘으면 맨 끝 칸에 두고 내려올 때 다시)
+        self._wheels: List[List[Dict[Timer, None]]] = [[{} for _ in range(1 << bits)] for _ in range(levels)]
+        # 다음에 처리할 틱
+        self.current = int(clock() / tick)
+        self.count = 0
+        self._counts = [0] * levels  # 단계별 타이머 수 (빈 0단계 건너뛰기용)
+        self.fired = 0
+        self.cascaded = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ---------- 넣기 / 빼기 ----------
+    def schedule(self, at: float, fn: Callable[..., Any], *args: Any) -> Timer:
+        """at(time.time() 초)이 지나면 fn(*args). 이미 지난 시각이면 다음 틱에"""
+        if self.count == 0:
+            # 비어 있던 동안은 아무도 advance 하지 않았다 → 지금 틱부터 (밀린 틱을 나중에 돌지 않게)
+            self.current = max(self.current, int(self.clock() / self.tick))
+        t = Timer(self, at, fn, args)
+        t.when = max(int(at / self.tick), self.current)
+        self._place(t)
+        self.count += 1
+        return t
+
+    def _place(self, t: Timer) -> None:
+        delta = min(t.when - self.current, self._span - 1)
+        when = self.current + delta
+        bits = self.bits
+        level = 0
+        while delta >= 1 << (bits * (level + 1)):
+            level += 1
+        slot = self._wheels[level][(when >> (bits * level)) & self.mask]
+        slot[t] = None
+        t._slot = slot
+        t._level = level
+        self._counts[level] += 1
+
+    def _cascade(self, level: int) -> None:
+        slot = self._wheels[level][(self.current >> (self.bits * level)) & self.mask]
+        if not slot:
+            return
+        moving = list(slot)
+        slot.clear()
+        self._counts[level] -= len(moving)
+        self.cascaded += len(moving)
+        for t in moving:
+            self._place(t)
+
+    # ---------- 진행 ----------
+    def advance(self, now: Optional[float] = None) -> List[Timer]:
+        """now까지 마감이 지난 타이머를 마감 틱 순서로 꺼낸다. 호출은 부른 쪽이 (t.run())"""
+        target = int((self.clock() if now is None else now) / self.tick)
+        due: List[Timer] = []
+        if self.count == 0:
+            self.current = max(self.current, target)
+            return due
+        bits, mask, level0, counts = self.bits, self.mask, self._wheels[0], self._counts
+        while self.current < target:
+            c = self.current
+            if c & mask == 0:
+                # 아래 단계가 한 바퀴 돌았다 → 위 단계 현재 칸을 (높은 단계부터) 내려 보낸다
+                for level in range(self.levels - 1, 0, -1):
+                    if c & ((1 << (bits * level)) - 1) == 0:
+                        self._cascade(level)
+            if not counts[0]:
+                # 0단계가 비었다 → 이번 바퀴 나머지는 볼 것 없음, 다음 cascade 지점(또는 target)으로
+                self.current = min((c | mask) + 1, target)
+                continue
+            slot = level0[c & mask]
+            if slot:
+                for t in slot:
+                    t._slot = None
+                due.extend(slot)
+                self.count -= len(slot)
+                counts[0] -= len(slot)
+                slot.clear()
+            self.current = c + 1
+            if self.count == 0:
+                self.current = target
+                break
+        self.fired += len(due)
+        return due
+
+    def next_at(self) -> Optional[float]:
+        """다음에 advance 할 시각: 가장 가까운 찬 0단계 칸, 이번 바퀴에 없으면 다음 cascade.
+        그 전에 advance 해도 나올 게 없다. 비었으면 None"""
+        if self.count == 0:
+            return None
+        c, mask = self.current, self.mask
+        if c & mask == 0 and self.count != self._counts[0]:
+            # 지금 틱이 cascade 지점인데 위 단계가 아직 안 내려왔다
+            return (c + 1.001) * self.tick
+        end = (c | mask) + 1
+        if self._counts[0]:
+            level0 = self._wheels[0]
+            for t in range(c, end):
+                if level0[t & mask]:
+                    end = t
+                    break
+        # (틱 + 1)·tick 그대로면 나눗셈 반올림으로 그 틱이 아직 안 끝난 것으로 볼 수 있어 조금 여유
+        return (end + 1.001) * self.tick
+
+
+if __name__ == "__main__":
+    # 자체 확인: 무작위 마감/취소가 딱 한 번, 마감 뒤에, tick 안쪽 지연으로 울리는지 + 속도
+    import asyncio
+    import random
+
+    rng = random.Random(7)
+    start = 1_000_000.0
+    sim = [start]  # 가짜 시계
+    wheel = TimerWheel(clock=lambda: sim[0])
+    fired: Dict[int, float] = {}
+    handles = []
+    n = 200_000
+    for i in range(n):
+        # 대부분 몇 초~30초, 일부는 몇 시간 뒤(위 단계), 일부는 이미 지난 시각
+        r = rng.random()
+        delay = rng.uniform(0, 30) if r < 0.9 else rng.uniform(30, 20_000) if r < 0.99 else -rng.uniform(0, 5)
+        handles.append(wheel.schedule(start + delay, fired.__setitem__, i, start + delay))
+    cancelled = set(rng.sample(range(n), n // 3))
+    for i in cancelled:
+        assert handles[i].cancel()
+        assert not handles[i].cancel()
+    assert len(wheel) == n - len(cancelled)
+
+    now = start
+    while len(wheel):
+        prev = now
+        now += rng.uniform(0.001, 0.5) if now < start + 40 else rng.uniform(1, 300)
+        for t in wheel.advance(now):
+            assert t.deadline <= now, (t.deadline, now)
+            # 앞선 advance 때는 마감 틱이 안 끝났어야 한다 (= 처음 가능한 advance에서 울림)
+            assert prev < (t.when + 1) * wheel.tick, (prev, t.when)
+            i = t.args[0]
+            assert i not in fired and i not in cancelled
+            t.run()
+    assert len(fired) == n - len(cancelled)
+    print(f"{n:,} timers, {len(cancelled):,} cancelled, fired {wheel.fired:,} once each, cascaded {wheel.cascaded:,}")
+
+    # next_at()에만 깨우기 (엔진 방식): 전부 마감 뒤 한 틱 안에 울리고, 깨는 횟수는 찬 칸 수 정도
+    sim[0] = start
+    wheel = TimerWheel(clock=lambda: sim[0])
+    n = 20_000
+    for i in range(n):
+        wheel.schedule(start + rng.uniform(0, 600) if i % 10 else start + rng.uniform(600, 40_000), int)
+    wakeups = late = 0
+    while len(wheel):
+        at = wheel.next_at()
+        assert at is not None and at > sim[0] - wheel.tick
+        sim[0] = at
+        wakeups += 1
+        for t in wheel.advance():
+            assert t.deadline <= at
+            late = max(late, at - t.deadline)
+    assert late <= 1.01 * wheel.tick, late
+    print(f"next_at-driven: {n:,} timers fired with {wakeups:,} wakeups, max lateness {late * 1000:.1f} ms")
+
+    # 비어 있다가(10시간) 다시 건 첫 타이머 / 먼 타이머를 건 채 10시간 멈춤: 밀린 틱을 하나씩 돌지 않는다
+    sim[0] = start
+    wheel = TimerWheel(clock=lambda: sim[0])
+    wheel.schedule(start + 1, int)
+    wheel.advance(start + 2)
+    sim[0] = start + 36_000
+    t0 = time.perf_counter()
+    wheel.schedule(sim[0] + 1, int)
+    assert wheel.advance(sim[0] + 0.5) == []
+    idle = time.perf_counter() - t0
+    wheel.schedule(sim[0] + 20_000, int)
+    t0 = time.perf_counter()
+    assert len(wheel.advance(sim[0] + 36_000)) == 2
+    stall = time.perf_counter() - t0
+    print(f"first advance after 10 h idle {idle * 1e3:.2f} ms, after 10 h stall with pending timers {stall * 1e3:.1f} ms")
+
+    # schedule+cancel 비용: 휠 vs asyncio call_later (턴마다 타이머를 다시 거는 패턴)
+    m = 200_000
+    wheel = TimerWheel()
+    t0 = time.perf_counter()
+    base = time.time()
+    for i in range(m):
+        wheel.schedule(base + 30 + (i % 100) * 0.01, int).cancel()
+    wheel_t = (time.perf_counter() - t0) / m
+
+    loop = asyncio.new_event_loop()
+    t0 = time.perf_counter()
+    for i in range(m):
+        loop.call_later(30 + (i % 100) * 0.01, int).cancel()
+    loop_t = (time.perf_counter() - t0) / m
+    loop.close()
+
+    # 방 수만 개분 타이머를 건 채로 1분 진행 (틱마다 advance)
+    rooms = 30_000
+    sim[0] = base
+    wheel = TimerWheel(clock=lambda: sim[0])
+    for i in range(rooms):
+        wheel.schedule(base + rng.uniform(0, 30), int)
+    t0 = time.perf_counter()
+    now = base
+    while now < base + 60:
+        now += wheel.tick
+        for t in wheel.advance(now):
+            wheel.schedule(now + rng.uniform(0.5, 30), int)  # 다음 턴 타이머
+    adv = time.perf_counter() - t0
+    print(f"schedule+cancel  wheel {wheel_t * 1e6:5.2f} us   asyncio call_later {loop_t * 1e6:5.2f} us")
+    print(f"{rooms:,} rooms x 60 s of 10 ms ticks: {adv * 1000:.0f} ms total ({wheel.fired:,} fired, {wheel.cascaded:,} cascaded)")
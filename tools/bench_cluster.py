@@ -0,0 +1,184 @@
+"""엔진 샤딩 부하 시험 (engine_cluster.EngineRouter + 가짜 Supabase)
+
+방마다 사람 한 명 + 봇 5명을 앉히고, 사람 call을 방당 --rate(초당)로 라우터에
+넣으면서 제출 → 응답(저장된 version) 지연을 잰다. 차례가 아닐 때 누른 call은
+거절(dropped)되지만 같은 경로(큐 → 적용 → 응답)를 지나므로 지연에 같이 센다.
+봇/타이머/다음 핸드는 워커 엔진이 알아서 돌린다. 하트비트도 방마다 5초에 한 번.
+
+    python -m tools.bench_cluster --rooms 5000 --workers 4 --seconds 30
+    python -m tools.bench_cluster --rooms 2000 --shared-db --add-worker   # 도중에 워커 추가
+
+기본은 워커마다 자기 메모리 가짜 DB (워커끼리 공유 안 됨). --shared-db는 가짜 DB
+하나를 로컬 HTTP(fake_supabase.serve)로 띄워 워커들이 PostgrestClient로 붙는다.
+방을 옮기려면(--add-worker) 저장소가 공유돼야 하므로 --shared-db가 필요하다.
+--add-worker는 옮겨진 방이 새 주인에서 계속 진행하는지(끝날 때 상태가 옮긴 직후와
+다른지) 확인하고, 멈춘 방이 있으면 실패(종료 코드 1)한다. 옮긴 뒤 적어도 --turn-timeout,
+--think, --next-hand 중 가장 긴 것 + 2초는 더 돌린다 (사람 차례였던 방도 움직일 시간).
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+import engine_cluster
+from engine_cluster import EngineRouter
+
+
+def pct(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * q))] if xs else 0.0
+
+
+class Latency:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.samples: List[float] = []
+        self.errors = 0
+
+    def track(self, fut: Any) -> None:
+        t0 = time.perf_counter()
+
+        def done(f: Any) -> None:
+            with self.lock:
+                if f.exception() is not None:
+                    self.errors += 1
+                else:
+                    self.samples.append(time.perf_counter() - t0)
+
+        fut.add_done_callback(done)
+
+    def take(self) -> List[float]:
+        with self.lock:
+            out, self.samples = self.samples, []
+        return out
+
+
+def progress(state: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, ...]]:
+    """방 진행 위치 (핸드 번호, 단계, 차례, 보드, 팟). 엔진에 안 올라온 방이면 None"""
+    if state is None:
+        return None
+    return state["hand_no"], state["phase"], state["turn_idx"], len(state["community"]), state["pot"]
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    store_factory: Any = engine_cluster.memory_store
+    server = None
+    if args.shared_db:
+        from fake_supabase import FakeSupabase, serve
+
+        server = serve(FakeSupabase())
+        store_factory = partial(engine_cluster.http_store, f"http://127.0.0.1:{server.server_address[1]}", "anon")
+
+    router = EngineRouter(
+        workers=args.workers,
+        store_factory=store_factory,
+        engine_kwargs={"writes_per_sec": args.writes_per_sec},
+        overrides={
+            "bots.THINK_DELAY": args.think,
+            "game.AUTO_NEXT_HAND_DELAY": args.next_hand,
+            "game.TURN_TIMEOUT": args.turn_timeout,
+        },
+    ).start()
+    codes = [f"R{k:05d}" for k in range(args.rooms)]
+
+    t0 = time.perf_counter()
+    joins = [router.submit(code, "join", "human") for code in codes]
+    for f in joins:
+        f.result(timeout=120)
+    # 자리는 join이 고른다. 셋업이 길어도 강퇴(DISCONNECT_TIMEOUT)되지 않게 바로 하트비트
+    seats = {}
+    for code in codes:
+        state = router.snapshot(code)
+        seats[code] = next(i for i, p in enumerate(state["players"]) if p["name"] == "human")
+        router.heartbeat(code, seats[code], "human")
+    fills = [router.submit(code, "bots_fill", 5) for code in codes]
+    for f in fills:
+        f.result(timeout=120)
+    setup = time.perf_counter() - t0
+
+    lat = Latency()
+    rng = random.Random(1)
+    per_tick = args.rooms * args.rate * 0.01  # 10ms마다 넣을 액션 수 (평균)
+    owed = 0.0
+    added: Optional[Dict[str, Any]] = None
+    moved_at: Dict[str, Any] = {}
+    windows: List[Dict[str, float]] = []
+    start = time.time()
+    next_beat = start
+    next_window = start + 5.0
+    settle = max(args.turn_timeout, args.think, args.next_hand) + 2.0
+    settled_at = 0.0
+    while time.time() - start < args.seconds or time.time() < settled_at:
+        now = time.time()
+        owed += per_tick
+        for _ in range(int(owed)):
+            code = rng.choice(codes)
+            lat.track(router.submit(code, "call", seats[code]))
+        owed -= int(owed)
+        if now >= next_beat:
+            for code in codes:
+                router.heartbeat(code, seats[code], "human")
+            next_beat = now + 5.0
+        if args.add_worker and added is None and now - start >= args.seconds / 2:
+            added = router.add_worker()
+            moved_at = {code: progress(router.snapshot(code)) for code in added["codes"]}
+            settled_at = time.time() + settle
+        if now >= next_window:
+            xs = lat.take()
+            windows.append({"t": now - start, "n": len(xs), "p50": pct(xs, 0.5), "p99": pct(xs, 0.99)})
+            next_window = now + 5.0
+        time.sleep(max(0.0, 0.01 - (time.time() - now)))
+    elapsed = time.time() - start
+    time.sleep(1.0)  # 남은 응답
+    xs = lat.take()
+    if xs:
+        windows.append({"t": time.time() - start, "n": len(xs), "p50": pct(xs, 0.5), "p99": pct(xs, 0.99)})
+
+    # 옮겨진 방: 새 주인에게 올라와 있고 옮긴 뒤로 상태가 바뀌었어야 한다 (타이머/봇이 다시 돈다)
+    stalled = [code for code, before in moved_at.items() if before is None or progress(router.snapshot(code)) == before]
+    stats = router.stats()
+    router.stop()
+    if server is not None:
+        server.shutdown()
+    return {"setup": setup, "windows": windows, "errors": lat.errors, "added": added, "stalled": stalled, "stats": stats, "seconds": elapsed}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rooms", type=int, default=5000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--seconds", type=float, default=30.0)
+    ap.add_argument("--rate", type=float, default=0.5, help="방당 초당 사람 call")
+    ap.add_argument("--think", type=float, default=0.8, help="bots.THINK_DELAY")
+    ap.add_argument("--next-hand", type=float, default=4.0, help="game.AUTO_NEXT_HAND_DELAY")
+    ap.add_argument("--turn-timeout", type=float, default=10.0, help="game.TURN_TIMEOUT")
+    ap.add_argument("--writes-per-sec", type=float, default=1e6, help="워커당 저장 속도 상한 (가짜 DB라 기본은 사실상 없음)")
+    ap.add_argument("--shared-db", action="store_true")
+    ap.add_argument("--add-worker", action="store_true", help="중간에 워커 하나 추가 (--shared-db 필요)")
+    args = ap.parse_args()
+    if args.add_worker and not args.shared_db:
+        ap.error("--add-worker needs --shared-db")
+
+    r = run(args)
+    print(f"{args.rooms:,} rooms on {args.workers} workers ({os.cpu_count()} cpus), setup {r['setup']:.1f}s")
+    total = 0
+    for w in r["windows"]:
+        total += w["n"]
+        print(f"  t={w['t']:5.1f}s  actions {w['n']:>7,}  p50 {w['p50'] * 1000:7.1f} ms  p99 {w['p99'] * 1000:7.1f} ms")
+    print(f"human actions {total:,} ({total / r['seconds']:,.0f}/s)  errors {r['errors']}")
+    if r["added"]:
+        a = r["added"]
+        print(f"added {a['worker']}: moved {a['moved']:,}/{a['rooms']:,} rooms ({a['moved'] / max(1, a['rooms']):.1%}) in {a['seconds']:.2f}s")
+        moved = len(a["codes"])
+        print(f"moved rooms still advancing: {moved - len(r['stalled']):,}/{moved:,}" + (f"  stalled e.g. {r['stalled'][:5]}" if r["stalled"] else ""))
+    for name, s in sorted(r["stats"].items()):
+        print(f"  {name}: rooms {s['rooms']:,}  applied {s['applied']:,}  actions {s['actions']:,}  dropped {s['dropped']:,}  writes {s['writes']:,}  timers {s['timers']:,}")
+    if r["stalled"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
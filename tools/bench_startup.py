@@ -0,0 +1,92 @@
+"""화면 시작/리런 시간 벤치 (가짜 Supabase, Streamlit AppTest)
+
+    python -m tools.bench_startup                 # 모듈 import + 첫 실행 + 리런 50번
+    python -m tools.bench_startup --reruns 200
+
+1) 모듈마다 새 인터프리터에서 import 시간 (의존 모듈 포함, 5번 중 최소)
+2) 판정기 표 만들기 (hand_eval.ensure_tables) 시간
+3) 같은 프로세스에서 app.py 첫 실행(프로세스 시작 직후 한 번) / 이후 리런의
+   p50/p99, 리런 단계별(metrics.app_stage_seconds) p50
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["hand_eval", "game", "equity", "render", "bots", "room_store", "supabase_http", "engine", "styles"]
+
+
+def import_ms(module: str, repeat: int = 5) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    best = float("inf")
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            return float("nan")
+        best = min(best, float(out.stdout.strip()))
+    return best * 1000
+
+
+def pct(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * q))] if xs else 0.0
+
+
+def bench_app(reruns: int) -> Dict[str, float]:
+    sys.path.insert(0, ROOT)
+    from fake_supabase import FakeSupabase, http_transport
+    import supabase_http
+
+    db = FakeSupabase()
+    real = supabase_http.PostgrestClient
+    supabase_http.PostgrestClient = lambda url, key: real(url, key, transport=http_transport(db))
+
+    from streamlit.testing.v1 import AppTest
+    import metrics
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    for k, v in {"SUPABASE_URL": "http://fake", "SUPABASE_ANON_KEY": "anon", "SYNC_MODE": "poll", "HAND_HISTORY_DIR": ""}.items():
+        at.secrets[k] = v
+    at.session_state["room_code"] = "bench"
+    at.session_state["nickname"] = "alice"
+
+    t0 = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t0
+    at.run()  # 자리 잡고 나서
+    at.button(key="btn_bots_fill").click().run()
+
+    base = {k: h.n for k, h in metrics.REGISTRY.histograms.get("app_stage_seconds", {}).items()}
+    wall: List[float] = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        wall.append(time.perf_counter() - t0)
+    out = {"first_run_ms": first * 1000, "rerun_p50_ms": pct(wall, 0.5) * 1000, "rerun_p99_ms": pct(wall, 0.99) * 1000}
+    for key, h in sorted(metrics.REGISTRY.histograms.get("app_stage_seconds", {}).items()):
+        if h.n > base.get(key, 0):
+            out[f"stage {dict(key)['stage']} p50_ms"] = h.quantile(0.5) * 1000
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reruns", type=int, default=50)
+    ap.add_argument("--skip-imports", action="store_true")
+    args = ap.parse_args()
+
+    if not args.skip_imports:
+        for m in MODULES:
+            print(f"import {m:<14} {import_ms(m):8.1f} ms")
+        code = "import time, hand_eval; t = time.perf_counter(); hand_eval.ensure_tables(); print(time.perf_counter() - t)"
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        print(f"hand_eval tables  {float(out.stdout) * 1000:8.1f} ms")
+    for k, v in bench_app(args.reruns).items():
+        print(f"{k:<26} {v:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""엔진 쓰기 모으기(write-behind) 벤치 (가짜 Supabase)
+
+방마다 사람 한 명 + 봇으로 채워 빠른 설정(봇 생각/런아웃/다음 핸드 지연 축소)으로
+돌리고, 적용한 액션 수 대비 실제 저장(CAS) 수와 DB 요청 수를 본다.
+
+    python -m tools.bench_writes --rooms 50 --seconds 10
+    python -m tools.bench_writes --no-coalesce     # 액션마다 저장하던 예전 방식과 비교
+"""
+import argparse
+import time
+from typing import Any, Dict
+
+import bots
+import engine
+import game
+from engine import GameEngine
+from fake_supabase import FakeSupabase
+from room_store import RoomCache, RoomStore
+
+
+def run(rooms: int, seconds: float, latency: float, coalesce: bool, rate: float) -> Dict[str, Any]:
+    game.AUTO_NEXT_HAND_DELAY = 0.3
+    game.RUNOUT_STEP_DELAY = 0.05
+    bots.THINK_DELAY = 0.02
+    if not coalesce:
+        engine.WRITE_WINDOW = 0.0
+        engine.MIN_WRITE_INTERVAL = 0.0
+        engine.MAX_BATCH = 1
+        rate = 1e9
+
+    db = FakeSupabase(latency=latency)
+    store = RoomStore(db, game.init_room_json, cache=RoomCache())
+    eng = GameEngine(store, writes_per_sec=rate).start()
+    codes = [f"W{k:03d}" for k in range(rooms)]
+    for code in codes:
+        eng.call(code, "join", "human")
+        eng.call(code, "bots_fill", 5)
+
+    db.calls = 0
+    eng.write_stats.update(dict.fromkeys(eng.write_stats, 0))
+    t0 = time.time()
+    while time.time() - t0 < seconds:
+        for code in codes:
+            s = eng.snapshot(code)
+            if s is None:
+                continue
+            me = next((i for i, p in enumerate(s["players"]) if p["name"] == "human"), -1)
+            if me < 0:
+                continue
+            eng.heartbeat(code, me, "human")
+            if s["phase"] not in ("WAITING", "GAME_OVER") and s["turn_idx"] == me:
+                eng.submit(code, "call", me)
+        time.sleep(0.01)
+    elapsed = time.time() - t0
+    hands = sum((eng.snapshot(c) or {}).get("hand_no", 0) for c in codes)
+    return {"elapsed": elapsed, "hands": hands, "db_calls": db.calls, **eng.write_stats}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rooms", type=int, default=50)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--latency", type=float, default=0.0, help="가짜 DB 요청당 지연(초)")
+    ap.add_argument("--rate", type=float, default=engine.WRITES_PER_SEC, help="프로세스 전체 초당 저장 상한")
+    ap.add_argument("--no-coalesce", action="store_true")
+    args = ap.parse_args()
+
+    r = run(args.rooms, args.seconds, args.latency, not args.no_coalesce, args.rate)
+    el = r.pop("elapsed")
+    print(f"{args.rooms} rooms, {el:.1f}s, hands {r.pop('hands'):,}")
+    for k, v in r.items():
+        print(f"{k:>10}: {v:,}")
+    print(f"{'writes/s':>10}: {r['writes'] / el:.1f}   actions/write {r['actions'] / max(1, r['writes']):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""tables.py 표 파일 만들기 (빌드 단계)
+
+    python -m tools.build_tables                       # data/poker_tables.bin
+    python -m tools.build_tables --samples 4000 --workers 8 --out /srv/poker_tables.bin
+
+- 프리플랍: 169×169 클래스 매치업을 (클래스마다 무늬 조합을 무작위로 고른)
+  몬테카를로 --samples판씩, equity.evaluate_batch로 한 번에 판정한다.
+  무작위 상대 에퀴티는 상대 클래스를 콤보 수(페어 6 / 수딧 4 / 오프 12)로 가중 평균.
+- 플랍 버킷: 플랍 22,100개마다 홀 1,326개를 배열로 한꺼번에 계산한다.
+  규칙은 bots.postflop_bucket과 같고, 끝에 무작위 표본으로 둘이 같은지 확인한다.
+- 판정기 표: hand_eval의 플러시/소수곱 표 그대로 (프로세스마다 ~1초 만들던 것)
+
+    python -m tools.build_tables --eval-only   # 있는 파일에 판정기 표만 넣기/갱신
+"""
+import argparse
+import multiprocessing as mp
+import random
+import time
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import bots
+import equity
+import hand_eval
+import tables
+
+N_HOLES = 1326
+N_FLOPS = 22100
+
+
+# =========================
+# 1. Preflop
+# =========================
+def class_combos() -> List[np.ndarray]:
+    """클래스 번호 → (콤보 수, 2) 카드 정수"""
+    out: List[List[Tuple[int, int]]] = [[] for _ in range(169)]
+    for a, b in combinations(range(52), 2):
+        out[tables.class_index(a, b)].append((a, b))
+    return [np.array(c, dtype=np.int64) for c in out]
+
+
+def _matchup_row(args: Tuple[int, int, int]) -> Tuple[int, np.ndarray, np.ndarray]:
+    """클래스 i 대 j >= i 전부 → (i, win[j], tie[j]) 비율"""
+    i, samples, seed = args
+    hand_eval.ensure_tables()
+    rng = np.random.default_rng(seed)
+    combos = class_combos()
+    win = np.zeros(169)
+    tie = np.zeros(169)
+    for j in range(i, 169):
+        n = int(samples * 1.5)
+        a = combos[i][rng.integers(len(combos[i]), size=n)]
+        b = combos[j][rng.integers(len(combos[j]), size=n)]
+        ok = (a[:, :1] != b).all(axis=1) & (a[:, 1:] != b).all(axis=1)
+        a, b = a[ok][:samples], b[ok][:samples]
+        m = len(a)
+        keys = rng.random((m, 52))
+        rows = np.arange(m)[:, None]
+        keys[rows, a] = 2.0
+        keys[rows, b] = 2.0
+        board = keys.argpartition(5, axis=1)[:, :5]
+        sa = equity.evaluate_batch(np.concatenate([a, board], axis=1))
+        sb = equity.evaluate_batch(np.concatenate([b, board], axis=1))
+        win[j] = (sa > sb).mean()
+        tie[j] = (sa == sb).mean()
+    return i, win, tie
+
+
+def build_preflop(samples: int, workers: int, seed: int) -> Dict[str, np.ndarray]:
+    jobs = [(i, samples, seed * 1000 + i) for i in range(169)]
+    if workers == 1:
+        rows = [_matchup_row(j) for j in jobs]
+    else:
+        with mp.get_context("spawn").Pool(workers) as pool:
+            rows = pool.map(_matchup_row, jobs)
+    win = np.zeros((169, 169))
+    tie = np.zeros((169, 169))
+    for i, w, t in rows:
+        win[i, i:] = w[i:]
+        tie[i, i:] = t[i:]
+    # 아래 삼각형은 뒤집어서: j가 i를 이길 확률 = i가 질 확률
+    lower = np.tril_indices(169, -1)
+    win[lower] = (1.0 - win.T - tie.T)[lower]
+    tie[lower] = tie.T[lower]
+    # 같은 클래스끼리는 대칭이므로 무승부를 뺀 나머지를 반반
+    diag = np.arange(169)
+    win[diag, diag] = (1.0 - tie[diag, diag]) / 2
+
+    weights = np.array([len(c) for c in class_combos()], dtype=np.float64)
+    vs_random = ((win + tie / 2) * weights).sum(axis=1) / weights.sum()
+    return {
+        "preflop_win": np.round(win * tables.EQ_SCALE).astype(np.uint16),
+        "preflop_tie": np.round(tie * tables.EQ_SCALE).astype(np.uint16),
+        "preflop_vs_random": np.round(vs_random * tables.EQ_SCALE).astype(np.uint16),
+    }
+
+
+# =========================
+# 2. Flop buckets (bots.postflop_bucket 배열판)
+# =========================
+def holes_colex() -> np.ndarray:
+    return np.array([(a, b) for b in range(52) for a in range(b)], dtype=np.int64)
+
+
+def flop_buckets(flop: Tuple[int, int, int], holes: np.ndarray) -> np.ndarray:
+    flop_arr = np.array(flop, dtype=np.int64)
+    cards = np.concatenate([holes, np.broadcast_to(flop_arr, (len(holes), 3))], axis=1)
+    cat = equity.evaluate_batch(cards) >> 20
+    board_cat = bots._board_category(flop)
+    br = flop_arr >> 2
+    hr = holes >> 2
+    top = br.max()
+
+    on_board = np.isin(hr, br)
+    pair_rank = np.where(hr[:, 0] == hr[:, 1], hr[:, 0], np.where(on_board, hr, -1).max(axis=1))
+    bucket = np.select(
+        [
+            cat <= board_cat,
+            cat >= 6,
+            cat >= 4,
+            (cat == 3) | ((cat == 2) & (board_cat == 0)),
+        ],
+        [
+            np.where(hr.max(axis=1) == 12, 1, 0),
+            5,
+            5 if board_cat == 0 else 4,
+            4,
+        ],
+        np.where(pair_rank >= top, 3, 2),
+    )
+
+    suits = cards & 3
+    hs = holes & 3
+    flush_draw = np.zeros(len(holes), dtype=bool)
+    for s in range(4):
+        flush_draw |= ((suits == s).sum(axis=1) == 4) & ((hs[:, 0] == s) | (hs[:, 1] == s))
+    mask = np.bitwise_or.reduce(np.left_shift(1, cards >> 2), axis=1)
+    straight_draw = np.zeros(len(holes), dtype=bool)
+    for lo in range(9):
+        straight_draw |= ((mask >> lo) & 0xF) == 0xF
+    weak = bucket <= 2
+    bucket = np.where(weak & flush_draw & straight_draw, 3, bucket)
+    bucket = np.where(weak & (flush_draw ^ straight_draw), np.maximum(bucket, 2), bucket)
+
+    used = np.isin(holes, flop_arr).any(axis=1)
+    return np.where(used, tables.NO_BUCKET, bucket).astype(np.uint8)
+
+
+def build_flop() -> np.ndarray:
+    hand_eval.ensure_tables()
+    holes = holes_colex()
+    out = np.empty((N_FLOPS, N_HOLES), dtype=np.uint8)
+    k = 0
+    for c in range(52):
+        for b in range(c):
+            for a in range(b):
+                out[k] = flop_buckets((a, b, c), holes)
+                k += 1
+    return out
+
+
+def check_flop(flop_table: np.ndarray, n: int, seed: int) -> int:
+    """무작위 (홀, 플랍) n개를 bots.postflop_bucket과 비교 → 다른 개수"""
+    rng = random.Random(seed)
+    bad = 0
+    for _ in range(n):
+        cards = rng.sample(range(52), 5)
+        hole, flop = tuple(sorted(cards[:2])), tuple(sorted(cards[2:]))
+        got = flop_table[tables.combo_index(flop), tables.combo_index(hole)]
+        if got != bots.postflop_bucket(hole, flop):
+            bad += 1
+    return bad
+
+
+# =========================
+# 3. Evaluator tables
+# =========================
+def build_eval() -> Dict[str, np.ndarray]:
+    hand_eval._build_tables()
+    keys = sorted(hand_eval._PRODUCT_TABLE)
+    return {
+        "eval_flush": np.array(hand_eval._FLUSH_TABLE, dtype=np.uint32),
+        "eval_product_key": np.array(keys, dtype=np.uint64),
+        "eval_product_score": np.array([hand_eval._PRODUCT_TABLE[k] for k in keys], dtype=np.uint32),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default=tables.DEFAULT_PATH)
+    ap.add_argument("--samples", type=int, default=3000, help="프리플랍 매치업당 런아웃 수")
+    ap.add_argument("--workers", type=int, default=mp.cpu_count())
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--eval-only", action="store_true", help="있는 파일에 판정기 표만 추가")
+    args = ap.parse_args()
+
+    if args.eval_only:
+        old = tables.Tables(args.out)
+        arrays = {k: np.array(v) for k, v in old.arrays.items()}
+        arrays.update(build_eval())
+        size = tables.write_tables(args.out, arrays)
+        print(f"wrote    {args.out} ({size / 1e6:.1f} MB, evaluator tables updated)")
+        return
+
+    hand_eval.ensure_tables()
+    t0 = time.perf_counter()
+    arrays = build_preflop(args.samples, args.workers, args.seed)
+    t1 = time.perf_counter()
+    arrays["flop_bucket"] = build_flop()
+    t2 = time.perf_counter()
+    arrays.update(build_eval())
+    bad = check_flop(arrays["flop_bucket"], 20000, args.seed)
+    size = tables.write_tables(args.out, arrays)
+    print(f"preflop  {t1 - t0:.1f}s  ({args.samples} runouts × 14,365 matchups)")
+    print(f"flop     {t2 - t1:.1f}s  mismatches vs bots.postflop_bucket: {bad} / 20,000")
+    print(f"wrote    {args.out} ({size / 1e6:.1f} MB)")
+    assert bad == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""핸드 기록 다시 보기 / 자체 확인
+
+    python -m tools.replay_hand --dir hand_history --room ABCD            # 그 방 핸드 목록
+    python -m tools.replay_hand --dir hand_history --room ABCD --hand 12  # 한 핸드 단계별 재생
+    python -m tools.replay_hand --selfcheck 2000                          # 랜덤 봇으로 기록→재생 검증
+
+--selfcheck는 임시 디렉터리에 랜덤 봇 핸드를 엔진과 같은 방식(observe)으로 기록하고,
+모든 핸드를 인덱스로 찾아 재생해 END 레코드(보드/승자/스택)와 같은지 본다.
+"""
+import argparse
+import random
+import tempfile
+import time
+from typing import Tuple
+
+import dealing
+import game
+import hand_eval
+from hand_history import HandHistory, _apply_op, replay, verify
+from table_model import FOLDED, Room
+from tools.simulate import seat_bots
+
+
+def show(hh: HandHistory, room: str, hand_no: int) -> None:
+    records = hh.hand(room, hand_no)
+    if not records:
+        print(f"{room} #{hand_no}: 기록 없음")
+        return
+    for label, state in replay(records):
+        seats = "  ".join(
+            f"{p.name}:{p.stack:,}{'' if p.status != FOLDED else '(F)'}" for p in state.players if p.occupied
+        )
+        print(f"{label:<16} {state.phase:<9} pot {state.pot:>7,}  {' '.join(state.community):<15} {seats}")
+    end = records[-1]
+    if end["kind"] == "end":
+        print(f"winners {end['winners']}  verified {verify(records)}")
+
+
+def _bot_op(state: Room, rng: random.Random) -> Tuple[str, tuple]:
+    seat = state.turn_idx
+    me = state.players[seat]
+    r = rng.random()
+    if r < 0.02:
+        return "timeout", ()
+    if state.current_bet <= me.bet:
+        if r < 0.75:
+            return "call", (seat,)
+        if r < 0.97:
+            bb = game.BLIND_STRUCTURE[state.level - 1][1]
+            return "raise", (seat, min(me.stack + me.bet, max(bb, state.current_bet * 2)))
+        return "allin", (seat,)
+    if r < 0.25:
+        return "fold", (seat,)
+    if r < 0.85:
+        return "call", (seat,)
+    if r < 0.97:
+        return "raise", (seat, min(me.stack + me.bet, state.current_bet * 2))
+    return "allin", (seat,)
+
+
+def selfcheck(hands: int, seed: int) -> None:
+    rng = random.Random(seed)
+    dealing.set_master(seed)  # 핸드마다 덱 시드를 (seed, 방, 핸드)에서 유도해 재현되게
+    hand_eval.ensure_tables()
+    with tempfile.TemporaryDirectory() as d:
+        # 세그먼트가 여러 개 생기도록 작게
+        hh = HandHistory(d, segment_bytes=64 * 1024)
+        rooms = [game.init_room_state(f"R{k}") for k in range(3)]
+        for state in rooms:
+            seat_bots(state, 6)
+            state.started_at = time.time()
+        t0 = time.perf_counter()
+        for n in range(hands):
+            state = rooms[n % len(rooms)]
+            prev = (state.hand_no, state.phase)
+            for p in state.players:
+                if p.occupied and not game.auto_rebuy_if_bust(p) and p.stack <= 0:
+                    p.stack = game.START_STACK
+                    p.rebuy_count = 0
+            game.apply_blinds_and_deal(state)
+            hh.observe(prev[0], prev[1], "next_hand", (), state)
+            while state.phase not in ("GAME_OVER", "WAITING"):
+                op, args = ("runout", ()) if game.needs_runout(state) else _bot_op(state, rng)
+                prev = (state.hand_no, state.phase)
+                _apply_op(state, op, args)
+                hh.observe(prev[0], prev[1], op, args, state)
+        record_s = time.perf_counter() - t0
+        hh.flush()
+
+        reopened = HandHistory(d)
+        t0 = time.perf_counter()
+        bad = [key for key in sorted(reopened.index) if not verify(reopened.hand(*key))]
+        replay_s = time.perf_counter() - t0
+        print(f"hands {len(reopened.index):,}  segments {len(reopened.segments())}  records {hh.records:,}")
+        print(f"bytes {hh.bytes_written:,} ({hh.bytes_written / max(1, hands):.0f} B/hand)")
+        print(f"record {record_s / hands * 1e6:.1f} us/hand (게임 진행 포함)  replay+verify {replay_s / hands * 1e6:.1f} us/hand")
+        print(f"mismatched {len(bad)}")
+        hh.close()
+        reopened.close()
+        assert not bad, bad[:5]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", default="hand_history")
+    ap.add_argument("--room")
+    ap.add_argument("--hand", type=int)
+    ap.add_argument("--selfcheck", type=int, metavar="HANDS")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    if args.selfcheck:
+        selfcheck(args.selfcheck, args.seed)
+        return
+    hh = HandHistory(args.dir)
+    if args.room is None:
+        print(", ".join(sorted({r for r, _ in hh.index})) or "기록 없음")
+    elif args.hand is None:
+        print(" ".join(str(h) for h in hh.hands_of(args.room)) or "기록 없음")
+    else:
+        show(hh, args.room, args.hand)
+
+
+if __name__ == "__main__":
+    main()
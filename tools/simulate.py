@@ -0,0 +1,215 @@
+"""헤드리스 핸드 시뮬레이터 / 엔진 처리량 벤치마크
+
+game.py의 진행 함수(apply_blinds_and_deal → act_* → check_phase_end →
+pass_turn / showdown_and_end, auto_rebuy_if_bust)를 Streamlit/Supabase 없이
+랜덤 봇으로 돌린다. 워커 프로세스마다 방 하나씩 돌리고 합산한다.
+
+    python -m tools.simulate --hands 200000 --workers 4
+    python -m tools.simulate --hands 20000 --profile   # 함수별 지연 p50/p90/p99
+    python -m tools.simulate --hands 20000 --policy bots   # 랜덤 대신 bots.py 정책
+
+--profile은 함수마다 perf_counter_ns 래퍼를 씌우므로 처리량 자체는 조금 떨어진다.
+check_phase_end 시간에는 그 안에서 부른 showdown_and_end 시간도 들어 있다.
+"""
+import argparse
+import multiprocessing as mp
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import bots
+import dealing
+import game
+import hand_eval
+from table_model import Room
+
+PROFILED = [
+    "apply_blinds_and_deal",
+    "check_phase_end",
+    "pass_turn",
+    "showdown_and_end",
+    "auto_rebuy_if_bust",
+]
+RESERVOIR = 50_000
+MAX_STEPS_PER_HAND = 500
+
+
+class Reservoir:
+    """함수별 지연 표본 (Algorithm R)"""
+
+    def __init__(self, size: int, rng: random.Random):
+        self.size = size
+        self.rng = rng
+        self.n = 0
+        self.samples: List[int] = []
+
+    def add(self, v: int) -> None:
+        self.n += 1
+        if len(self.samples) < self.size:
+            self.samples.append(v)
+        else:
+            j = self.rng.randrange(self.n)
+            if j < self.size:
+                self.samples[j] = v
+
+
+def _timed(fn: Callable[..., Any], res: Reservoir) -> Callable[..., Any]:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        t0 = time.perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            res.add(time.perf_counter_ns() - t0)
+
+    return wrapper
+
+
+def _counted(fn: Callable[..., Any], counter: List[int]) -> Callable[..., Any]:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        counter[0] += 1
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def seat_bots(state: Room, n: int) -> None:
+    for i in range(n):
+        game.ensure_join(state, f"bot{i + 1}")
+        state.players[i].is_human = False
+
+
+def bot_step(state: Room, rng: random.Random) -> None:
+    seat = state.turn_idx
+    me = state.players[seat]
+    to_call = max(0, state.current_bet - me.bet)
+    r = rng.random()
+    if to_call == 0:
+        if r < 0.75:
+            game.act_call_check(state, seat)
+        elif r < 0.97:
+            game.act_raise(state, seat, game.raise_bounds(state.level, state.current_bet, me.bet, me.stack)[0])
+        else:
+            game.act_allin(state, seat)
+    else:
+        if r < 0.25:
+            game.act_fold(state, seat)
+        elif r < 0.85:
+            game.act_call_check(state, seat)
+        elif r < 0.97:
+            game.act_raise(state, seat, game.raise_bounds(state.level, state.current_bet, me.bet, me.stack)[0])
+        else:
+            game.act_allin(state, seat)
+
+
+def play(hands: int, seats: int, seed: Optional[int], profile: bool, policy: str = "random") -> Dict[str, Any]:
+    rng = random.Random(seed)
+    dealing.set_master(seed)  # 핸드마다 덱 시드를 (seed, 방, 핸드)에서 유도해 재현되게
+    hand_eval.ensure_tables()
+
+    evals = [0]
+    hand_eval.evaluate = _counted(hand_eval.evaluate, evals)
+    reservoirs: Dict[str, Reservoir] = {}
+    if profile:
+        for name in PROFILED:
+            reservoirs[name] = Reservoir(RESERVOIR, rng)
+            setattr(game, name, _timed(getattr(game, name), reservoirs[name]))
+
+    state = game.init_room_state("sim")
+    seat_bots(state, seats)
+    state.started_at = time.time()
+    actions = 0
+    stuck = 0
+
+    t0 = time.perf_counter()
+    for _ in range(hands):
+        for p in state.players:
+            if p.occupied and not game.auto_rebuy_if_bust(p) and p.stack <= 0:
+                # 리바인 다 쓴 봇은 새 엔트리로 다시 앉힌다 (테이블 인원 유지)
+                p.stack = game.START_STACK
+                p.rebuy_count = 0
+        game.apply_blinds_and_deal(state)
+        steps = 0
+        while state.phase not in ("GAME_OVER", "WAITING"):
+            if game.needs_runout(state):
+                game.runout_step(state)
+            elif policy == "bots":
+                if bots.act(state, rng) is None:
+                    game.timeout_now(state)
+            else:
+                bot_step(state, rng)
+            actions += 1
+            steps += 1
+            if steps > MAX_STEPS_PER_HAND:
+                stuck += 1
+                break
+    elapsed = time.perf_counter() - t0
+
+    return dict(
+        hands=hands,
+        actions=actions,
+        evals=evals[0],
+        stuck=stuck,
+        seconds=elapsed,
+        samples={k: r.samples for k, r in reservoirs.items()},
+        calls={k: r.n for k, r in reservoirs.items()},
+    )
+
+
+def _worker(args: tuple) -> Dict[str, Any]:
+    return play(*args)
+
+
+def percentile(sorted_vals: List[int], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, int(q * (len(sorted_vals) - 1) + 0.5))
+    return float(sorted_vals[k])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hands", type=int, default=100_000, help="전체 핸드 수")
+    ap.add_argument("--workers", type=int, default=mp.cpu_count())
+    ap.add_argument("--seats", type=int, default=9)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--profile", action="store_true")
+    ap.add_argument("--policy", choices=("random", "bots"), default="random", help="bots: bots.py 결정 (표 파일 사용)")
+    args = ap.parse_args()
+
+    per = max(1, args.hands // args.workers)
+    jobs = [
+        (per, args.seats, None if args.seed is None else args.seed + i, args.profile, args.policy)
+        for i in range(args.workers)
+    ]
+    t0 = time.perf_counter()
+    if args.workers == 1:
+        results = [_worker(jobs[0])]
+    else:
+        with mp.get_context("spawn").Pool(args.workers) as pool:
+            results = pool.map(_worker, jobs)
+    wall = time.perf_counter() - t0
+
+    hands = sum(r["hands"] for r in results)
+    actions = sum(r["actions"] for r in results)
+    evals = sum(r["evals"] for r in results)
+    cpu = sum(r["seconds"] for r in results)
+    print(f"workers        : {args.workers}")
+    print(f"hands          : {hands:,} ({sum(r['stuck'] for r in results)} stuck)")
+    print(f"wall           : {wall:.2f}s")
+    print(f"hands/sec      : {hands / wall:,.0f}  (per worker {hands / cpu:,.0f})")
+    print(f"hands/min      : {hands / wall * 60:,.0f}")
+    print(f"actions/sec    : {actions / wall:,.0f}")
+    print(f"evaluator/sec  : {evals / wall:,.0f}")
+
+    if args.profile:
+        print()
+        print(f"{'function':<24}{'calls':>12}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}")
+        for name in PROFILED:
+            vals = sorted(v for r in results for v in r["samples"][name])
+            calls = sum(r["calls"][name] for r in results)
+            p50, p90, p99 = (percentile(vals, q) / 1000 for q in (0.5, 0.9, 0.99))
+            print(f"{name:<24}{calls:>12,}{p50:>10.1f}{p90:>10.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
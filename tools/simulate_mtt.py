@@ -0,0 +1,128 @@
+"""토너먼트(MTT) 헤드리스 시뮬레이션
+
+tournament.Tournament 코디네이터 + game.py 6장 테이블 규칙을 랜덤 봇으로
+끝까지 돌린다. 테이블마다 액션을 번갈아 하나씩 진행하고(동시에 도는 테이블
+흉내), 핸드 경계마다 코디네이터에 보고해서 이동자를 도착 테이블에 앉힌다.
+
+블라인드 시계는 가상 시간: 테이블당 핸드 하나가 --sec-per-hand초 걸린다고 보고
+공용 started_at을 뒤로 당긴다. 매 경계마다 칩 총량(사이드팟 정산까지 정확히
+보존)/테이블 인원 불변식을 확인한다.
+
+    python -m tools.simulate_mtt --entrants 300 --seed 1
+"""
+import argparse
+import random
+import time
+from typing import Dict
+
+import dealing
+import game
+import hand_eval
+from table_model import NUM_SEATS, Room
+from tools.simulate import MAX_STEPS_PER_HAND, bot_step
+from tournament import Tournament
+
+
+def run(entrants: int, seed: int, sec_per_hand: float) -> Dict[str, float]:
+    rng = random.Random(seed)
+    dealing.set_master(seed)  # 핸드마다 덱 시드를 (seed, 방, 핸드)에서 유도해 재현되게
+    hand_eval.ensure_tables()
+
+    t = Tournament("mtt", time.time())
+    plan = t.seat_all([f"p{i + 1}" for i in range(entrants)], rng)
+    tables: Dict[str, Room] = {}
+    for code, names in plan.items():
+        tables[code] = game.setup_tournament_table(
+            Room(code), t.tid, t.started_at, [(n, t.start_stack) for n in names]
+        )
+    start_tables = len(tables)
+    total_chips = entrants * t.start_stack
+
+    hands = 0
+    clock = 0.0
+    steps: Dict[str, int] = {code: 0 for code in tables}
+    stuck = 0
+    worst_spread = 0
+
+    def chips() -> int:
+        return sum(p.stack for s in tables.values() for p in s.players) + sum(s.pot for s in tables.values())
+
+    def boundary(code: str) -> None:
+        nonlocal worst_spread
+        state = tables[code]
+        for dest, name, stack in t.hand_boundary(code, state.busted, state.moved_out):
+            assert game.seat_entrant(tables[dest], name, stack) is not None, (dest, name)
+        if code not in t.members:
+            del tables[code]
+        assert chips() == total_chips, (chips(), total_chips)
+        for c, s in tables.items():
+            seated = {p.name for p in s.players if p.occupied}
+            assert seated == t.members[c], (c, seated ^ t.members[c])
+            assert len(seated) <= NUM_SEATS
+        open_tables = [c for c in t.members if c not in t.closing]
+        if len(open_tables) > 1 and not any(t.moves.values()):
+            counts = [len(t.members[c]) for c in open_tables]
+            worst_spread = max(worst_spread, max(counts) - min(counts))
+
+    t0 = time.perf_counter()
+    while t.winner is None:
+        for code in list(tables):
+            if code not in tables:
+                continue
+            state = tables[code]
+            if state.phase == "GAME_OVER":
+                hands += 1
+                clock += sec_per_hand / len(tables)
+                t.started_at = time.time() - clock
+                state.started_at = t.started_at
+                state.game_over_at = 0.0
+                game.next_hand_if_due(state, t.moves_from(code))
+                steps[code] = 0
+                boundary(code)
+            elif state.phase == "WAITING":
+                if game.release_if_waiting(state, t.moves_from(code)) is not None:
+                    boundary(code)
+            elif game.needs_runout(state):
+                game.runout_step(state)
+            else:
+                bot_step(state, rng)
+                steps[code] = steps.get(code, 0) + 1
+                if steps[code] > MAX_STEPS_PER_HAND:
+                    stuck += 1
+                    state.phase = "GAME_OVER"
+            if t.winner is not None:
+                break
+    elapsed = time.perf_counter() - t0
+
+    return dict(
+        entrants=entrants,
+        start_tables=start_tables,
+        hands=hands,
+        moves=t.moved,
+        worst_spread=worst_spread,
+        level=max(s.level for s in tables.values()),
+        stuck=stuck,
+        seconds=elapsed,
+        winner_stack=sum(p.stack for s in tables.values() for p in s.players if p.name == t.winner),
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entrants", type=int, default=300)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--sec-per-hand", type=float, default=90.0, help="가상 블라인드 시계 (테이블당 핸드 1개)")
+    args = ap.parse_args()
+
+    r = run(args.entrants, args.seed, args.sec_per_hand)
+    print(f"entrants       : {r['entrants']:,} ({r['start_tables']} tables)")
+    print(f"hands          : {r['hands']:,} ({r['stuck']} stuck)")
+    print(f"player moves   : {r['moves']:,}")
+    print(f"worst spread   : {r['worst_spread']} (settled tables, max - min seated)")
+    print(f"final level    : {r['level']}")
+    print(f"winner stack   : {r['winner_stack']:,}")
+    print(f"seconds        : {r['seconds']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""동시 클라이언트 스트레스 (가짜 Supabase)
+
+같은 방에 여러 클라이언트가 동시에 "읽기 → 수정 → 저장"을 반복한다.
+각 액션은 pot을 1 올리므로 끝났을 때 pot == 성공한 액션 수여야 한다.
+
+    python -m tools.stress_rooms --clients 32 --actions 50
+    python -m tools.stress_rooms --blind      # 예전 무조건 덮어쓰기와 비교
+    python -m tools.stress_rooms --http --fail-rate 0.05   # supabase_http 풀/재시도 경로로
+"""
+import argparse
+import threading
+import time
+from typing import Any, Dict
+
+from fake_supabase import FakeSupabase, http_transport
+from room_store import RoomCache, RoomStore
+from supabase_http import PostgrestClient
+
+
+def toy_state(room_code: str) -> Dict[str, Any]:
+    return {"room_code": room_code, "pot": 0, "by_client": {}}
+
+
+def run(clients: int, actions: int, latency: float, blind: bool, http: bool = False, fail_rate: float = 0.0) -> Dict[str, Any]:
+    if http:
+        # 같은 가짜 DB를 PostgREST HTTP 모양으로 (지연은 전송 쪽에서, 요청이 풀에서 겹치게)
+        db = FakeSupabase()
+        http_client: Any = PostgrestClient("http://fake.supabase", "anon", transport=http_transport(db, latency, fail_rate, seed=1))
+    else:
+        db = http_client = FakeSupabase(latency=latency)
+    store = RoomStore(http_client, toy_state, retries=20, cache=RoomCache())
+    store.load("stress")
+    ok = [0] * clients
+    failed = [0] * clients
+
+    def client(cid: int) -> None:
+        for _ in range(actions):
+            def act(s: Dict[str, Any]) -> Dict[str, Any]:
+                s["pot"] += 1
+                s["by_client"][str(cid)] = s["by_client"].get(str(cid), 0) + 1
+                return s
+
+            if blind:
+                state, _ = store.load("stress")
+                act(state)
+                http_client.table("poker_rooms").upsert({"room_code": "stress", "state": state}).execute()
+                ok[cid] += 1
+            elif store.mutate("stress", act) is not None:
+                ok[cid] += 1
+            else:
+                failed[cid] += 1
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    final, version = store.load("stress")
+    extra: Dict[str, Any] = {}
+    if http:
+        st = http_client.stats()
+        extra = {f"http_{k}": st[k] for k in ("requests", "retries", "failed", "errors")}
+        for op, lat in sorted(st["latency"].items()):
+            extra[op] = f"p50 {lat['p50_ms']:.1f}ms  p99 {lat['p99_ms']:.1f}ms  (n={lat['n']})"
+        http_client.close()
+    return dict(
+        applied=sum(ok),
+        failed=sum(failed),
+        pot=final["pot"],
+        lost=sum(ok) - final["pot"],
+        version=version,
+        conflicts=store.conflicts,
+        bytes_written=store.bytes_written,
+        cache_hits=store.cache.hits,
+        db_calls=db.calls,
+        seconds=round(elapsed, 3),
+        store_errors=store.errors,
+        **extra,
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--actions", type=int, default=50)
+    ap.add_argument("--latency", type=float, default=0.002, help="execute()마다 지연(초)")
+    ap.add_argument("--blind", action="store_true", help="version 없이 덮어쓰기")
+    ap.add_argument("--http", action="store_true", help="supabase_http.PostgrestClient + 가짜 HTTP 전송")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="--http에서 503/연결 실패 비율")
+    args = ap.parse_args()
+    res = run(args.clients, args.actions, args.latency, args.blind, args.http, args.fail_rate)
+    for k, v in res.items():
+        print(f"{k:>12}: {v}")
+    if res["lost"] and not args.blind:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
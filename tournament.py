@@ -0,0 +1,185 @@
+"""멀티 테이블 토너먼트(MTT) 코디네이터
+
+테이블 하나 = room_code 하나(9석)인 구조는 그대로 두고, 여러 방을 묶어서
+참가자 배정 / 탈락 처리 / 테이블 깨기·밸런싱을 한다.
+
+- 블라인드 시계: 모든 테이블의 started_at을 토너먼트 started_at 하나로 맞춘다.
+  레벨은 각 테이블이 핸드 시작 때 그 값으로 계산하므로 따로 동기화할 게 없다.
+- 코디네이터는 테이블 상태를 읽지 않는다. 테이블이 핸드 사이(경계)마다 보내는
+  (탈락자, 빠져나간 이동자)만으로 자기 명부(members)를 갱신한다.
+- 이동은 예약만 해 두고(moves), 출발 테이블의 다음 경계에서 실제로 뺀다.
+  그래서 진행 중인 핸드에서 사람을 빼는 일이 없다. 예약분은 인원 계산에 미리
+  반영(effective)하므로 같은 자리를 두 번 계획하지 않는다.
+
+엔진(engine.py)이 프로세스 메모리에 들고 있다. 테이블 쪽 규칙은 game.py 6장.
+"""
+import math
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+from game import START_STACK
+from table_model import NUM_SEATS
+
+# (이름, 도착 테이블)
+Move = Tuple[str, str]
+# (도착 테이블, 이름, 스택) → 엔진이 도착 테이블에 앉힌다
+SeatOrder = Tuple[str, str, int]
+
+
+class Tournament:
+    def __init__(
+        self,
+        tid: str,
+        started_at: float,
+        table_size: int = NUM_SEATS,
+        start_stack: int = START_STACK,
+    ):
+        self.tid = tid
+        self.started_at = started_at
+        self.table_size = table_size
+        self.start_stack = start_stack
+        self.members: Dict[str, Set[str]] = {}
+        self.where: Dict[str, str] = {}
+        # 출발 테이블 → 예약된 이동
+        self.moves: Dict[str, List[Move]] = {}
+        # 깨는 중인 테이블 (더 이상 도착지로 안 쓴다)
+        self.closing: Set[str] = set()
+        self.eliminated: List[str] = []
+        self.winner: Optional[str] = None
+        self.moved = 0
+
+    # ---------- 시작 ----------
+    def table_code(self, k: int) -> str:
+        return f"{self.tid}-t{k + 1}"
+
+    def seat_all(self, names: List[str], rng: Optional[random.Random] = None) -> Dict[str, List[str]]:
+        """참가자를 최소 테이블 수에 고르게(±1) 나눈다. room_code → 이름들"""
+        names = list(dict.fromkeys(names))
+        (rng or random.Random()).shuffle(names)
+        n_tables = max(1, math.ceil(len(names) / self.table_size))
+        plan: Dict[str, List[str]] = {self.table_code(k): [] for k in range(n_tables)}
+        codes = list(plan)
+        for i, name in enumerate(names):
+            plan[codes[i % n_tables]].append(name)
+        for room_code, seated in plan.items():
+            self.members[room_code] = set(seated)
+            for name in seated:
+                self.where[name] = room_code
+        return plan
+
+    # ---------- 조회 ----------
+    def remaining(self) -> int:
+        return len(self.where)
+
+    def table_of(self, name: str) -> Optional[str]:
+        return self.where.get(name)
+
+    def moves_from(self, room_code: str) -> List[Move]:
+        return list(self.moves.get(room_code, ()))
+
+    def _incoming(self, room_code: str) -> int:
+        return sum(1 for ms in self.moves.values() for _, dest in ms if dest == room_code)
+
+    def effective(self, room_code: str) -> int:
+        """예약된 이동까지 반영한 인원"""
+        return len(self.members[room_code]) - len(self.moves.get(room_code, ())) + self._incoming(room_code)
+
+    def has_room(self, room_code: str) -> bool:
+        # 나가는 예약은 그 테이블 경계 전까지 자리를 차지하므로 빼지 않고 센다
+        return len(self.members[room_code]) + self._incoming(room_code) < self.table_size
+
+    # ---------- 테이블 경계 ----------
+    def hand_boundary(
+        self,
+        room_code: str,
+        busted: List[str],
+        moved_out: List[Tuple[str, int, str]],
+    ) -> List[SeatOrder]:
+        """테이블이 핸드 사이에 보고한 결과 반영 → 도착 테이블에 앉힐 목록
+
+        moved_out은 이번 경계에서 실제로 뺀 (이름, 스택, 도착 테이블).
+        예약됐지만 빠지지 않은 이동(그 핸드에 탈락 등)은 버리고 다시 계획한다.
+        """
+        seated = self.members.get(room_code)
+        if seated is None:
+            return []
+        for name in busted:
+            if self.where.get(name) == room_code:
+                seated.discard(name)
+                del self.where[name]
+                self.eliminated.append(name)
+
+        orders: List[SeatOrder] = []
+        for name, stack, dest in moved_out:
+            if self.where.get(name) != room_code:
+                continue
+            if dest not in self.members:
+                # 뺄 때 본 도착 테이블이 보고 전에 깨졌다(다른 테이블 경계에서 재계획). 칩은 이미 빠졌으니 다른 곳으로
+                dest = self._reroute(room_code, name)
+            seated.discard(name)
+            self.members[dest].add(name)
+            self.where[name] = dest
+            orders.append((dest, name, int(stack)))
+            self.moved += 1
+        self.moves.pop(room_code, None)
+
+        if room_code in self.closing and not seated:
+            self.closing.discard(room_code)
+            del self.members[room_code]
+
+        if self.remaining() == 1 and self.winner is None:
+            self.winner = next(iter(self.where))
+        elif self.remaining() > 1:
+            self.rebalance()
+        return orders
+
+    # ---------- 밸런싱 ----------
+    def _moving(self, room_code: str) -> Set[str]:
+        return {name for name, _ in self.moves.get(room_code, ())}
+
+    def _reroute(self, src: str, name: str) -> str:
+        """이미 빠진 이동자의 새 도착지: 지금 예약된 곳 → 자리 있는 가장 적은 테이블 → 원래 테이블"""
+        planned = next((d for n, d in self.moves.get(src, ()) if n == name and d in self.members), None)
+        if planned is not None:
+            return planned
+        dests = [t for t in self.members if t != src and t not in self.closing and self.has_room(t)]
+        return min(dests, key=lambda t: (self.effective(t), t)) if dests else src
+
+    def _plan(self, src: str, dest: str) -> bool:
+        free = sorted(self.members[src] - self._moving(src))
+        if not free or not self.has_room(dest):
+            return False
+        self.moves.setdefault(src, []).append((free[0], dest))
+        return True
+
+    def rebalance(self) -> None:
+        """테이블 수를 ceil(인원/9)로 줄이고, 남은 테이블 인원 차를 1 이하로"""
+        need = max(1, math.ceil(self.remaining() / self.table_size))
+        open_tables = [t for t in self.members if t not in self.closing]
+
+        def drain(victim: str) -> None:
+            for _ in range(len(self.members[victim] - self._moving(victim))):
+                dests = [t for t in open_tables if self.has_room(t)]
+                if not dests:
+                    return  # 자리가 날 때(다른 테이블 경계) 다시 계획
+                self._plan(victim, min(dests, key=lambda t: (self.effective(t), t)))
+
+        for victim in sorted(self.closing):
+            drain(victim)
+
+        while len(open_tables) > need:
+            victim = min(open_tables, key=lambda t: (self.effective(t), t))
+            open_tables.remove(victim)
+            self.closing.add(victim)
+            # 깨지는 테이블로 오던 예약은 취소
+            for src, ms in self.moves.items():
+                self.moves[src] = [m for m in ms if m[1] != victim]
+            drain(victim)
+
+        while len(open_tables) > 1:
+            big = max(open_tables, key=lambda t: (self.effective(t), t))
+            small = min(open_tables, key=lambda t: (self.effective(t), t))
+            if self.effective(big) - self.effective(small) <= 1:
+                break
+            if not self._plan(big, small):
+                break
@@ -0,0 +1,342 @@
+"""WebSocket 액션 API (봇/다른 프론트엔드용, 화면 리런 없이)
+
+엔진(engine.GameEngine)과 같은 이벤트 루프에서 WebSocket 서버를 돌린다. 액션은
+엔진 방 큐에 바로 들어가고(apply, 스레드 왕복 없음), 저장될 때마다 방에 붙은
+연결에 바뀐 부분만(room_patch JSON-patch) 보낸다.
+
+메시지 (텍스트 프레임, JSON 객체 하나)
+
+  클라이언트 → 서버
+    {"type": "hello", "room": "R1", "name": "alice"}        입장(없으면 앉힘) + 구독. 첫 메시지여야 한다
+    {"type": "act", "id": 7, "action": "raise", "amount": 1200}
+        action: call(체크/콜) / fold / allin / raise(amount = 레이즈 총액, game.raise_bounds 범위)
+    {"type": "ping"}                                            하트비트 (다른 메시지도 하트비트로 센다)
+
+  서버 → 클라이언트
+    {"type": "welcome", "seat": 4, "version": 12, "state": {...}}   seat -1이면 관전 (자리 없음)
+    {"type": "diff", "from": 12, "version": 13, "ops": [...]}       from 기준 상태에 ops를 적용하면 version 상태
+    {"type": "ack", "id": 7, "version": 13}
+    {"type": "error", "id": 7, "code": "not_your_turn", "message": "..."}
+    {"type": "pong"}
+
+act는 보내기 전에 엔진 메모리의 최신 상태로 검사한다(차례/레이즈 범위). 검사를
+통과한 뒤 앞서 큐에 있던 타이머(시간초과 등)가 먼저 적용되면 엔진이 버린다
+(ack는 오지만 diff에 내 액션이 안 보인다). 최종 결과는 항상 diff 쪽이다.
+
+상태는 보는 사람마다 가린다: 게임이 끝나기 전(GAME_OVER 아님)에는 남의 홀카드를
+HIDDEN으로 바꾼다(render.board_html과 같은 규칙). 느린 연결은 쌓아 두지 않고
+보낼 차례가 오면 그때 최신 상태와의 diff 하나만 보낸다.
+
+인증은 없다(화면과 같은 닉네임 방식). 한 엔진 프로세스 안에서만 동작한다
+(engine_cluster 워커 구성에서는 워커마다 따로 띄워야 한다).
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from websockets.asyncio.server import Server, ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+import game
+import metrics
+import room_patch
+from engine import GameEngine
+from table_model import Room
+
+State = Dict[str, Any]
+
+PLAY_ACTIONS = ("call", "fold", "allin", "raise")
+HIDDEN = "??"
+HELLO_TIMEOUT = 5.0  # 연결 후 이 안에 hello가 없으면 끊는다
+MAX_MESSAGE = 4096  # 액션 메시지는 작다
+
+
+class ProtocolError(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+# =========================
+# 1. Protocol
+# =========================
+def parse(raw: Any) -> Dict[str, Any]:
+    """프레임 하나 → 검사한 메시지 dict (모르는 키는 버린다)"""
+    if not isinstance(raw, str):
+        raise ProtocolError("bad_message", "text frames only")
+    try:
+        msg = json.loads(raw)
+    except ValueError:
+        raise ProtocolError("bad_json", "not JSON")
+    if not isinstance(msg, dict):
+        raise ProtocolError("bad_message", "expected an object")
+    kind = msg.get("type")
+    if kind == "hello":
+        room, name = msg.get("room"), msg.get("name")
+        if not isinstance(room, str) or not room or not isinstance(name, str) or not name:
+            raise ProtocolError("bad_message", "hello needs room and name")
+        return {"type": "hello", "room": room, "name": name}
+    if kind == "act":
+        action, amount = msg.get("action"), msg.get("amount")
+        if action not in PLAY_ACTIONS:
+            raise ProtocolError("unknown_action", f"action must be one of {', '.join(PLAY_ACTIONS)}")
+        if action == "raise" and (not isinstance(amount, int) or isinstance(amount, bool)):
+            raise ProtocolError("bad_amount", "raise needs an integer amount (raise-to total)")
+        return {"type": "act", "id": msg.get("id"), "action": action, "amount": amount}
+    if kind == "ping":
+        return {"type": "ping"}
+    raise ProtocolError("bad_message", f"unknown type {kind!r}")
+
+
+def check_action(state: Room, seat: int, action: str, amount: Optional[int] = None) -> Optional[ProtocolError]:
+    """지금 상태에서 이 자리가 이 액션을 할 수 있는지. 되면 None"""
+    if seat < 0:
+        return ProtocolError("not_seated", "no seat in this room")
+    if not game.is_turn_of(state, seat):
+        return ProtocolError("not_your_turn", f"turn is seat {state.turn_idx} ({state.phase})")
+    if action == "raise":
+        me = state.players[seat]
+        lo, hi = game.raise_bounds(state.level, state.current_bet, me.bet, me.stack)
+        if amount is None or not lo <= amount <= hi:
+            return ProtocolError("bad_amount", f"raise-to must be between {lo:,} and {hi:,}")
+    return None
+
+
+def redact(state: State, seat: int) -> State:
+    """seat 자리에서 보이는 상태 (게임 끝나기 전 남의 홀카드는 HIDDEN). 원본은 안 바꾼다"""
+    if state["phase"] == "GAME_OVER":
+        return state
+    players = [
+        p if i == seat or not p["hand"] else {**p, "hand": [HIDDEN] * len(p["hand"])}
+        for i, p in enumerate(state["players"])
+    ]
+    return {**state, "players": players}
+
+
+def seat_of(state: State, name: str) -> int:
+    return next((i for i, p in enumerate(state["players"]) if p["name"] == name), -1)
+
+
+def seat_of_room(state: Room, name: str) -> int:
+    return next((i for i, p in enumerate(state.players) if p.name == name), -1)
+
+
+def dumps(msg: Dict[str, Any]) -> str:
+    return json.dumps(msg, ensure_ascii=False, separators=(",", ":"))
+
+
+# =========================
+# 2. Server
+# =========================
+class Client:
+    """연결 하나. 보낸 마지막 화면(view)을 들고 있다가 새 저장이 오면 그 diff만 보낸다"""
+
+    def __init__(self, ws: ServerConnection, room_code: str, name: str):
+        self.ws = ws
+        self.room_code = room_code
+        self.name = name
+        self.seat = -1
+        self.view: State = {}
+        self.version = 0
+        self.latest: Optional[Tuple[int, State]] = None
+        self.wake = asyncio.Event()
+
+    async def pump(self) -> None:
+        """새 저장이 오면 그때의 최신 상태 하나로 diff (밀린 버전은 합쳐진다)"""
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            if self.latest is None or self.latest[0] <= self.version:
+                continue
+            version, state = self.latest
+            self.seat = seat_of(state, self.name)  # 강퇴/토너먼트 이동이면 -1 (관전)
+            view = redact(state, self.seat)
+            ops = room_patch.diff(self.view, view)
+            await self.ws.send(dumps({"type": "diff", "from": self.version, "version": version, "ops": ops}))
+            self.view, self.version = view, version
+
+
+class WsApi:
+    """엔진 루프에서 도는 WebSocket 서버. start()/stop()은 아무 스레드에서나"""
+
+    def __init__(self, engine: GameEngine, port: int = 8765, host: str = "0.0.0.0"):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.rooms: Dict[str, Set[Client]] = {}
+        self.server: Optional[Server] = None
+        metrics.add_collector("ws_api", self._collect)
+
+    def start(self) -> "WsApi":
+        assert self.engine.loop is not None, "engine not started"
+        self.engine.add_listener(self._on_commit)
+        asyncio.run_coroutine_threadsafe(self._start(), self.engine.loop).result(timeout=5)
+        return self
+
+    def stop(self) -> None:
+        if self.server is not None and self.engine.loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stop(), self.engine.loop).result(timeout=5)
+
+    async def _start(self) -> None:
+        self.server = await serve(self._handle, self.host, self.port, max_size=MAX_MESSAGE)
+        self.port = self.server.sockets[0].getsockname()[1]  # port=0이면 실제로 잡힌 포트
+
+    async def _stop(self) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    # ---------- 엔진 → 연결 ----------
+    def _on_commit(self, room_code: str, version: int, state: State) -> None:
+        for c in self.rooms.get(room_code, ()):
+            c.latest = (version, state)
+            c.wake.set()
+
+    # ---------- 연결 → 엔진 ----------
+    async def _handle(self, ws: ServerConnection) -> None:
+        try:
+            hello = parse(await asyncio.wait_for(ws.recv(), HELLO_TIMEOUT))
+            if hello["type"] != "hello":
+                raise ProtocolError("bad_message", "first message must be hello")
+        except (asyncio.TimeoutError, ProtocolError) as e:
+            code = e.code if isinstance(e, ProtocolError) else "timeout"
+            await ws.close(1008, code)
+            return
+        except ConnectionClosed:
+            return
+
+        client = Client(ws, hello["room"], hello["name"])
+        try:
+            await self.engine.apply(client.room_code, "join", client.name)
+        except Exception as e:
+            await ws.close(1011, f"{type(e).__name__}")
+            return
+        head = self.engine.committed(client.room_code)
+        if head is not None:
+            state, client.version = head
+            client.seat = seat_of(state, client.name)
+            client.view = redact(state, client.seat)
+        if client.seat >= 0:
+            self.engine.touch(client.room_code, client.seat, client.name)
+        self.rooms.setdefault(client.room_code, set()).add(client)
+        pump = asyncio.ensure_future(client.pump())
+        try:
+            await ws.send(dumps({"type": "welcome", "seat": client.seat, "version": client.version, "state": client.view}))
+            async for raw in ws:
+                await self._message(client, raw)
+        except ConnectionClosed:
+            pass
+        finally:
+            pump.cancel()
+            peers = self.rooms.get(client.room_code)
+            if peers is not None:
+                peers.discard(client)
+                if not peers:
+                    del self.rooms[client.room_code]
+
+    async def _message(self, client: Client, raw: Any) -> None:
+        t0 = time.perf_counter()
+        if client.seat >= 0:
+            self.engine.touch(client.room_code, client.seat, client.name)
+        try:
+            msg = parse(raw)
+        except ProtocolError as e:
+            await self._error(client, None, e)
+            return
+        if msg["type"] == "ping":
+            await client.ws.send(dumps({"type": "pong"}))
+            return
+        if msg["type"] == "hello":
+            await self._error(client, None, ProtocolError("bad_message", "already joined"))
+            return
+
+        action, amount = msg["action"], msg["amount"]
+        state = self.engine.live_state(client.room_code)
+        seat = seat_of_room(state, client.name) if state is not None else -1
+        err = check_action(state, seat, action, amount) if state is not None else ProtocolError("not_seated", "room not loaded")
+        if err is not None:
+            await self._error(client, msg["id"], err)
+            return
+        args: Tuple[Any, ...] = (seat, amount) if action == "raise" else (seat,)
+        try:
+            version = await self.engine.apply(client.room_code, action, *args)
+        except Exception as e:
+            await self._error(client, msg["id"], ProtocolError("engine", f"{type(e).__name__}: {e}"))
+            return
+        metrics.observe("ws_action_seconds", time.perf_counter() - t0, action=action)
+        await client.ws.send(dumps({"type": "ack", "id": msg["id"], "version": version}))
+
+    async def _error(self, client: Client, msg_id: Any, e: ProtocolError) -> None:
+        metrics.inc("ws_errors_total", code=e.code)
+        await client.ws.send(dumps({"type": "error", "id": msg_id, "code": e.code, "message": e.message}))
+
+    def _collect(self) -> List[metrics.Sample]:
+        return [("ws_connections", "gauge", {}, sum(len(v) for v in list(self.rooms.values())))]
+
+
+if __name__ == "__main__":
+    # 자체 확인: 가짜 DB 엔진 + 서버 + 클라이언트 하나. 봇 5명과 몇 핸드 치면서 왕복 지연을 잰다
+    import bots
+    from fake_supabase import FakeSupabase
+    from room_store import RoomStore
+    from websockets.asyncio.client import connect
+
+    bots.THINK_DELAY = 0.05
+    game.AUTO_NEXT_HAND_DELAY = 0.3
+    engine = GameEngine(RoomStore(FakeSupabase(), game.init_room_json)).start()
+    api = WsApi(engine, port=0, host="127.0.0.1").start()
+
+    async def play(hands: int = 5) -> None:
+        async with connect(f"ws://127.0.0.1:{api.port}") as ws:
+            await ws.send(json.dumps({"type": "hello", "room": "ws-selfcheck", "name": "alice"}))
+            welcome = json.loads(await ws.recv())
+            assert welcome["type"] == "welcome" and welcome["seat"] >= 0, welcome
+            seat, view, version = welcome["seat"], welcome["state"], welcome["version"]
+            await ws.send("not json")
+            assert json.loads(await ws.recv())["code"] == "bad_json"
+            await asyncio.to_thread(engine.call, "ws-selfcheck", "bots_fill", 5)
+
+            rtts: List[float] = []
+            sent: Dict[int, float] = {}
+            rejected: Set[str] = set()
+            next_id = 0
+            while view.get("hand_no", 0) <= hands:
+                msg = json.loads(await ws.recv())
+                if msg["type"] == "diff":
+                    assert msg["from"] == version, (msg["from"], version)
+                    view = room_patch.apply_patch(view, msg["ops"])
+                    version = msg["version"]
+                    if view["phase"] != "GAME_OVER":
+                        others = [p["hand"] for i, p in enumerate(view["players"]) if i != seat and p["hand"]]
+                        assert all(h == [HIDDEN, HIDDEN] for h in others), others
+                elif msg["type"] == "ack":
+                    rtts.append(time.perf_counter() - sent.pop(msg["id"]))
+                elif msg["type"] == "error":
+                    rejected.add(msg["code"])
+                    sent.pop(msg["id"], None)
+                if sent or view["phase"] in ("WAITING", "GAME_OVER"):
+                    continue
+                if view["turn_idx"] == seat:
+                    me = view["players"][seat]
+                    if "bad_amount" not in rejected:
+                        action, amount = "raise", 1  # 최소보다 작은 레이즈 → 거절돼야 한다
+                    elif me["bet"] < view["current_bet"]:
+                        action, amount = "call", None
+                    else:
+                        action, amount = "raise", game.raise_bounds(view["level"], view["current_bet"], me["bet"], me["stack"])[0]
+                elif "not_your_turn" not in rejected:
+                    action, amount = "fold", None
+                else:
+                    continue
+                next_id += 1
+                sent[next_id] = time.perf_counter()
+                await ws.send(json.dumps({"type": "act", "id": next_id, "action": action, "amount": amount}))
+            assert {"bad_amount", "not_your_turn"} <= rejected, rejected
+            rtts.sort()
+            print(f"{len(rtts)} actions over {hands} hands, ack round trip p50 {rtts[len(rtts) // 2] * 1000:.2f} ms, max {rtts[-1] * 1000:.2f} ms")
+
+    asyncio.run(play())
+    api.stop()
+    engine.stop()